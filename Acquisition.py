@@ -0,0 +1,161 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: Acquisition                                                      */
+#/* A single long running thread which acquires meter and plot data from    */
+#/* the ECU while acquisition is active, and sleeps until notified when it  */
+#/* is not. Each sweep is queued at polling priority on the command queue,  */
+#/* so user requests run first.                                             */
+#/***************************************************************************/
+
+
+
+import time
+import threading
+import CommandQueue
+
+
+
+# Time to wait before sweeping again when there was no data to acquire.
+IDLE_WAIT_PERIOD = 0.25
+
+
+
+class Acquisition:
+	def __init__(self, ThisCommandQueue, IsActiveFunction, SweepFunction, StoppedFunction = None):
+		# Queue which runs all ELM327 communications.
+		self.ThisCommandQueue = ThisCommandQueue
+		# Returns True while data should be acquired.
+		self.IsActiveFunction = IsActiveFunction
+		# Acquires and publishes one sweep of data, run on the command queue thread, returns False if there was no data to acquire.
+		self.SweepFunction = SweepFunction
+		# Called with the statistics when acquisition stops.
+		self.StoppedFunction = StoppedFunction
+
+		self.Wake = threading.Condition()
+		self.ExitFlag = False
+		self.Thread = None
+
+		self.ResetStatistics()
+
+
+
+#/*****************************************************************/
+#/* Clear the sweep count and timing for a new acquisition run.   */
+#/*****************************************************************/
+	def ResetStatistics(self):
+		self.SweepCount = 0
+		self.StartTime = time.perf_counter()
+		self.StartCpuTime = time.process_time()
+		self.StopTime = self.StartTime
+		self.StopCpuTime = self.StartCpuTime
+
+
+
+#/*****************************************************************/
+#/* Get the sweeps per second and CPU usage of the last or        */
+#/* current acquisition run.                                      */
+#/*****************************************************************/
+	def GetStatistics(self):
+		Result = ""
+
+		if self.SweepCount > 0:
+			StopTime = self.StopTime
+			StopCpuTime = self.StopCpuTime
+			if self.IsRunning() == True:
+				StopTime = time.perf_counter()
+				StopCpuTime = time.process_time()
+			Seconds = StopTime - self.StartTime
+			if Seconds > 0:
+				Result += "Acquisition Sweeps|" + str(self.SweepCount) + " in " + "{:1.1f}".format(Seconds) + " s\n"
+				Result += "Acquisition Rate|" + "{:1.1f}".format(self.SweepCount / Seconds) + " sweeps/s\n"
+				Result += "Acquisition CPU|" + "{:1.0f}".format(100 * (StopCpuTime - self.StartCpuTime) / Seconds) + " %\n"
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Check if the acquisition thread is currently acquiring data.  */
+#/*****************************************************************/
+	def IsRunning(self):
+		return self.StopTime == 0.0
+
+
+
+#/*****************************************************************/
+#/* Let the acquisition thread know acquisition may have been     */
+#/* started or stopped, starting the thread on first use.         */
+#/*****************************************************************/
+	def Notify(self):
+		with self.Wake:
+			if self.Thread == None:
+				self.Thread = threading.Thread(target = self.Run, name = "Acquisition", daemon = True)
+				self.Thread.start()
+			self.Wake.notify()
+
+
+
+#/*****************************************************************/
+#/* Stop the acquisition thread, waiting for any sweep in         */
+#/* progress to complete.                                         */
+#/*****************************************************************/
+	def Close(self):
+		with self.Wake:
+			self.ExitFlag = True
+			self.Wake.notify()
+		if self.Thread != None:
+			self.Thread.join()
+			self.Thread = None
+
+
+
+#/*****************************************************************/
+#/* Acquisition thread. Wait until acquisition is active, then    */
+#/* sweep continuously, queueing one sweep at a time so other     */
+#/* communications can take place between sweeps.                 */
+#/*****************************************************************/
+	def Run(self):
+		while self.ExitFlag == False:
+			with self.Wake:
+				while self.ExitFlag == False and self.IsActiveFunction() == False:
+					self.Wake.wait()
+			if self.ExitFlag == True:
+				break
+
+			self.ResetStatistics()
+			self.StopTime = 0.0
+			while self.ExitFlag == False and self.IsActiveFunction() == True:
+				Acquired = False
+				try:
+					# Only one sweep is queued at a time, so user requests never wait behind more than one.
+					Acquired = self.ThisCommandQueue.Submit(self.SweepFunction, (), CommandQueue.PRIORITY_POLL).result()
+					if Acquired != False:
+						self.SweepCount += 1
+				except Exception as Catch:
+					print(str(Catch))
+				# Don't spin when there is nothing to acquire, wake early if acquisition is stopped.
+				if Acquired == False:
+					with self.Wake:
+						self.Wake.wait(IDLE_WAIT_PERIOD)
+			self.StopTime = time.perf_counter()
+			self.StopCpuTime = time.process_time()
+
+			if self.StoppedFunction != None:
+				try:
+					self.StoppedFunction(self.GetStatistics())
+				except Exception as Catch:
+					print(str(Catch))
@@ -0,0 +1,297 @@
+#!/usr/bin/python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: CaptureSerial, ReplaySerial                                      */
+#/* Capture all data sent to and received from the ELM327 device, with the  */
+#/* time of each, to a compact binary file. Replay a capture to the ELM327  */
+#/* class in place of the serial port, at the original timing, a number of  */
+#/* times faster, or as fast as possible, for repeatable performance tests. */
+#/* Run this file with a capture file name to print the capture.            */
+#/*                                                                         */
+#/* File format: CAPTURE_MAGIC, then records of a RECORD_FORMAT header of   */
+#/* microseconds since the previous record, record type and data length,    */
+#/* followed by the data. Each connection is added to the end of the file.  */
+#/***************************************************************************/
+
+
+
+import sys
+import time
+import struct
+
+
+
+CAPTURE_MAGIC = b'ELMCAP01'
+
+# Record header: microseconds since the previous record, record type, data length.
+RECORD_FORMAT = "<IcH"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# Record types. A receive record with no data is a read which timed out.
+RECORD_SEND = b'T'
+RECORD_RECEIVE = b'R'
+RECORD_BAUD = b'B'
+
+# Replay speed for as fast as possible.
+REPLAY_FAST = 0
+
+# Number of records searched ahead for a send which doesn't match the capture.
+RESYNC_RECORDS = 1000
+
+
+
+#/*****************************************************************/
+#/* Load the records of a capture file, as a list of              */
+#/* [Seconds, Type, Data].                                        */
+#/*****************************************************************/
+def LoadCapture(FileName):
+	Result = []
+
+	with open(FileName, 'rb') as ThisFile:
+		Data = ThisFile.read()
+	if Data[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+		raise ValueError(FileName + " is not a capture file")
+	Position = len(CAPTURE_MAGIC)
+	Seconds = 0.0
+	while Position + RECORD_SIZE <= len(Data):
+		MicroSeconds, Type, Length = struct.unpack_from(RECORD_FORMAT, Data, Position)
+		Position += RECORD_SIZE
+		Seconds += MicroSeconds / 1000000
+		Result.append([Seconds, Type, Data[Position:Position + Length]])
+		Position += Length
+
+	return Result
+
+
+
+class CaptureSerial:
+	def __init__(self, ThisSerial, FileName):
+		# Set directly, as all other attributes are passed to the serial port.
+		self.__dict__["ThisSerial"] = ThisSerial
+		# Each connection is added to the capture, so a reconnect doesn't lose the connections before it.
+		self.__dict__["File"] = open(FileName, 'ab')
+		self.__dict__["LastTime"] = time.perf_counter()
+		if self.File.tell() == 0:
+			self.File.write(CAPTURE_MAGIC)
+		self.Record(RECORD_BAUD, bytes(str(ThisSerial.baudrate), 'utf-8'))
+
+
+
+#/*****************************************************************/
+#/* Pass all other attributes to and from the serial port,        */
+#/* recording baud rate changes.                                  */
+#/*****************************************************************/
+	def __getattr__(self, Name):
+		return getattr(self.ThisSerial, Name)
+
+
+	def __setattr__(self, Name, Value):
+		setattr(self.ThisSerial, Name, Value)
+		if Name == "baudrate":
+			self.Record(RECORD_BAUD, bytes(str(Value), 'utf-8'))
+
+
+
+#/*****************************************************************/
+#/* Write a record with the time since the previous record.       */
+#/*****************************************************************/
+	def Record(self, Type, Data):
+		Now = time.perf_counter()
+		MicroSeconds = min(0xFFFFFFFF, int(1000000 * (Now - self.LastTime)))
+		# Keep the time of the record, so rounding doesn't accumulate.
+		self.__dict__["LastTime"] += MicroSeconds / 1000000
+		self.File.write(struct.pack(RECORD_FORMAT, MicroSeconds, Type, len(Data)) + Data)
+
+
+
+#/*****************************************************************/
+#/* Send and receive through the serial port, recording the data. */
+#/*****************************************************************/
+	def write(self, Data):
+		Result = self.ThisSerial.write(Data)
+		self.Record(RECORD_SEND, bytes(Data))
+
+		return Result
+
+
+	def read(self, Size = 1):
+		Result = self.ThisSerial.read(Size)
+		self.Record(RECORD_RECEIVE, Result)
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Close the serial port and the capture file.                   */
+#/*****************************************************************/
+	def close(self):
+		self.ThisSerial.close()
+		if self.File.closed == False:
+			self.File.close()
+
+
+
+class ReplaySerial:
+	def __init__(self, FileName, Speed = 1.0):
+		self.name = FileName
+		self.Records = LoadCapture(FileName)
+		# Times faster than the capture to replay, or REPLAY_FAST.
+		self.Speed = Speed
+		self.Index = 0
+		# Received data released by the replay and not yet read.
+		self.Released = bytearray()
+		# Capture time matched to the real time of the last send.
+		self.CaptureTime = 0.0
+		self.RealTime = time.perf_counter()
+		self.MismatchCount = 0
+		self.is_open = True
+		self.timeout = None
+		self.write_timeout = None
+		self.baudrate = 38400
+		for Seconds, Type, Data in self.Records:
+			if Type == RECORD_BAUD:
+				# A capture of a TCP link records no baud rate.
+				if Data.isdigit():
+					self.baudrate = int(Data)
+				else:
+					self.baudrate = None
+				break
+
+
+
+#/*****************************************************************/
+#/* Get the real time a capture time is replayed at.              */
+#/*****************************************************************/
+	def GetReplayTime(self, Seconds):
+		Result = self.RealTime
+
+		if self.Speed != REPLAY_FAST:
+			Result += (Seconds - self.CaptureTime) / self.Speed
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Release the received data due by now, stopping at the next    */
+#/* send, which waits for the ELM327 class to send. Return the    */
+#/* record of a timed out read when it is the next record due.    */
+#/*****************************************************************/
+	def Release(self):
+		Now = time.perf_counter()
+		while self.Index < len(self.Records):
+			Seconds, Type, Data = self.Records[self.Index]
+			if Type == RECORD_SEND or self.GetReplayTime(Seconds) > Now:
+				break
+			elif Type == RECORD_RECEIVE and len(Data) == 0:
+				return self.Records[self.Index]
+			elif Type == RECORD_RECEIVE:
+				self.Released += Data
+			self.Index += 1
+
+		return None
+
+
+
+#/*****************************************************************/
+#/* Serial port functions used by the ELM327 class.               */
+#/*****************************************************************/
+	@property
+	def in_waiting(self):
+		self.Release()
+		return len(self.Released)
+
+
+	def write(self, Data):
+		# Data received before this send in the capture has arrived, even if it isn't due yet.
+		while self.Index < len(self.Records) and self.Records[self.Index][1] != RECORD_SEND:
+			if self.Records[self.Index][1] == RECORD_RECEIVE:
+				self.Released += self.Records[self.Index][2]
+			self.Index += 1
+		if self.Index < len(self.Records):
+			if bytes(Data) != self.Records[self.Index][2]:
+				self.MismatchCount += 1
+				print("REPLAY MISMATCH: SENT " + str(bytes(Data)) + " CAPTURED " + str(self.Records[self.Index][2]))
+				# Skip ahead to the same data being sent, for example where cached settings skipped some requests.
+				for Index in range(self.Index + 1, min(len(self.Records), self.Index + RESYNC_RECORDS)):
+					if self.Records[Index][1] == RECORD_SEND and self.Records[Index][2] == bytes(Data):
+						self.Released = bytearray()
+						self.Index = Index
+						break
+			Seconds, Type, CapturedData = self.Records[self.Index]
+			self.CaptureTime = Seconds
+			self.RealTime = time.perf_counter()
+			self.Index += 1
+
+		return len(Data)
+
+
+	def read(self, Size = 1):
+		Result = b''
+
+		Deadline = None
+		if self.timeout != None:
+			Deadline = time.perf_counter() + self.timeout
+		while len(self.Released) == 0:
+			TimedOut = self.Release()
+			if TimedOut != None:
+				# Replay the read timing out, then move past it.
+				self.Index += 1
+				return Result
+			if len(self.Released) > 0:
+				break
+			if self.Index >= len(self.Records) or self.Records[self.Index][1] == RECORD_SEND:
+				# Nothing more arrives until the next send, wait out the timeout.
+				if Deadline != None and self.Speed != REPLAY_FAST:
+					time.sleep(max(0.0, Deadline - time.perf_counter()))
+				return Result
+			Wait = self.GetReplayTime(self.Records[self.Index][0]) - time.perf_counter()
+			if Deadline != None and time.perf_counter() + Wait > Deadline:
+				# The data arrives after this read times out, leave it for the next read.
+				time.sleep(max(0.0, Deadline - time.perf_counter()))
+				return Result
+			time.sleep(max(0.0, Wait))
+
+		Result = bytes(self.Released[:Size])
+		del self.Released[:Size]
+
+		return Result
+
+
+	def close(self):
+		self.is_open = False
+
+
+
+#/*****************************************************************/
+#/* Print a capture file, one record per line with its time.      */
+#/*****************************************************************/
+if __name__ == "__main__":
+	if len(sys.argv) != 2:
+		print("Usage: " + sys.argv[0] + " CaptureFile")
+		sys.exit(1)
+	Sent = 0
+	Received = 0
+	for Seconds, Type, Data in LoadCapture(sys.argv[1]):
+		if Type == RECORD_SEND:
+			Sent += len(Data)
+		elif Type == RECORD_RECEIVE:
+			Received += len(Data)
+		print("{:10.6f}".format(Seconds) + " " + str(Type, 'utf-8') + " " + str(Data)[2:-1])
+	print("SENT " + str(Sent) + " BYTES, RECEIVED " + str(Received) + " BYTES")
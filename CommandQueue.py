@@ -0,0 +1,167 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: CommandQueue                                                     */
+#/* A single thread which owns the ELM327 device. All ELM327 communications */
+#/* are submitted as commands to a priority queue and run in turn on this   */
+#/* thread. Each submitted command returns a future for its result, which   */
+#/* can be waited on with a time out, or cancelled before it runs.          */
+#/***************************************************************************/
+
+
+
+import time
+import queue
+import threading
+import concurrent.futures
+
+
+
+# Command priorities, lower numbers run first.
+PRIORITY_UI = 0
+PRIORITY_POLL = 10
+
+# Priority of the command which stops the queue thread, after all other commands.
+PRIORITY_STOP = 100
+
+
+
+class CommandQueue:
+	def __init__(self):
+		self.Queue = queue.PriorityQueue()
+		# Order commands of the same priority by submission.
+		self.Sequence = 0
+		self.Lock = threading.Lock()
+		# Number of commands queued or running for each priority.
+		self.Pending = {}
+		self.ResetStatistics()
+		self.Thread = threading.Thread(target = self.Run, name = "CommandQueue", daemon = True)
+		self.Thread.start()
+
+
+
+#/*****************************************************************/
+#/* Clear the queue depth and wait time statistics.               */
+#/*****************************************************************/
+	def ResetStatistics(self):
+		with self.Lock:
+			self.MaxDepth = 0
+			# Command count, total wait and longest wait for each priority.
+			self.WaitTimes = {}
+			self.TimeOutCount = 0
+			self.CancelCount = 0
+
+
+
+#/*****************************************************************/
+#/* Submit a command to run on the queue thread, returning a      */
+#/* future for the result. A command still queued after its time  */
+#/* out fails with a TimeoutError instead of running.             */
+#/*****************************************************************/
+	def Submit(self, Function, Args = (), Priority = PRIORITY_UI, TimeOut = None):
+		Future = concurrent.futures.Future()
+		Deadline = None
+		if TimeOut != None:
+			Deadline = time.perf_counter() + TimeOut
+		with self.Lock:
+			self.Sequence += 1
+			Sequence = self.Sequence
+			self.Pending[Priority] = self.Pending.get(Priority, 0) + 1
+			Depth = self.Queue.qsize() + 1
+			if Depth > self.MaxDepth:
+				self.MaxDepth = Depth
+		self.Queue.put((Priority, Sequence, time.perf_counter(), Deadline, Future, Function, Args))
+
+		return Future
+
+
+
+#/*****************************************************************/
+#/* Check if any commands of the given priority or higher are     */
+#/* queued or running.                                            */
+#/*****************************************************************/
+	def IsBusy(self, Priority = PRIORITY_UI):
+		Result = False
+
+		with self.Lock:
+			for ThisPriority in self.Pending:
+				if ThisPriority <= Priority and self.Pending[ThisPriority] > 0:
+					Result = True
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Stop the queue thread once all queued commands have run.      */
+#/*****************************************************************/
+	def Close(self):
+		self.Submit(None, (), PRIORITY_STOP)
+		self.Thread.join()
+
+
+
+#/*****************************************************************/
+#/* Queue thread. Run each command in priority order, skipping    */
+#/* commands which were cancelled or timed out while queued.      */
+#/*****************************************************************/
+	def Run(self):
+		Running = True
+		while Running == True:
+			Priority, Sequence, QueueTime, Deadline, Future, Function, Args = self.Queue.get()
+			StartTime = time.perf_counter()
+
+			if Function == None:
+				Running = False
+				Future.set_result(None)
+			elif Future.set_running_or_notify_cancel() == False:
+				with self.Lock:
+					self.CancelCount += 1
+			elif Deadline != None and StartTime > Deadline:
+				with self.Lock:
+					self.TimeOutCount += 1
+				Future.set_exception(TimeoutError("Command waited " + "{:1.2f}".format(StartTime - QueueTime) + " s in queue"))
+			else:
+				with self.Lock:
+					Count, Total, Longest = self.WaitTimes.get(Priority, [0, 0.0, 0.0])
+					self.WaitTimes[Priority] = [Count + 1, Total + StartTime - QueueTime, max(Longest, StartTime - QueueTime)]
+				try:
+					Future.set_result(Function(*Args))
+				except Exception as Catch:
+					print(str(Catch))
+					Future.set_exception(Catch)
+
+			with self.Lock:
+				self.Pending[Priority] -= 1
+
+
+
+#/*****************************************************************/
+#/* Get the queue depth and the wait times for each priority.     */
+#/*****************************************************************/
+	def GetStatistics(self):
+		Result = ""
+
+		with self.Lock:
+			Result += "Command Queue Depth|" + str(self.Queue.qsize()) + " (max " + str(self.MaxDepth) + ")\n"
+			for Priority in sorted(self.WaitTimes):
+				Count, Total, Longest = self.WaitTimes[Priority]
+				Result += "Command Wait P" + str(Priority) + "|" + str(Count) + " avg " + "{:1.3f}".format(Total / Count) + " s max " + "{:1.3f}".format(Longest) + " s\n"
+			if self.TimeOutCount > 0 or self.CancelCount > 0:
+				Result += "Commands Timed Out|" + str(self.TimeOutCount) + "\n"
+				Result += "Commands Cancelled|" + str(self.CancelCount) + "\n"
+
+		return Result
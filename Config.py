@@ -27,51 +27,12 @@ import os
 import pygame
 import Visual
 import Button
-
-
-
-# Configuration default values.
-ConfigValues = {
-	"FontName" : "freemono",
-	"SerialPort" : "/dev/serial/by-id/usb-FTDI_FT232R_USB_UART_A800eaG9-if00-port0",
-	"Vehicle" : "DATA/TroubleCodes-Subaru.txt",
-	"Debug": "OFF",
-}
-
-
-
-#/*********************************/
-#/* Load configuration from disk. */
-#/*********************************/
-def LoadConfig():
-	if os.path.isfile("CONFIG/CONFIG.CFG"):
-		File = open("CONFIG/CONFIG.CFG", 'r')
-		TextLine = "."
-		while TextLine != "":
-			TextLine = File.readline()
-			TextLine = TextLine.replace("\n", "")
-			if TextLine[:9] == "FontName=":
-				ConfigValues["FontName"] = str(TextLine[9:])
-			elif TextLine[:11] == "SerialPort=":
-				ConfigValues["SerialPort"] = str(TextLine[11:])
-			elif TextLine[:8] == "Vehicle=":
-				ConfigValues["Vehicle"] = str(TextLine[8:])
-			elif TextLine[:6] == "Debug=":
-				ConfigValues["Debug"] = str(TextLine[6:])
-		File.close()
-
-
-
-#/*******************************/
-#/* Save configuration to disk. */
-#/*******************************/
-def SaveConfig():
-	File = open("CONFIG/CONFIG.CFG", 'w')
-	File.write("FontName=" + str(ConfigValues["FontName"]) + "\n")
-	File.write("SerialPort=" + str(ConfigValues["SerialPort"]) + "\n")
-	File.write("Vehicle=" + str(ConfigValues["Vehicle"]) + "\n")
-	File.write("Debug=" + str(ConfigValues["Debug"]) + "\n")
-	File.close()
+import Emulator
+import Transport
+import SocketCan
+import RemoteELM327
+# The configuration values are loaded and saved by ConfigFile, which programs without a display use.
+from ConfigFile import ConfigValues, LoadConfig, SaveConfig
 
 
 
@@ -140,6 +101,28 @@ class Config(Visual.Visual):
 				SerialPortNames += "/dev/serial/by-id/" + SerialPortName + "\n"
 		except:
 			print("Failed to read: /dev/serial/by-id/")
+		# Find a running ELM327 emulator.
+		if os.path.islink(Emulator.EMULATOR_LINK_NAME):
+			SerialPortNames += Emulator.EMULATOR_LINK_NAME + "\n"
+		# Find a running ELM327 daemon.
+		if os.path.exists(RemoteELM327.DAEMON_SOCKET_NAME):
+			SerialPortNames += RemoteELM327.DAEMON_PREFIX + RemoteELM327.DAEMON_SOCKET_NAME + "\n"
+		# Configured WiFi ELM327 adapters, separated by commas.
+		for TcpEndpoint in ConfigValues["TcpEndpoints"].split(","):
+			TcpEndpoint = TcpEndpoint.strip()
+			if TcpEndpoint != "":
+				if Transport.IsTcpName(TcpEndpoint) == False:
+					TcpEndpoint = Transport.TCP_PREFIX + TcpEndpoint
+				SerialPortNames += TcpEndpoint + "\n"
+		# Find CAN interfaces, network interfaces of type ARPHRD_CAN.
+		try:
+			for Interface in sorted(os.listdir("/sys/class/net/")):
+				File = open("/sys/class/net/" + Interface + "/type", 'r')
+				if File.read().strip() == SocketCan.ARPHRD_CAN:
+					SerialPortNames += SocketCan.CAN_PREFIX + Interface + "\n"
+				File.close()
+		except:
+			print("Failed to read: /sys/class/net/")
 
 		return SerialPortNames
 
@@ -0,0 +1,95 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: ConfigFile                                                       */
+#/* Configuration values of the application, and loading and saving them    */
+#/* to disk. Kept apart from the Config dialog so programs without a        */
+#/* display, such as the Daemon, can read the configuration without         */
+#/* importing pygame.                                                       */
+#/***************************************************************************/
+
+
+
+import os
+
+
+
+# Configuration default values.
+ConfigValues = {
+	"FontName" : "freemono",
+	"SerialPort" : "/dev/serial/by-id/usb-FTDI_FT232R_USB_UART_A800eaG9-if00-port0",
+	"Vehicle" : "DATA/TroubleCodes-Subaru.txt",
+	"Debug": "OFF",
+	"CaptureFile": "",
+	"ReplayFile": "",
+	"ReplaySpeed": "1",
+	"Headers": "OFF",
+	"EcuAddress": "",
+	"TcpEndpoints": "tcp://192.168.0.10:35000",
+}
+
+
+
+#/*********************************/
+#/* Load configuration from disk. */
+#/*********************************/
+def LoadConfig():
+	if os.path.isfile("CONFIG/CONFIG.CFG"):
+		File = open("CONFIG/CONFIG.CFG", 'r')
+		TextLine = "."
+		while TextLine != "":
+			TextLine = File.readline()
+			TextLine = TextLine.replace("\n", "")
+			if TextLine[:9] == "FontName=":
+				ConfigValues["FontName"] = str(TextLine[9:])
+			elif TextLine[:11] == "SerialPort=":
+				ConfigValues["SerialPort"] = str(TextLine[11:])
+			elif TextLine[:8] == "Vehicle=":
+				ConfigValues["Vehicle"] = str(TextLine[8:])
+			elif TextLine[:6] == "Debug=":
+				ConfigValues["Debug"] = str(TextLine[6:])
+			elif TextLine[:12] == "CaptureFile=":
+				ConfigValues["CaptureFile"] = str(TextLine[12:])
+			elif TextLine[:11] == "ReplayFile=":
+				ConfigValues["ReplayFile"] = str(TextLine[11:])
+			elif TextLine[:12] == "ReplaySpeed=":
+				ConfigValues["ReplaySpeed"] = str(TextLine[12:])
+			elif TextLine[:8] == "Headers=":
+				ConfigValues["Headers"] = str(TextLine[8:])
+			elif TextLine[:11] == "EcuAddress=":
+				ConfigValues["EcuAddress"] = str(TextLine[11:])
+			elif TextLine[:13] == "TcpEndpoints=":
+				ConfigValues["TcpEndpoints"] = str(TextLine[13:])
+		File.close()
+
+
+
+#/*******************************/
+#/* Save configuration to disk. */
+#/*******************************/
+def SaveConfig():
+	File = open("CONFIG/CONFIG.CFG", 'w')
+	File.write("FontName=" + str(ConfigValues["FontName"]) + "\n")
+	File.write("SerialPort=" + str(ConfigValues["SerialPort"]) + "\n")
+	File.write("Vehicle=" + str(ConfigValues["Vehicle"]) + "\n")
+	File.write("Debug=" + str(ConfigValues["Debug"]) + "\n")
+	File.write("CaptureFile=" + str(ConfigValues["CaptureFile"]) + "\n")
+	File.write("ReplayFile=" + str(ConfigValues["ReplayFile"]) + "\n")
+	File.write("ReplaySpeed=" + str(ConfigValues["ReplaySpeed"]) + "\n")
+	File.write("Headers=" + str(ConfigValues["Headers"]) + "\n")
+	File.write("EcuAddress=" + str(ConfigValues["EcuAddress"]) + "\n")
+	File.write("TcpEndpoints=" + str(ConfigValues["TcpEndpoints"]) + "\n")
+	File.close()
@@ -0,0 +1,615 @@
+#!/usr/bin/python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: Daemon, DaemonClient                                             */
+#/* Headless daemon which owns the ELM327 device, so several programs, such */
+#/* as PiOBDII, a logger and command line queries, can use the vehicle at   */
+#/* the same time. Clients connect to a Unix socket, see RemoteELM327 for   */
+#/* the messages.                                                           */
+#/*                                                                         */
+#/* All ELM327 communications run in turn on a command queue. Mode 01 PIDs  */
+#/* asked for by any client, and the subscribed PIDs due for each client,   */
+#/* are requested together in one sweep through a PID store, so a PID       */
+#/* wanted by several clients is only requested once. Identical calls of    */
+#/* other functions waiting to run are run once for all clients waiting.    */
+#/* The daemon reports the fraction of time the link is busy and the        */
+#/* throughput of each client.                                              */
+#/*                                                                         */
+#/* Usage: ./Daemon.py [--port SerialPort] [--socket Name] [--report Secs]  */
+#/***************************************************************************/
+
+
+
+import os
+import sys
+import time
+import json
+import socket
+import select
+import argparse
+import threading
+import ELM327
+import SocketCan
+import RemoteELM327
+import CommandQueue
+import PidStore
+import ConfigFile
+
+
+
+# Seconds a client may take to accept a message before it is disconnected.
+SEND_TIME_OUT = 2.0
+
+# Calls answered from the daemon state, without using the ELM327 device.
+LOCAL_CALLS = ["GetState", "GetMilOn", "GetFreezeFrameCount", "GetInitResult", "GetPidRate", "GetPidDeadband", "GetDaemonInfo", "SetName", "Subscribe"]
+
+# Calls which use the ELM327 device, run on the command queue.
+LINK_CALLS = ["Connect", "GetInfo", "GetValidPIDs", "GetFreezeFrame", "DoPID"]
+
+
+
+class DaemonClient:
+	def __init__(self, Connection, Number):
+		self.Connection = Connection
+		self.Connection.settimeout(SEND_TIME_OUT)
+		self.Name = "CLIENT " + str(Number)
+		# Protects sending, messages are sent from both daemon threads.
+		self.Lock = threading.Lock()
+		self.Open = True
+		# Data received which is not yet a complete message.
+		self.Received = b''
+		# Rate in Hz and time next due of each subscribed PID.
+		self.Subscriptions = {}
+		self.ConnectTime = time.perf_counter()
+		self.RequestCount = 0
+		self.ValueCount = 0
+		self.BytesReceived = 0
+		self.BytesSent = 0
+
+
+
+#/*****************************************************************/
+#/* Send a message to the client. A client which fails to accept  */
+#/* it in time is closed.                                         */
+#/*****************************************************************/
+	def Send(self, Message):
+		Data = RemoteELM327.EncodeMessage(Message)
+		with self.Lock:
+			if self.Open == True:
+				try:
+					self.Connection.sendall(Data)
+					self.BytesSent += len(Data)
+				except Exception as Catch:
+					print(self.Name + " : " + str(Catch))
+					self.Open = False
+
+
+
+#/*****************************************************************/
+#/* Close the connection to the client.                           */
+#/*****************************************************************/
+	def Close(self):
+		with self.Lock:
+			self.Open = False
+			self.Connection.close()
+
+
+
+#/*****************************************************************/
+#/* Get the throughput of the client since it connected.          */
+#/*****************************************************************/
+	def GetInfo(self):
+		Seconds = max(time.perf_counter() - self.ConnectTime, 0.001)
+
+		Result = "Client " + self.Name + "|" + "{:1.1f}".format(self.ValueCount / Seconds) + " values/s "
+		Result += "{:1.1f}".format(self.RequestCount / Seconds) + " calls/s "
+		Result += "{:1.2f}".format((self.BytesReceived + self.BytesSent) / Seconds / 1024) + " kB/s, "
+		Result += str(len(self.Subscriptions)) + " subscribed\n"
+
+		return Result
+
+
+
+class Daemon:
+	def __init__(self, ThisELM327, SocketName = RemoteELM327.DAEMON_SOCKET_NAME, ReportPeriod = 0.0):
+		self.ThisELM327 = ThisELM327
+		self.SocketName = SocketName
+		# Seconds between printing the statistics, 0 for never.
+		self.ReportPeriod = ReportPeriod
+		self.ThisCommandQueue = CommandQueue.CommandQueue()
+		# Latest PID values, shared by the clients.
+		self.ThisPidStore = PidStore.PidStore(ThisELM327)
+		# Protects the clients, subscriptions and requests waiting to run.
+		self.Lock = threading.Lock()
+		self.Clients = []
+		self.ClientNumber = 0
+		# Mode 01 PID requests waiting for the next sweep, [Client, Id, PIDs, Single].
+		self.PendingReads = []
+		self.SweepQueued = False
+		# Clients and call ids waiting for each call queued, by call and arguments.
+		self.PendingCalls = {}
+		# Result of the last connection to the vehicle, None until connected.
+		self.ConnectResult = None
+		self.Listener = None
+		# Wakes the main loop when a sweep has run, so due subscriptions are checked again.
+		self.WakeReceive, self.WakeSend = socket.socketpair()
+		self.ResetStatistics()
+
+
+
+#/*****************************************************************/
+#/* Clear the link busy time and sweep counts.                    */
+#/*****************************************************************/
+	def ResetStatistics(self):
+		with self.Lock:
+			self.StatisticsTime = time.perf_counter()
+			self.BusyTime = 0.0
+			self.SweepCount = 0
+			self.RequestedCount = 0
+			self.MergedCount = 0
+
+
+
+#/*****************************************************************/
+#/* Listen on the daemon socket, replacing a socket left by a     */
+#/* daemon which has stopped. Return the daemon port name.        */
+#/*****************************************************************/
+	def Open(self):
+		if os.path.exists(self.SocketName):
+			Probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+			try:
+				Probe.connect(self.SocketName)
+				Probe.close()
+				raise OSError("Daemon already running on " + self.SocketName)
+			except ConnectionRefusedError:
+				Probe.close()
+				os.unlink(self.SocketName)
+		self.Listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self.Listener.bind(self.SocketName)
+		self.Listener.listen()
+		self.Listener.setblocking(False)
+
+		return RemoteELM327.DAEMON_PREFIX + self.SocketName
+
+
+
+#/*****************************************************************/
+#/* Stop the daemon, closing the clients, the command queue and   */
+#/* the ELM327 device.                                            */
+#/*****************************************************************/
+	def Close(self):
+		with self.Lock:
+			Clients = self.Clients
+			self.Clients = []
+		for Client in Clients:
+			Client.Close()
+		if self.Listener != None:
+			self.Listener.close()
+			self.Listener = None
+			try:
+				os.unlink(self.SocketName)
+			except OSError:
+				pass
+		self.ThisCommandQueue.Close()
+		self.ThisELM327.Close()
+
+
+
+#/*****************************************************************/
+#/* Run a command which uses the ELM327 device, adding the time   */
+#/* taken to the link busy time.                                  */
+#/*****************************************************************/
+	def RunLink(self, Function, *Args):
+		StartTime = time.perf_counter()
+		try:
+			Result = Function(*Args)
+		finally:
+			with self.Lock:
+				self.BusyTime += time.perf_counter() - StartTime
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Connect to the vehicle, forgetting the PID values of any      */
+#/* previous connection.                                          */
+#/*****************************************************************/
+	def Connect(self, PhaseCallback):
+		self.ConnectResult = self.ThisELM327.Connect(PhaseCallback)
+		self.ThisPidStore.Clear()
+
+		return self.ConnectResult
+
+
+
+#/*****************************************************************/
+#/* Get the ELM327 device information with the daemon statistics. */
+#/*****************************************************************/
+	def GetInfo(self):
+		return self.ThisELM327.GetInfo() + self.GetDaemonInfo()
+
+
+
+#/*****************************************************************/
+#/* Get the connection state clients keep, so they can answer     */
+#/* the MIL, valid PID and PID rate functions themselves.         */
+#/*****************************************************************/
+	def GetState(self):
+		Result = {}
+
+		ValidPIDs = self.ThisELM327.GetValidPIDs()
+		Result["IsCAN"] = self.ThisELM327.IsCAN
+		Result["MilOn"] = self.ThisELM327.GetMilOn()
+		Result["FreezeFrameCount"] = self.ThisELM327.GetFreezeFrameCount()
+		Result["InitResult"] = self.ThisELM327.GetInitResult()
+		Result["ValidPIDs"] = ValidPIDs
+		Result["PidRates"] = { PID: self.ThisELM327.GetPidRate(PID) for PID in ValidPIDs }
+		Result["PidDeadbands"] = { PID: self.ThisELM327.GetPidDeadband(PID) for PID in ValidPIDs }
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the link busy time as a fraction of the time since the    */
+#/* statistics were cleared, how many PID requests were merged,   */
+#/* and the throughput of each client.                            */
+#/*****************************************************************/
+	def GetDaemonInfo(self):
+		Result = ""
+
+		with self.Lock:
+			Seconds = max(time.perf_counter() - self.StatisticsTime, 0.001)
+			Result += "Daemon Socket|" + RemoteELM327.DAEMON_PREFIX + self.SocketName + "\n"
+			Result += "Daemon Clients|" + str(len(self.Clients)) + "\n"
+			Result += "Link Busy|" + "{:1.1f}".format(100 * self.BusyTime / Seconds) + " % of " + "{:1.0f}".format(Seconds) + " s\n"
+			Result += "Daemon Sweeps|" + str(self.SweepCount) + " " + "{:1.1f}".format(self.SweepCount / Seconds) + "/s\n"
+			Result += "PID Requests Merged|" + str(self.MergedCount) + " of " + str(self.RequestedCount) + "\n"
+			for Client in self.Clients:
+				Result += Client.GetInfo()
+		Result += self.ThisPidStore.GetStatistics()
+		Result += self.ThisCommandQueue.GetStatistics()
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Send each phase of a connection to the clients waiting for    */
+#/* it, and print it.                                             */
+#/*****************************************************************/
+	def ConnectProgress(self, Key, Phase, Elapsed):
+		print("{:5.1f}s ".format(Elapsed) + Phase)
+		with self.Lock:
+			Waiting = list(self.PendingCalls.get(Key, []))
+		for Client, Id in Waiting:
+			if Client != None:
+				Client.Send({ "Id": Id, "Progress": [Phase, Elapsed] })
+
+
+
+#/*****************************************************************/
+#/* Queue a call which uses the ELM327 device. A call identical   */
+#/* to one already queued is not queued again, its result is sent */
+#/* to all the clients waiting. A client of None is the daemon.   */
+#/*****************************************************************/
+	def QueueCall(self, Client, Id, Call, Args):
+		Key = Call + json.dumps(Args)
+		with self.Lock:
+			if Key in self.PendingCalls:
+				self.PendingCalls[Key].append([Client, Id])
+				self.MergedCount += 1
+				return
+			self.PendingCalls[Key] = [[Client, Id]]
+
+		if Call == "Connect":
+			Function = self.Connect
+			Args = [lambda Phase, Elapsed: self.ConnectProgress(Key, Phase, Elapsed)]
+		elif Call == "GetInfo":
+			Function = self.GetInfo
+		else:
+			Function = getattr(self.ThisELM327, Call)
+		Future = self.ThisCommandQueue.Submit(self.RunLink, tuple([Function] + list(Args)), CommandQueue.PRIORITY_UI)
+		Future.add_done_callback(lambda Future: self.FinishCall(Key, Future))
+
+
+
+#/*****************************************************************/
+#/* Send the result of a queued call to all the clients waiting.  */
+#/*****************************************************************/
+	def FinishCall(self, Key, Future):
+		with self.Lock:
+			Waiting = self.PendingCalls.pop(Key, [])
+
+		try:
+			Message = { "Result": Future.result() }
+		except Exception as Catch:
+			Message = { "Error": str(Catch) }
+		for Client, Id in Waiting:
+			if Client != None:
+				Message["Id"] = Id
+				Client.Send(Message)
+
+
+
+#/*****************************************************************/
+#/* Queue a sweep, unless one is already waiting to run.          */
+#/*****************************************************************/
+	def QueueSweep(self, Priority):
+		with self.Lock:
+			if self.SweepQueued == True:
+				return
+			self.SweepQueued = True
+		self.ThisCommandQueue.Submit(self.Sweep, (), Priority)
+
+
+
+#/*****************************************************************/
+#/* Request the Mode 01 PIDs clients asked for, and the           */
+#/* subscribed PIDs which are due, all together through the PID   */
+#/* store. Requests get fresh values. Subscriptions accept values */
+#/* read within half their period, so a PID just read for another */
+#/* client is not requested again. Run on the command queue.      */
+#/*****************************************************************/
+	def Sweep(self):
+		with self.Lock:
+			self.SweepQueued = False
+			Reads = self.PendingReads
+			self.PendingReads = []
+			Now = time.perf_counter()
+			Tolerance = None
+			PIDs = []
+			for Client, Id, ReadPIDs, Single in Reads:
+				Tolerance = 0.0
+				PIDs += ReadPIDs
+			# Subscribed PIDs due for each client.
+			DuePIDs = {}
+			for Client in self.Clients:
+				for PID in Client.Subscriptions:
+					Subscription = Client.Subscriptions[PID]
+					Rate, DueTime = Subscription
+					if DueTime <= Now:
+						DuePIDs.setdefault(Client, []).append(PID)
+						PIDs.append(PID)
+						if Tolerance == None or Tolerance > 0.5 / Rate:
+							Tolerance = 0.5 / Rate
+						# Keep to the rate, unless too late to catch up.
+						Subscription[1] = max(DueTime + 1.0 / Rate, Now)
+			Unique = []
+			for PID in PIDs:
+				if PID not in Unique:
+					Unique.append(PID)
+			self.SweepCount += 1
+			self.RequestedCount += len(PIDs)
+			self.MergedCount += len(PIDs) - len(Unique)
+
+		PidData = {}
+		if len(Unique) > 0:
+			try:
+				PidData = self.RunLink(self.ThisPidStore.GetPIDs, Unique, Tolerance)
+			except Exception as Catch:
+				print(ELM327.STRING_ERROR + " in sweep " + str(Unique) + " : " + str(Catch))
+
+		for Client, Id, ReadPIDs, Single in Reads:
+			if Single == True:
+				Result = PidData.get(ReadPIDs[0], ELM327.STRING_NO_DATA)
+			else:
+				Result = { PID: PidData.get(PID, ELM327.STRING_NO_DATA) for PID in ReadPIDs }
+			Client.ValueCount += len(ReadPIDs)
+			Client.Send({ "Id": Id, "Result": Result })
+		Time = time.time()
+		for Client in DuePIDs:
+			Client.ValueCount += len(DuePIDs[Client])
+			Client.Send({ "Time": Time, "Values": { PID: PidData.get(PID, ELM327.STRING_NO_DATA) for PID in DuePIDs[Client] } })
+		self.WakeSend.send(b'\0')
+
+
+
+#/*****************************************************************/
+#/* Answer a call from the daemon state.                          */
+#/*****************************************************************/
+	def DoLocalCall(self, Client, Call, Args):
+		Result = True
+
+		if Call == "GetState":
+			Result = self.GetState()
+		elif Call == "GetDaemonInfo":
+			Result = self.GetDaemonInfo()
+		elif Call == "SetName":
+			Client.Name = str(Args[0])
+		elif Call == "Subscribe":
+			PID = str(Args[0])
+			Rate = float(Args[1])
+			with self.Lock:
+				if Rate > 0:
+					Client.Subscriptions[PID] = [Rate, time.perf_counter()]
+				else:
+					Client.Subscriptions.pop(PID, None)
+		else:
+			Result = getattr(self.ThisELM327, Call)(*Args)
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Act on a call from a client. Mode 01 PIDs wait for the next   */
+#/* sweep, other calls using the ELM327 device are queued, and    */
+#/* the rest are answered at once. A client connecting to a       */
+#/* vehicle the daemon is connected to shares the connection.     */
+#/*****************************************************************/
+	def DoCall(self, Client, Message):
+		Id = Message.get("Id")
+		Call = Message.get("Call", "")
+		Args = Message.get("Args", [])
+		Client.RequestCount += 1
+
+		try:
+			if Call == "DoPIDs":
+				PIDs = [str(PID) for PID in Args[0]]
+				with self.Lock:
+					self.PendingReads.append([Client, Id, PIDs, False])
+				self.QueueSweep(CommandQueue.PRIORITY_UI)
+			elif Call == "DoPID" and len(Args) == 1 and len(str(Args[0])) == 4 and str(Args[0])[:2] == '01':
+				with self.Lock:
+					self.PendingReads.append([Client, Id, [str(Args[0])], True])
+				self.QueueSweep(CommandQueue.PRIORITY_UI)
+			elif Call == "Connect" and self.ConnectResult == ELM327.CONNECT_SUCCESS:
+				Client.Send({ "Id": Id, "Result": self.ConnectResult })
+			elif Call in LINK_CALLS:
+				self.QueueCall(Client, Id, Call, Args)
+			elif Call in LOCAL_CALLS:
+				Client.Send({ "Id": Id, "Result": self.DoLocalCall(Client, Call, Args) })
+			else:
+				Client.Send({ "Id": Id, "Error": "Unknown call: " + str(Call) })
+		except Exception as Catch:
+			Client.Send({ "Id": Id, "Error": str(Catch) })
+
+
+
+#/*****************************************************************/
+#/* Receive data from a client, acting on each complete message.  */
+#/* A client which has closed its connection is removed.          */
+#/*****************************************************************/
+	def ReceiveClient(self, Client):
+		try:
+			Data = Client.Connection.recv(RemoteELM327.RECEIVE_SIZE)
+		except OSError:
+			Data = b''
+
+		if Data == b'':
+			self.RemoveClient(Client)
+		else:
+			Client.BytesReceived += len(Data)
+			Messages, Client.Received = RemoteELM327.SplitMessages(Client.Received + Data)
+			for Message in Messages:
+				self.DoCall(Client, Message)
+
+
+
+#/*****************************************************************/
+#/* Remove a client, with its subscriptions.                      */
+#/*****************************************************************/
+	def RemoveClient(self, Client):
+		with self.Lock:
+			if Client in self.Clients:
+				self.Clients.remove(Client)
+		Client.Close()
+
+
+
+#/*****************************************************************/
+#/* Get the seconds until the next subscribed PID is due, or None */
+#/* when there are no subscriptions.                              */
+#/*****************************************************************/
+	def GetNextDue(self, Now):
+		Result = None
+
+		with self.Lock:
+			for Client in self.Clients:
+				for Rate, DueTime in Client.Subscriptions.values():
+					if Result == None or DueTime - Now < Result:
+						Result = max(0.0, DueTime - Now)
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Main loop. Accept clients, receive their calls, queue a sweep */
+#/* when subscribed PIDs are due, and print the statistics every  */
+#/* report period.                                                */
+#/*****************************************************************/
+	def Run(self):
+		NextReport = time.perf_counter() + self.ReportPeriod
+		while True:
+			for Client in list(self.Clients):
+				if Client.Open == False:
+					self.RemoveClient(Client)
+
+			Now = time.perf_counter()
+			TimeOut = None
+			if self.SweepQueued == False:
+				TimeOut = self.GetNextDue(Now)
+				if TimeOut == 0.0:
+					self.QueueSweep(CommandQueue.PRIORITY_POLL)
+					TimeOut = None
+			if self.ReportPeriod > 0:
+				if Now >= NextReport:
+					print(self.GetDaemonInfo())
+					NextReport = Now + self.ReportPeriod
+				if TimeOut == None or TimeOut > NextReport - Now:
+					TimeOut = NextReport - Now
+
+			Sockets = [self.Listener, self.WakeReceive] + [Client.Connection for Client in self.Clients]
+			for Ready in select.select(Sockets, [], [], TimeOut)[0]:
+				if Ready == self.Listener:
+					try:
+						Connection = self.Listener.accept()[0]
+					except OSError:
+						continue
+					self.ClientNumber += 1
+					with self.Lock:
+						self.Clients.append(DaemonClient(Connection, self.ClientNumber))
+				elif Ready == self.WakeReceive:
+					self.WakeReceive.recv(RemoteELM327.RECEIVE_SIZE)
+				else:
+					for Client in list(self.Clients):
+						if Client.Connection == Ready:
+							self.ReceiveClient(Client)
+
+
+
+if __name__ == "__main__":
+	Parser = argparse.ArgumentParser(description = "Share one ELM327 device between several clients on a Unix socket.")
+	Parser.add_argument("--port", default = None, help = "serial port, tcp:// or can:// name of the ELM327 device, the configured serial port when not given")
+	Parser.add_argument("--socket", default = RemoteELM327.DAEMON_SOCKET_NAME, help = "name of the daemon socket")
+	Parser.add_argument("--report", type = float, default = 0.0, help = "print the statistics every this many seconds")
+	Arguments = Parser.parse_args()
+
+	ConfigFile.LoadConfig()
+	ELM327.DEBUG = ConfigFile.ConfigValues["Debug"]
+	ELM327.SERIAL_PORT_NAME = ConfigFile.ConfigValues["SerialPort"]
+	if Arguments.port != None:
+		ELM327.SERIAL_PORT_NAME = Arguments.port
+	ELM327.CAPTURE_FILE_NAME = ConfigFile.ConfigValues["CaptureFile"]
+	ELM327.REPLAY_FILE_NAME = ConfigFile.ConfigValues["ReplayFile"]
+	ELM327.REPLAY_SPEED = float(ConfigFile.ConfigValues["ReplaySpeed"])
+	ELM327.HEADERS = ConfigFile.ConfigValues["Headers"]
+	ELM327.ECU_ADDRESS = ConfigFile.ConfigValues["EcuAddress"]
+	if RemoteELM327.IsDaemonName(ELM327.SERIAL_PORT_NAME):
+		print("THE DAEMON CAN'T USE ITSELF, SET THE ELM327 DEVICE WITH --port")
+		sys.exit(1)
+
+	if SocketCan.IsCanName(ELM327.SERIAL_PORT_NAME):
+		ThisELM327 = SocketCan.SocketCanELM327()
+	else:
+		ThisELM327 = ELM327.ELM327()
+	ThisELM327.LoadVehicle(ConfigFile.ConfigValues["Vehicle"])
+	ThisDaemon = Daemon(ThisELM327, Arguments.socket, Arguments.report)
+	try:
+		print("ELM327 DAEMON ON " + ThisDaemon.Open() + " FOR " + str(ELM327.SERIAL_PORT_NAME))
+		# Connect to the vehicle now, clients connecting meanwhile wait for this connection.
+		ThisDaemon.QueueCall(None, None, "Connect", [])
+		ThisDaemon.Run()
+	except KeyboardInterrupt:
+		pass
+	except Exception as Catch:
+		print(str(Catch))
+	ThisDaemon.Close()
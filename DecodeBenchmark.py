@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Micro benchmark of Mode 01 response decoding. Compares the hex text     */
+#/* decoding previously used, PruneData joining strings and int(Text, 16)   */
+#/* on slices, with the ELM327 class decoding the data as bytes. Responses  */
+#/* are taken from a capture file when one is given, otherwise generated    */
+#/* by the emulator. Both decodings must give the same values.              */
+#/*                                                                         */
+#/* Usage: ./DecodeBenchmark.py [CaptureFile]                               */
+#/***************************************************************************/
+
+
+
+import sys
+import time
+import tracemalloc
+import ELM327
+import Capture
+import Emulator
+
+
+
+# Number of times the sample responses are decoded for timing.
+REPEAT_COUNT = 20
+
+# Number of responses generated when no capture file is given.
+SAMPLE_COUNT = 5000
+
+# PIDs requested in each generated batch response.
+SAMPLE_PIDS = ["04", "05", "0B", "0C", "0D", "0F", "10", "11"]
+
+# Hex text decoding of each sample PID, as the PID functions decoded it before.
+TextFormulas = {
+	"0104": lambda Response: 100 * int(Response, 16) / 255,
+	"0105": lambda Response: int(Response, 16) - 40,
+	"010B": lambda Response: int(Response, 16),
+	"010C": lambda Response: (256 * int(Response[:2], 16) + int(Response[2:4], 16)) / 4,
+	"010D": lambda Response: int(Response[:2], 16) * 0.621371,
+	"010F": lambda Response: int(Response[:2], 16) - 40,
+	"0110": lambda Response: (256 * int(Response[:2], 16) + int(Response[2:4], 16)) / 100,
+	"0111": lambda Response: 100 * int(Response[:2], 16) / 255,
+}
+
+
+
+#/*****************************************************************/
+#/* Split a batched response into hex text for each PID, as       */
+#/* ELM327.SplitBatchResponse did before decoding as bytes.       */
+#/*****************************************************************/
+def SplitBatchText(Response):
+	Payloads = {}
+
+	Messages = []
+	for Line in Response.split('\n'):
+		Line = Line.strip()
+		if len(Line) == 3:
+			Messages.append(["", 2 * int(Line, 16)])
+		elif Line[1:2] == ':' and len(Messages) > 0:
+			Messages[-1][0] += Line[2:]
+		elif Line != "":
+			Messages.append([Line, len(Line)])
+
+	for Message, Length in Messages:
+		Message = Message[:Length]
+		if Message[:2] == '41':
+			Position = 2
+			while Position + 2 <= len(Message):
+				PID = Message[Position:Position + 2]
+				if PID not in ELM327.PidDataBytes:
+					break
+				DataEnd = Position + 2 + 2 * ELM327.PidDataBytes[PID]
+				if '01' + PID not in Payloads and DataEnd <= len(Message):
+					Payloads['01' + PID] = Message[Position + 2:DataEnd]
+				Position = DataEnd
+
+	return Payloads
+
+
+
+#/*****************************************************************/
+#/* Decode responses with hex text.                               */
+#/*****************************************************************/
+def DecodeText(ThisELM327, Responses):
+	Result = []
+
+	for Response in Responses:
+		Values = {}
+		Payloads = SplitBatchText(Response)
+		for PID in Payloads:
+			if PID in TextFormulas:
+				Values[PID] = TextFormulas[PID](Payloads[PID])
+		Result.append(Values)
+
+	return Result
+
+
+
+#/*****************************************************************/
+#/* Decode responses with the ELM327 class, as bytes.             */
+#/*****************************************************************/
+def DecodeBytes(ThisELM327, Responses):
+	Result = []
+
+	for Response in Responses:
+		Values = {}
+		Decoded = ThisELM327.ThisPidDecoder.DecodePayloads(ThisELM327.SplitBatchResponse(Response), ELM327.STRING_ERROR)
+		for PID in Decoded:
+			if PID in TextFormulas:
+				Values[PID] = Decoded[PID]
+		Result.append(Values)
+
+	return Result
+
+
+
+#/*****************************************************************/
+#/* Get the Mode 01 responses in a capture file, decoded to text  */
+#/* as the ELM327 class receives them.                            */
+#/*****************************************************************/
+def LoadResponses(ThisELM327, FileName):
+	Result = []
+
+	Request = b''
+	ReceivedData = bytearray()
+	for Seconds, Type, Data in Capture.LoadCapture(FileName) + [[0.0, Capture.RECORD_SEND, b'']]:
+		if Type == Capture.RECORD_RECEIVE:
+			ReceivedData += Data
+		elif Type == Capture.RECORD_SEND:
+			if Request[:2] == b'01' and len(Request) > 5:
+				Result.append(ThisELM327.DecodeResponse(bytes(ReceivedData).split(b'>')[0], time.perf_counter()))
+			Request = Data
+			ReceivedData = bytearray()
+
+	return Result
+
+
+
+#/*****************************************************************/
+#/* Generate batched Mode 01 responses with the emulator.         */
+#/*****************************************************************/
+def GenerateResponses(ThisELM327):
+	Result = []
+
+	ThisEmulator = Emulator.Emulator()
+	ThisEmulator.Spaces = False
+	for Count in range(SAMPLE_COUNT):
+		Data = [0x41]
+		for PID in SAMPLE_PIDS:
+			Data += [int(PID, 16)] + ThisEmulator.GetPidBytes(PID, Count / 10)
+		Lines = ThisEmulator.FormatEcuData(ThisEmulator.Ecus[0], Data)
+		Result.append(ThisELM327.DecodeResponse(bytes("\r".join(Lines), 'utf-8'), time.perf_counter()))
+
+	return Result
+
+
+
+#/*****************************************************************/
+#/* Time a decoding, and measure the peak memory used decoding    */
+#/* each response.                                                */
+#/*****************************************************************/
+def Measure(Function, ThisELM327, Responses):
+	StartTime = time.perf_counter()
+	for Count in range(REPEAT_COUNT):
+		Function(ThisELM327, Responses)
+	Seconds = (time.perf_counter() - StartTime) / REPEAT_COUNT
+
+	Values = []
+	PeakBytes = 0
+	tracemalloc.start()
+	for Response in Responses:
+		Current, Peak = tracemalloc.get_traced_memory()
+		tracemalloc.reset_peak()
+		Values += Function(ThisELM327, [Response])
+		PeakBytes += tracemalloc.get_traced_memory()[1] - Current
+	tracemalloc.stop()
+
+	return Seconds, PeakBytes, Values
+
+
+
+if __name__ == "__main__":
+	ThisELM327 = ELM327.ELM327()
+	for PID in TextFormulas:
+		ThisELM327.ValidPIDs[PID] = ""
+
+	if len(sys.argv) > 1:
+		Responses = LoadResponses(ThisELM327, sys.argv[1])
+	else:
+		Responses = GenerateResponses(ThisELM327)
+	print("RESPONSES: " + str(len(Responses)))
+
+	TextSeconds, TextPeakBytes, TextValues = Measure(DecodeText, ThisELM327, Responses)
+	BytesSeconds, BytesPeakBytes, BytesValues = Measure(DecodeBytes, ThisELM327, Responses)
+	if TextValues != BytesValues:
+		print("DECODED VALUES DIFFER")
+		sys.exit(1)
+
+	SampleCount = max(1, sum(len(Values) for Values in TextValues))
+	print("SAMPLES: " + str(SampleCount))
+	print("TEXT:  " + "{:7.2f}".format(1000000 * TextSeconds / SampleCount) + " us/sample " + "{:7.1f}".format(TextPeakBytes / SampleCount) + " bytes/sample peak")
+	print("BYTES: " + "{:7.2f}".format(1000000 * BytesSeconds / SampleCount) + " us/sample " + "{:7.1f}".format(BytesPeakBytes / SampleCount) + " bytes/sample peak")
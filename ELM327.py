@@ -29,7 +29,9 @@
 #/            - Added PID 01- 31
 
 import time
-import serial
+import Transport
+import PidDecoder
+import IsoTp
 
 DEBUG = "OFF"
 
@@ -46,12 +48,66 @@ SERIAL_PORT_BAUD_3 = 115200
 SERIAL_PORT_BAUD_4 = 230400
 SERIAL_PORT_BAUD_5 = 500000
 SERIAL_PORT_TIME_OUT = 7
+
+# File to capture serial traffic to, and capture file to replay in place of the serial port.
+CAPTURE_FILE_NAME = ""
+REPLAY_FILE_NAME = ""
+# Times faster than captured to replay, or Capture.REPLAY_FAST.
+REPLAY_SPEED = 1.0
+
+# Baud rates to try, fastest first, with the ELM327 baud rate divisor command for each.
+BAUD_RATE_LADDER = [
+	(SERIAL_PORT_BAUD_5, b'AT BRD 08\r'),
+	(SERIAL_PORT_BAUD_4, b'AT BRD 11\r'),
+	(SERIAL_PORT_BAUD_3, b'AT BRD 23\r'),
+	(SERIAL_PORT_BAUD_2, b'AT BRD 45\r'),
+]
+BAUD_RATE_BASE_COMMAND = b'AT BRD 68\r'
+BAUD_PROBE_COUNT = 4
+BAUD_FILE_NAME = "CONFIG/BAUD.CFG"
 SERIAL_LINEFEED_TYPE = b'\r'
 #SERIAL_LINEFEED_TYPE = b'\r\n'
 
+# Received data translation, carriage return to linefeed, characters above 127 removed.
+RESPONSE_TRANSLATE = bytes.maketrans(b'\r', b'\n')
+RESPONSE_DELETE = bytes(range(128, 256))
+
 # ELM327 Device related constants.
-ELM_RESET_PERIOD = 1
-ELM_CONNECT_SETTLE_PERIOD = 5
+ELM_POLL_PERIOD = 0.1
+
+# Connection phases reported to the caller, and the time out for each phase in seconds.
+PHASE_OPEN = "OPEN SERIAL PORT"
+PHASE_RESET = "RESET ELM327"
+PHASE_CONFIGURE = "CONFIGURE ELM327"
+PHASE_PROTOCOL = "CONNECT TO OBDII"
+PHASE_DISCOVERY = "FIND SUPPORTED PIDS"
+PHASE_TIMING = "TUNE TIMING"
+PHASE_DONE = "CONNECTED"
+PHASE_FAILED = "FAILED"
+PhaseTimeOuts = {
+	PHASE_OPEN: 2,
+	PHASE_RESET: 5,
+	PHASE_CONFIGURE: 2,
+	PHASE_PROTOCOL: 20,
+	PHASE_DISCOVERY: 5,
+	PHASE_TIMING: 5,
+}
+
+# ELM327 response timeout tuning, AT ST values in 4ms steps from the default down to the fastest tried.
+ELM_TIMEOUT_STEPS = [0x32, 0x19, 0x10, 0x0C, 0x08, 0x06, 0x04]
+ELM_TIMEOUT_MAX = 0xFF
+ELM_TUNE_SAMPLE_COUNT = 8
+ELM_TUNE_BACKOFF_COUNT = 3
+TIMING_FILE_NAME = "CONFIG/TIMING.CFG"
+
+# Vehicle capabilities saved between connections, and the Mode 09 PIDs which never change for a vehicle.
+CAPABILITY_FILE_NAME = "CONFIG/VEHICLES.CFG"
+STATIC_PIDS = ["0902", "0904", "0906", "090A"]
+
+# Protocol search used when the vehicle protocol is not known, or the known protocol fails: try ISO 9141-2, then auto detect.
+PROTOCOL_SEARCH = "A3"
+# A vehicle file line of the form "PROTOCOL 6" pins the protocol used for that vehicle.
+PROTOCOL_PIN_KEY = "PROTOCOL"
 
 # Constant string responses.
 STRING_NOT_IMPLEMENTED = "!NOT IMPLEMENTED!"
@@ -82,11 +138,123 @@ FIELD_PID_LOW_2 = 14
 FIELD_PID_BLU_2 = 15
 FIELD_PID_RED_2 = 16
 
+# Optional trailing field giving the target polling rate of a PID in Hz, removed from the description when loaded.
+FIELD_PID_RATE = "RATE="
+# Target polling rate of PIDs without a rate field.
+DEFAULT_PID_RATE = 1.0
+# Optional trailing field giving the change in value of a PID which is treated as steady, removed from the description when loaded.
+FIELD_PID_DEADBAND = "DEADBAND="
+# Deadband of PIDs without a deadband field, as a fraction of the min to max range of the PID.
+DEFAULT_DEADBAND_FRACTION = 0.01
+
+
+# Maximum number of Mode 01 PIDs the ECU will answer in a single CAN request.
+BATCH_PID_COUNT = 6
+# Maximum number of Mode 02 PID and freeze frame number pairs in a single CAN request.
+BATCH_FREEZE_PID_COUNT = 3
+
+# Support PIDs, each a bitmap of the 32 PIDs following it, the lowest bit set when the next support PID is supported.
+SUPPORT_PIDS = ["00", "20", "40", "60", "80", "A0", "C0"]
+SUPPORT_PID_NUMBERS = { int(Start, 16): Start for Start in SUPPORT_PIDS }
+# The PID of each bit of a support PID bitmap, lowest bit first.
+SupportPidIndexes = { Start: ['%2.2X' % (int(Start, 16) + 32 - Bit) for Bit in range(32)] for Start in SUPPORT_PIDS }
+
+# OBDII protocol numbers (AT DPN) which are CAN protocols, and those with 29 bit CAN IDs.
+CAN_PROTOCOLS = "6789ABC"
+CAN_29_BIT_PROTOCOLS = "79"
+
+# Headers on keeps the CAN ID on each response line, to tell which ECU sent the data.
+HEADERS = "OFF"
+# CAN ID to physically address requests to, for example 7E0 for the engine ECU, or "" to broadcast.
+ECU_ADDRESS = ""
+# The functional broadcast CAN ID for 11 bit and 29 bit CAN IDs.
+BROADCAST_ADDRESSES = { IsoTp.HEADERS_11_BIT: "7DF", IsoTp.HEADERS_29_BIT: "DB33F1" }
+# CAN ID the engine ECU answers on, its data is used first where several ECUs answer.
+ENGINE_ECU_IDS = { IsoTp.HEADERS_11_BIT: "7E8", IsoTp.HEADERS_29_BIT: "18DAF110" }
+
+# Number of data bytes returned by each Mode 01 PID, used to split batched responses.
+PidDataBytes = {
+	"01": 4, "02": 2, "03": 2, "04": 1, "05": 1, "06": 1, "07": 1, "08": 1,
+	"09": 1, "0A": 1, "0B": 1, "0C": 2, "0D": 1, "0E": 1, "0F": 1, "10": 2,
+	"11": 1, "12": 1, "13": 1, "14": 2, "15": 2, "16": 2, "17": 2, "18": 2,
+	"19": 2, "1A": 2, "1B": 2, "1C": 1, "1D": 1, "1E": 1, "1F": 2, "20": 4,
+	"21": 2, "22": 2, "23": 2, "24": 4, "25": 4, "26": 4, "27": 4, "28": 4,
+	"29": 4, "2A": 4, "2B": 4, "2C": 1, "2D": 1, "2E": 1, "2F": 1, "30": 1,
+	"31": 2, "32": 2, "33": 1, "34": 4, "35": 4, "36": 4, "37": 4, "38": 4,
+	"39": 4, "3A": 4, "3B": 4, "3C": 2, "3D": 2, "3E": 2, "3F": 2, "40": 4,
+	"41": 4, "42": 2, "43": 2, "44": 2, "45": 1, "46": 1, "47": 1, "48": 1,
+	"49": 1, "4A": 1, "4B": 1, "4C": 1, "4D": 2, "4E": 2, "4F": 4, "50": 4,
+	"51": 1, "52": 1, "53": 2, "54": 2, "55": 2, "56": 2, "57": 2, "58": 2,
+	"59": 2, "5A": 1, "5B": 1, "5C": 1, "5D": 2, "5E": 2, "5F": 1, "60": 4,
+	"61": 1, "62": 1, "63": 2, "64": 5, "65": 2, "66": 5, "67": 3, "68": 7,
+	"69": 7, "6A": 5, "6B": 5, "6C": 5, "6D": 6, "6E": 5, "6F": 3, "70": 9,
+	"71": 5, "72": 5, "73": 5, "74": 5, "75": 7, "76": 7, "77": 5, "78": 9,
+	"79": 9, "7A": 7, "7B": 7, "7C": 9, "7D": 1, "7E": 1, "7F": 13, "80": 4,
+	"83": 5, "84": 1, "8D": 1, "8E": 1, "A0": 4, "A2": 2, "A4": 4, "A6": 4,
+	"C0": 4,
+}
+
+# Mode 01 PID data byte counts and PID names indexed by PID number, for decoding batched responses as bytes.
+PidDataLengths = [0] * 256
+for PidName in PidDataBytes:
+	PidDataLengths[int(PidName, 16)] = PidDataBytes[PidName]
+PidNames01 = ["01{:02X}".format(PidNumber) for PidNumber in range(256)]
+PidNames02 = ["02{:02X}".format(PidNumber) for PidNumber in range(256)]
+
 
 # PID Numbers and their function pointers implemented in this class.
 PidFunctions = {}
 
 
+
+#/*****************************************************************/
+#/* Load records saved to disk as lines of Key=Value|Name=Value,  */
+#/* returning a dictionary of the name value pairs for each key.  */
+#/* A replay runs without the saved records, so each replay of a  */
+#/* capture takes the same path whatever was saved since.         */
+#/*****************************************************************/
+def LoadRecords(FileName):
+	Records = {}
+
+	if REPLAY_FILE_NAME != "":
+		return Records
+
+	try:
+		with open(FileName) as ThisFile:
+			for ThisLine in ThisFile:
+				Fields = {}
+				for ThisElement in ThisLine.replace("\n", "").split('|'):
+					Name, Value = ThisElement.partition("=")[::2]
+					Fields[Name] = Value
+				if "Key" in Fields:
+					Records[Fields.pop("Key")] = Fields
+	except Exception as Catch:
+		if DEBUG == "ON":
+			print(STRING_ERROR + " " + FileName + " : " + str(Catch))
+
+	return Records
+
+
+
+#/*****************************************************************/
+#/* Save records to disk as lines of Key=Value|Name=Value. A      */
+#/* replay leaves the saved records unchanged.                    */
+#/*****************************************************************/
+def SaveRecords(FileName, Records):
+	if REPLAY_FILE_NAME != "":
+		return
+
+	try:
+		with open(FileName, 'w') as ThisFile:
+			for Key in sorted(Records):
+				Data = "Key=" + str(Key)
+				for Name in sorted(Records[Key]):
+					Data += "|" + Name + "=" + str(Records[Key][Name])
+				ThisFile.write(Data + "\n")
+	except Exception as Catch:
+		print(STRING_ERROR + " " + FileName + " : " + str(Catch))
+
+
 class ELM327:
 	def __init__(self):
 		self.InitResult = ""
@@ -95,6 +263,56 @@ class ELM327:
 		self.MilOn = False
 		self.FreezeFrameCount = 0
 
+		# OBDII protocol in use, and PID data already received in a batched request.
+		self.ProtocolNumber = ""
+		self.IsCAN = False
+		self.BatchPayloads = {}
+		# Freeze frame PID data already received in a batched request, by PID and freeze frame number,
+		# and the last snapshot of each freeze frame read, with the trouble code which stored it.
+		self.FreezePayloads = {}
+		self.FreezeFrames = {}
+		# Hex digits of the CAN ID on each response line, IsoTp.HEADERS_OFF while headers are off.
+		self.HeaderDigits = IsoTp.HEADERS_OFF
+		# CAN ID requests are physically addressed to, or "" to broadcast, and the ECU whose data is used first.
+		self.EcuAddress = ""
+		self.PrimaryEcu = ""
+		# Supported PIDs and their bitmaps for each ECU by CAN ID, found with headers on.
+		self.EcuValidPIDs = {}
+		self.EcuSupportData = {}
+
+		# Number of ECUs learned to answer each OBDII service, and if the last response was NO DATA.
+		self.ResponseCounts = {}
+		self.NoData = False
+
+		# ELM327 response timeout settings in use, and polling rates measured when tuning them.
+		self.VehicleId = ""
+		self.TimeoutValue = ELM_TIMEOUT_STEPS[0]
+		self.AdaptiveTiming = 1
+		self.TimingTuned = False
+		self.TimeoutFailCount = 0
+		self.PollRateBefore = 0.0
+		self.PollRateAfter = 0.0
+
+		# Supported PID bitmaps, responding ECU addresses and static vehicle data, saved between connections.
+		self.SupportData = {}
+		self.EcuAddresses = []
+		self.StaticData = {}
+		self.CapabilitiesCached = False
+
+		# Protocol selected directly from the pinned or saved protocol number, and the time an auto search takes.
+		self.ProtocolSource = ""
+		self.ProtocolSearchTime = 0.0
+		self.ProtocolConnectTime = 0.0
+
+		# Reusable receive buffer and serial link statistics.
+		self.ReceiveBuffer = bytearray()
+		self.PromptFound = False
+		self.BaudReport = []
+		self.PhaseCallback = None
+		self.ConnectStartTime = 0.0
+		self.ConnectTiming = []
+		self.ResetLinkStatistics()
+
 #  /*************************************************/
 # /* Read Vehicle OBD Standards lookup table data. */
 #/*************************************************/
@@ -156,14 +374,38 @@ class ELM327:
 # /* Read Mode 01 PID description lookup table data. */
 #/***************************************************/
 		self.PidDescriptionsMode01 = {}
+		self.PidRates = {}
+		self.PidDeadbands = {}
 		try:
 			with open("DATA/PidDescriptionsMode01.txt") as ThisFile:
 				for ThisLine in ThisFile:
 					Digit, Code = ThisLine.partition(" ")[::2]
-					self.PidDescriptionsMode01[Digit] = Code.strip()
+					# Take the target polling rate and deadband from the description, the remaining fields are the display definition.
+					Fields = []
+					for ThisField in Code.strip().split('|'):
+						if ThisField[:len(FIELD_PID_RATE)] == FIELD_PID_RATE:
+							# A PID without a positive rate is polled at the default rate.
+							Rate = float(ThisField[len(FIELD_PID_RATE):])
+							if Rate > 0.0:
+								self.PidRates['01' + Digit] = Rate
+						elif ThisField[:len(FIELD_PID_DEADBAND)] == FIELD_PID_DEADBAND:
+							self.PidDeadbands['01' + Digit] = float(ThisField[len(FIELD_PID_DEADBAND):])
+						else:
+							Fields.append(ThisField)
+					self.PidDescriptionsMode01[Digit] = "|".join(Fields)
 		except:
 			self.InitResult += "FAILED TO READ FILE: DATA/PidDescriptionsMode01.txt\n"
 
+#  /*************************************/
+# /* Read and compile PID formula data. */
+#/*************************************/
+		self.ThisPidDecoder = PidDecoder.PidDecoder()
+		try:
+			self.ThisPidDecoder.Load("DATA/PidFormulas.txt")
+		except Exception as Catch:
+			print(str(Catch))
+			self.InitResult += "FAILED TO READ FILE: DATA/PidFormulas.txt\n"
+
 #  /***************************************************/
 # /* Read Mode 05 PID description lookup table data. */
 #/***************************************************/
@@ -200,6 +442,8 @@ class ELM327:
 #/* Load the trouble codes for the configured vehicle. */
 #/******************************************************/
 	def LoadVehicle(self, VehicleFile):
+		self.VehicleFile = VehicleFile
+		self.PinnedProtocol = ""
 		self.TroubleCodeDescriptions = {}
 		# Load the ISO/SAE Trouble Code Descriptions.
 		try:
@@ -216,7 +460,10 @@ class ELM327:
 			with open(VehicleFile) as ThisFile:
 				for ThisLine in ThisFile:
 					Code, Description = ThisLine.partition(" ")[::2]
-					self.TroubleCodeDescriptions[Code] = Description.strip()
+					if Code == PROTOCOL_PIN_KEY:
+						self.PinnedProtocol = Description.strip().upper()
+					else:
+						self.TroubleCodeDescriptions[Code] = Description.strip()
 		except Exception as Catch:
 			print(STRING_ERROR + " " + VehicleFile + " : " + str(Catch))
 			self.InitResult += "FAILED TO READ FILE: " + VehicleFile + "\n"
@@ -315,6 +562,7 @@ class ELM327:
 			# Get the programmable paramaters.
 			Response = self.GetResponse(b'AT PPS\r')
 			Result += "ELM327 Programmable Paramaters:|\n" + Response
+			Result += self.GetConnectionInfo()
 		except:
 			Result += "\nWARNING: PARTIAL DATA RETURNED\nTHIS COULD BE A FAKE ELM327 DEVICE AND SHOULD NOT BE USED IF IT IS FAKE.\n"
 
@@ -322,30 +570,60 @@ class ELM327:
 
 
 
+#/*****************************************************************/
+#/* Get the link throughput, the vehicle capabilities and ECUs    */
+#/* found, the connection timing, baud rates tried and the        */
+#/* response timeout tuning.                                      */
+#/*****************************************************************/
+	def GetConnectionInfo(self):
+		Result = ""
+
+		Result += self.GetLinkStatistics()
+		if self.CapabilitiesCached == True:
+			Result += "Vehicle Capabilities|SAVED\n"
+		if len(self.EcuAddresses) > 0:
+			Result += "Responding ECUs|" + " ".join(self.EcuAddresses) + "\n"
+		if self.EcuAddress != "":
+			Result += "Addressed ECU|" + self.EcuAddress + "\n"
+		for EcuId in sorted(self.EcuValidPIDs):
+			Result += "ECU " + EcuId + " Supported PIDs|" + " ".join(sorted(self.EcuValidPIDs[EcuId])) + "\n"
+		Result += self.GetConnectTiming()
+		Result += self.GetBaudInfo()
+		Result += self.GetTimingInfo()
+
+		return Result
+
+
+
 #/********************************************************/
 #/* Connect the ELM327 device to the CAN BUS on the ECU. */
 #/* Then get a list of all of the valid PID addresses    */
 #/* the ECU supports.                                    */
 #/********************************************************/
-	def Connect(self):
+	def Connect(self, PhaseCallback = None):
 		Result = CONNECT_SUCCESS
 		self.InitResult = ""
+		self.PhaseCallback = PhaseCallback
+		self.ConnectStartTime = time.perf_counter()
+		self.ConnectTiming = []
+		self.SetPhase(PHASE_OPEN)
 
 #  /****************************************************************/
 # /* Open the required serial port which the ELM327 device is on. */
 #/****************************************************************/
 		try:
-			self.ELM327 = serial.Serial(SERIAL_PORT_NAME, SERIAL_PORT_BAUD_1)
+			self.ELM327 = Transport.OpenTransport(SERIAL_PORT_NAME, SERIAL_PORT_BAUD_1, REPLAY_FILE_NAME, REPLAY_SPEED, CAPTURE_FILE_NAME)
 			self.ELM327.timeout = SERIAL_PORT_TIME_OUT
 			self.ELM327.write_timeout = SERIAL_PORT_TIME_OUT
+			self.ResetConnection()
 
-			time.sleep(ELM_RESET_PERIOD)
+			# Initialize the ELM327 device, continuing as soon as it prompts after the reset.
+			self.SetPhase(PHASE_RESET)
+			self.ELM327.write(b'AT Z' + SERIAL_LINEFEED_TYPE)
+			if self.WaitForReady(PhaseTimeOuts[PHASE_RESET]) == False:
+				self.InitResult += "FAILED: AT Z (No Prompt After Reset)\n"
 
-			# Initialize the ELM327 device.
-			Response = self.GetResponse(b'AT Z\r')
-
-			time.sleep(ELM_RESET_PERIOD)
-			
+			self.SetPhase(PHASE_CONFIGURE)
 			best_baud = SERIAL_PORT_BAUD_1
 			
 			# Echo Off, for faster communications.
@@ -357,20 +635,21 @@ class ELM327:
 			ResponseID = self.GetResponse(b'AT I\r')
 			print(ResponseID)
 			
-			# Set the timing for baud rate change
-			Response = self.GetResponse(b'AT BRT 00\r')
-			print ("timeout change: " + str(Response))
-			
-			#best_baud = self.ChangeBaud(b'AT BRD 45\r', ResponseID, SERIAL_PORT_BAUD_2)
-			#best_baud = self.ChangeBaud(b'AT BRD 23\r', ResponseID, SERIAL_PORT_BAUD_3)
-			#best_baud = self.ChangeBaud(b'AT BRD 11\r', ResponseID, SERIAL_PORT_BAUD_4)
-			best_baud = self.ChangeBaud(b'AT BRD 08\r', ResponseID, SERIAL_PORT_BAUD_5)
-			
-			print ("baud set to: " + str(best_baud))
-			
-			# Set the timing for baud rate change
-			Response = self.GetResponse(b'AT BRT 0F\r')
-			print ("timeout change: " + str(Response))
+			# A TCP link has no baud rate to negotiate.
+			self.BaudReport = []
+			if self.ELM327.baudrate != None:
+				# Set the timing for baud rate change
+				Response = self.GetResponse(b'AT BRT 00\r')
+				print ("timeout change: " + str(Response))
+				
+				# Find the fastest baud rate which works without corruption.
+				best_baud = self.NegotiateBaud(ResponseID)
+				
+				print ("baud set to: " + str(best_baud))
+				
+				# Set the timing for baud rate change
+				Response = self.GetResponse(b'AT BRT 0F\r')
+				print ("timeout change: " + str(Response))
 		
 			# Linefeed off, for faster communications.
 			if self.InitResult == "":
@@ -396,11 +675,13 @@ class ELM327:
 				if Response != 'OK\n':
 					self.InitResult += "FAILED: AT S0 (Set Space Characters Off)\n"
 			
-			# Set CAN communication protocol to ISO 9141-2 or auto detect on fail.
+			# Set the protocol pinned for this vehicle or found on the last connection, otherwise
+			# set CAN communication protocol to ISO 9141-2 or auto detect on fail.
 			if self.InitResult == "":
-				Response = self.GetResponse(b'AT SP A3\r')
+				Protocol = self.SelectProtocol()
+				Response = self.GetResponse(b'AT SP ' + bytes(Protocol, 'utf-8') + b'\r')
 				if Response != 'OK\n':
-					self.InitResult += "FAILED: AT SP A3 (Set Protocol ISO 9141-2 / Auto)\n"
+					self.InitResult += "FAILED: AT SP " + Protocol + " (Set Protocol)\n"
 			"""
 			# Set CAN Baud to high speed.
 			if self.InitResult == "":
@@ -417,10 +698,20 @@ class ELM327:
 			print(str(Catch))
 
 		if Result == CONNECT_SUCCESS:
-			# Wait before tring to connect to ensure EML device is idle.
-			time.sleep(ELM_CONNECT_SETTLE_PERIOD)
+			self.SetPhase(PHASE_PROTOCOL)
 			# Request Mode 01 PID 01 (MIL Information) to test connection.
+			StartTime = time.perf_counter()
 			Response = self.GetResponse(b'0101\r')
+			if self.ProtocolSource != "" and Response.find("4101") == -1:
+				# The protocol selected directly didn't connect, fall back to searching for it.
+				print("PROTOCOL " + self.ProtocolSource + " FAILED: " + Response)
+				self.ProtocolSource = ""
+				self.GetResponse(b'AT SP ' + bytes(PROTOCOL_SEARCH, 'utf-8') + b'\r')
+				StartTime = time.perf_counter()
+				Response = self.GetResponse(b'0101\r')
+			self.ProtocolConnectTime = time.perf_counter() - StartTime
+			if self.ProtocolSource == "":
+				self.ProtocolSearchTime = self.ProtocolConnectTime
 			if Response.find("UNABLE TO CONNECT") != -1:
 				Result = CONNECT_CAN_BUS_FAIL
 				# Close serial port if connection failed.
@@ -431,52 +722,352 @@ class ELM327:
 				if (ResultVal1 & 0x80) != 0:
 					self.MilOn = True
 				self.FreezeFrameCount = ResultVal1 & 0x7F
+				# Get the protocol number found, CAN protocols allow multiple PIDs per request.
+				self.ProtocolNumber = self.GetResponse(b'AT DPN\r').strip()[-1:]
+				self.IsCAN = self.ProtocolNumber != "" and self.ProtocolNumber in CAN_PROTOCOLS
+				# Turn headers on and physically address one ECU when configured.
+				if self.IsCAN and HEADERS == "ON":
+					self.SetHeaders(True)
+				# Learn how many ECUs answer each service, to avoid waiting for answers which never come.
+				if self.IsCAN and ECU_ADDRESS != "":
+					self.SetEcuAddress(ECU_ADDRESS)
+				else:
+					self.LearnResponseCounts()
 
 		if Result == CONNECT_SUCCESS:
-			# Manually add standard PIDs supported, prefix with '!', don't show as user selectable option.
-			# Application specific display locations.
-			self.ValidPIDs['03'] = "! Show stored Diagnostic Trouble Codes"
-			self.ValidPIDs['04'] = "! Clear Diagnostic Trouble Codes and stored values"
-			self.ValidPIDs['07'] = "! Show pending Diagnostic Trouble Codes (detected during current or last driving cycle)"
-
-			# Get Mode 01 PID support [01 -> 20].
-			self.PID0100()
-			"""
-			# If Mode 01 PID 20 is supported, get Mode 01 PID support [21 -> 40].
-			if '0120' in self.ValidPIDs:
-				self.PID0120()
-			# If Mode 01 PID 40 is supported, get Mode 01 PID support [41 -> 60].
-			if '0140' in self.ValidPIDs:
-				self.PID0140()
-			# If Mode 01 PID 60 is supported, get Mode 01 PID support [61 -> 80].
-			if '0160' in self.ValidPIDs:
-				self.PID0160()
-			# If Mode 01 PID 80 is supported, get Mode 01 PID support [81 -> A0].
-			if '0180' in self.ValidPIDs:
-				self.PID0180()
-			# If Mode 01 PID A0 is supported, get Mode 01 PID support [A1 -> C0].
-			if '01A0' in self.ValidPIDs:
-				self.PID01A0()
-			# If Mode 01 PID C0 is supported, get Mode 01 PID support [C1 -> E0].
-			if '01C0' in self.ValidPIDs:
-				self.PID01C0()
-			# Get Mode 05 PID support.
-			self.PID050100()
-			# Get Mode 09 PID support.
-			self.PID0900()
-			"""
-			
-			self.PID0120()
-			self.PID0140()
-			self.PID0160()
-			self.PID0180()
-			self.PID01A0()
-			self.PID01C0()
+			self.ConnectVehicle()
+			self.ELM327.timeout = SERIAL_PORT_TIME_OUT
+			self.SetPhase(PHASE_DONE)
+		else:
+			self.SetPhase(PHASE_FAILED)
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Reset everything learned about the vehicle and the link on    */
+#/* the last connection.                                          */
+#/*****************************************************************/
+	def ResetConnection(self):
+		self.ReceiveBuffer = bytearray()
+		self.ResetLinkStatistics()
+		self.ResponseCounts = {}
+		self.VehicleId = ""
+		self.TimingTuned = False
+		self.SupportData = {}
+		self.EcuAddresses = []
+		self.StaticData = {}
+		self.CapabilitiesCached = False
+		self.HeaderDigits = IsoTp.HEADERS_OFF
+		self.EcuAddress = ""
+		self.PrimaryEcu = ""
+		self.EcuValidPIDs = {}
+		self.EcuSupportData = {}
+		self.FreezePayloads = {}
+		self.FreezeFrames = {}
+		# The ELM327 timing settings after a reset.
+		self.TimeoutValue = ELM_TIMEOUT_STEPS[0]
+		self.AdaptiveTiming = 1
+
+
+
+#/*****************************************************************/
+#/* Once the vehicle answers, find the PIDs it supports, from the */
+#/* capabilities saved for it when they are still valid, and tune */
+#/* the response timeout.                                         */
+#/*****************************************************************/
+	def ConnectVehicle(self):
+		self.SetPhase(PHASE_DISCOVERY)
+		self.ValidPIDs = {}
+		self.ValidFreezePIDs = {}
+		# Manually add standard PIDs supported, prefix with '!', don't show as user selectable option.
+		# Application specific display locations.
+		self.ValidPIDs['03'] = "! Show stored Diagnostic Trouble Codes"
+		self.ValidPIDs['04'] = "! Clear Diagnostic Trouble Codes and stored values"
+		self.ValidPIDs['07'] = "! Show pending Diagnostic Trouble Codes (detected during current or last driving cycle)"
+
+		# Use the capabilities saved for this vehicle when they are still valid, otherwise discover them.
+		if self.LoadCapabilities() == False:
+			# Get Mode 01 and Mode 09 PID support, in as few requests as the protocol allows.
+			self.DiscoverSupportedPIDs('01')
+			self.DiscoverSupportedPIDs('09')
+			# Get Mode 05 oxygen sensor monitoring support, only on non CAN protocols.
+			if not self.IsCAN:
+				self.DiscoverSupportedPIDs('0501')
+			# Get the addresses of the ECUs which respond.
+			self.FindEcuAddresses()
+			self.SaveCapabilities()
+
+		# Set the fastest safe response timeout for this vehicle.
+		self.SetPhase(PHASE_TIMING)
+		self.TuneTiming()
+
+
+
+#/*****************************************************************/
+#/* Move the connection on to the next phase, recording how long  */
+#/* the last phase took, applying the time out for the new phase  */
+#/* and letting the caller know the progress of the connection.   */
+#/*****************************************************************/
+	def SetPhase(self, Phase):
+		Now = time.perf_counter()
+		if len(self.ConnectTiming) > 0:
+			self.ConnectTiming[-1][1] = Now - self.ConnectTiming[-1][1]
+		if Phase in PhaseTimeOuts:
+			self.ConnectTiming.append([Phase, Now])
+			try:
+				self.ELM327.timeout = PhaseTimeOuts[Phase]
+			except:
+				pass
+
+		if self.PhaseCallback != None:
+			try:
+				self.PhaseCallback(Phase, Now - self.ConnectStartTime)
+			except Exception as Catch:
+				print(STRING_ERROR + " in connect phase callback : " + str(Catch))
+
+
+
+#/*****************************************************************/
+#/* Get how long each phase of the last connection took.          */
+#/*****************************************************************/
+	def GetConnectTiming(self):
+		Result = ""
+
+		for Phase, Seconds in self.ConnectTiming:
+			Result += "Connect: " + Phase + "|" + "{:1.2f}".format(Seconds) + " s\n"
+
+		# Show how the protocol was found, and the search time saved when it was set directly.
+		if self.ProtocolSource != "":
+			Result += "Protocol Selected|" + self.ProtocolSource + " " + self.ProtocolNumber + "\n"
+			if self.ProtocolSearchTime > 0.0:
+				Result += "Protocol Search Saved|" + "{:1.2f}".format(self.ProtocolSearchTime - self.ProtocolConnectTime) + " s\n"
+		else:
+			Result += "Protocol Selected|SEARCH " + self.ProtocolNumber + "\n"
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Wait for the ELM327 device to prompt for a command, polling   */
+#/* with short reads and sending an ID request if it stays quiet. */
+#/* Any further prompts from ID requests are read before return.  */
+#/*****************************************************************/
+	def WaitForReady(self, TimeOut):
+		Result = False
+
+		ReadTimeOut = self.ELM327.timeout
+		self.ELM327.timeout = ELM_POLL_PERIOD
+		try:
+			Deadline = time.perf_counter() + TimeOut
+			while Result == False and time.perf_counter() < Deadline:
+				ReceivedData = self.ReadResponse()
+				if self.PromptFound == True:
+					Result = True
+				elif ReceivedData == b'':
+					self.ELM327.write(b'AT I' + SERIAL_LINEFEED_TYPE)
+			# Read any answers to ID requests still on their way.
+			while self.PromptFound == True:
+				self.ReadResponse()
+		finally:
+			self.ELM327.timeout = ReadTimeOut
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Choose the protocol to set. A protocol pinned in the vehicle  */
+#/* file is used first, then the protocol found on the last       */
+#/* connection, otherwise the protocol is searched for.           */
+#/*****************************************************************/
+	def SelectProtocol(self):
+		Result = PROTOCOL_SEARCH
+		self.ProtocolSource = ""
+		self.ProtocolSearchTime = 0.0
+
+		Records = LoadRecords(CAPABILITY_FILE_NAME)
+		if self.VehicleFile in Records:
+			try:
+				self.ProtocolSearchTime = float(Records[self.VehicleFile].get("SearchTime", "0"))
+			except:
+				pass
+
+		if len(self.PinnedProtocol) == 1 and self.PinnedProtocol in "123456789ABC":
+			Result = self.PinnedProtocol
+			self.ProtocolSource = "PINNED"
+		elif self.VehicleFile in Records and len(Records[self.VehicleFile].get("Protocol", "")) == 1:
+			Result = Records[self.VehicleFile]["Protocol"]
+			self.ProtocolSource = "SAVED"
 
 		return Result
 
 
 
+#/*****************************************************************/
+#/* Find the addresses of the ECUs which answer Mode 01 requests, */
+#/* by briefly turning headers on.                                */
+#/*****************************************************************/
+	def FindEcuAddresses(self):
+		self.EcuAddresses = []
+
+		# CAN 11 bit headers are 3 digits, CAN 29 bit headers 8 digits, other protocols 3 bytes ending in the ECU address.
+		if self.ProtocolNumber in "68":
+			HeaderLength = 3
+		elif self.ProtocolNumber in "79":
+			HeaderLength = 8
+		else:
+			HeaderLength = 6
+		try:
+			if self.HeaderDigits == IsoTp.HEADERS_OFF:
+				self.GetResponse(b'AT H1\r')
+			Response = self.GetResponse(b'0100\r')
+			for Line in Response.split('\n'):
+				Line = Line.strip()
+				if len(Line) > HeaderLength and Line.find("4100") >= HeaderLength:
+					Address = Line[:HeaderLength]
+					if HeaderLength == 6:
+						Address = Address[4:]
+					if Address not in self.EcuAddresses:
+						self.EcuAddresses.append(Address)
+		finally:
+			if self.HeaderDigits == IsoTp.HEADERS_OFF:
+				self.GetResponse(b'AT H0\r')
+
+
+
+#/*****************************************************************/
+#/* Turn headers on or off on a CAN protocol. With headers on the */
+#/* CAN ID of each response line tells which ECU sent the data.   */
+#/*****************************************************************/
+	def SetHeaders(self, HeadersOn):
+		if HeadersOn:
+			Response = self.GetResponse(b'AT H1\r')
+			if Response == 'OK\n':
+				if self.ProtocolNumber in CAN_29_BIT_PROTOCOLS:
+					self.HeaderDigits = IsoTp.HEADERS_29_BIT
+				else:
+					self.HeaderDigits = IsoTp.HEADERS_11_BIT
+				self.PrimaryEcu = ENGINE_ECU_IDS[self.HeaderDigits]
+		else:
+			self.GetResponse(b'AT H0\r')
+			self.HeaderDigits = IsoTp.HEADERS_OFF
+			self.PrimaryEcu = ""
+
+
+
+#/*****************************************************************/
+#/* Physically address requests to a single ECU by CAN ID, for    */
+#/* example 7E0 for the engine ECU, or broadcast them to all ECUs */
+#/* when the address is empty. Only the addressed ECU answers, so */
+#/* the ELM327 doesn't wait for other ECUs which may answer.      */
+#/*****************************************************************/
+	def SetEcuAddress(self, Address):
+		if self.ProtocolNumber in CAN_29_BIT_PROTOCOLS:
+			Broadcast = BROADCAST_ADDRESSES[IsoTp.HEADERS_29_BIT]
+		else:
+			Broadcast = BROADCAST_ADDRESSES[IsoTp.HEADERS_11_BIT]
+		if Address == "":
+			Address = Broadcast
+		Response = self.GetResponse(b'AT SH ' + bytes(Address, 'utf-8') + b'\r')
+		if Response != 'OK\n':
+			print("FAILED: AT SH " + Address + " : " + Response)
+		elif Address == Broadcast:
+			self.EcuAddress = ""
+			if self.HeaderDigits != IsoTp.HEADERS_OFF:
+				self.PrimaryEcu = ENGINE_ECU_IDS[self.HeaderDigits]
+		else:
+			self.EcuAddress = Address
+			# ECUs answer on their 11 bit address plus 8, or with the 29 bit target and source swapped.
+			if len(Address) == 3:
+				self.PrimaryEcu = "{:03X}".format(int(Address, 16) + 8)
+			elif len(Address) == 6:
+				self.PrimaryEcu = "18DA" + Address[4:6] + Address[2:4]
+		# The number of ECUs answering has changed.
+		self.LearnResponseCounts()
+
+
+
+#/*****************************************************************/
+#/* Load the capabilities saved for the configured vehicle. The   */
+#/* saved data is only used if the ECU still answers the Mode 01  */
+#/* PID 00 request the same way and reports the same VIN, so the  */
+#/* same vehicle is present.                                      */
+#/*****************************************************************/
+	def LoadCapabilities(self):
+		Records = LoadRecords(CAPABILITY_FILE_NAME)
+		if self.VehicleFile not in Records or "Support0100" not in Records[self.VehicleFile]:
+			return False
+		Record = Records[self.VehicleFile]
+		# With headers on, the supported PIDs of each ECU are needed.
+		if self.HeaderDigits != IsoTp.HEADERS_OFF and not any(Name[:10] == "EcuSupport" for Name in Record):
+			return False
+
+		# Where several ECUs answer, the saved bitmap is their bitmaps combined.
+		Response = self.PruneData(self.GetObdResponse('0100'), 2)
+		PidValue = 0
+		for Index in range(0, len(Response) - 7, 8):
+			PidValue |= int(Response[Index:Index + 8], 16)
+		if "{:08X}".format(PidValue) != Record["Support0100"]:
+			return False
+		# Another vehicle may support the same PIDs, only trust the saved data when the VIN matches too.
+		if "Data0902" in Record:
+			try:
+				VehicleId = self.ReadVehicleId().replace(' ', '')
+			except Exception as Catch:
+				print(STRING_ERROR + " getting VIN : " + str(Catch))
+				VehicleId = ""
+			if VehicleId != Record["Data0902"].replace(' ', ''):
+				return False
+
+		# Mode 02 freeze frame support saved by earlier versions is ignored, it may no longer be current.
+		PidDescriptions = { '01': self.PidDescriptionsMode01, '05': self.PidDescriptionsMode05, '09': self.PidDescriptionsMode09 }
+		for Name in Record:
+			if Name[:7] == "Support" and Name[7:9] in PidDescriptions:
+				# The mode may include a test ID, as for Mode 05 0501.
+				self.ResolvePidData(Name[7:-2], Record[Name], Name[-2:], PidDescriptions[Name[7:9]])
+			elif Name[:10] == "EcuSupport" and Name[10:12] in PidDescriptions:
+				self.ResolveEcuPidData(Name[10:12], Record[Name], Name[12:14], PidDescriptions[Name[10:12]], Name[15:])
+			elif Name[:4] == "Data":
+				self.StaticData[Name[4:]] = Record[Name]
+		if "ECUs" in Record and Record["ECUs"] != "":
+			self.EcuAddresses = Record["ECUs"].split(',')
+		if "0902" in self.StaticData:
+			self.VehicleId = self.StaticData["0902"].replace(' ', '')
+		self.CapabilitiesCached = True
+
+		return True
+
+
+
+#/*****************************************************************/
+#/* Save the capabilities found for the configured vehicle. The   */
+#/* Mode 02 PID support describes the freeze frames stored now,   */
+#/* which change as faults come and go, so is kept only for the   */
+#/* session.                                                      */
+#/*****************************************************************/
+	def SaveCapabilities(self):
+		Record = {}
+		for Name in self.SupportData:
+			if Name[:2] != '02':
+				Record["Support" + Name] = self.SupportData[Name]
+		for Name in self.EcuSupportData:
+			if Name[:2] != '02':
+				Record["EcuSupport" + Name] = self.EcuSupportData[Name]
+		for PID in self.StaticData:
+			Record["Data" + PID] = self.StaticData[PID]
+		Record["Protocol"] = self.ProtocolNumber
+		Record["SearchTime"] = "{:1.2f}".format(self.ProtocolSearchTime)
+		Record["ECUs"] = ",".join(self.EcuAddresses)
+
+		Records = LoadRecords(CAPABILITY_FILE_NAME)
+		Records[self.VehicleFile] = Record
+		SaveRecords(CAPABILITY_FILE_NAME, Records)
+
+
+
 #/***************************************************************/
 #/* Return a list of PIDs the currently connected ECU supports. */
 #/***************************************************************/
@@ -484,39 +1075,45 @@ class ELM327:
 		Result = self.ValidPIDs
 
 		if FreezeIndex != -1:
-			# Get Mode 02 PID support [01 -> 20].
-			self.PID0200(FreezeIndex)
-			# If Mode 02 PID 20 is supported, get Mode 02 PID support [21 -> 40].
-			if '0120' in self.ValidFreezePIDs:
-				self.PID0220(FreezeIndex)
-			# If Mode 02 PID 40 is supported, get Mode 02 PID support [41 -> 60].
-			if '0140' in self.ValidFreezePIDs:
-				self.PID0240(FreezeIndex)
-			# If Mode 02 PID 60 is supported, get Mode 02 PID support [61 -> 80].
-			if '0160' in self.ValidFreezePIDs:
-				self.PID0260(FreezeIndex)
-			# If Mode 02 PID 80 is supported, get Mode 02 PID support [81 -> A0].
-			if '0180' in self.ValidFreezePIDs:
-				self.PID0280(FreezeIndex)
-			# If Mode 02 PID A0 is supported, get Mode 02 PID support [A1 -> C0].
-			if '01A0' in self.ValidFreezePIDs:
-				self.PID02A0(FreezeIndex)
-			# If Mode 02 PID C0 is supported, get Mode 02 PID support [C1 -> E0].
-			if '01C0' in self.ValidFreezePIDs:
-				self.PID02C0(FreezeIndex)
+			ThisFreezeIndex = "{:02d}".format(FreezeIndex)
+			if "0200_" + ThisFreezeIndex in self.SupportData:
+				# Use the Mode 02 PID support already found for this freeze frame.
+				for Start in SUPPORT_PIDS:
+					if "02" + Start + "_" + ThisFreezeIndex in self.SupportData:
+						self.ResolvePidData('02', self.SupportData["02" + Start + "_" + ThisFreezeIndex], Start, self.PidDescriptionsMode01, FreezeIndex)
+			else:
+				# Get Mode 02 PID support, in as few requests as the protocol allows.
+				self.DiscoverSupportedPIDs('02', FreezeIndex)
 			Result = self.ValidFreezePIDs
 
 		return Result
 
 
 
+#/***************************************************************/
+#/* Return the PIDs each ECU supports, by CAN ID, found with    */
+#/* headers on.                                                 */
+#/***************************************************************/
+	def GetEcuValidPIDs(self):
+		return self.EcuValidPIDs
+
+
+
 #/**********************************************************************/
 #/* Get and return the information for the specified PID from the ECU. */
 #/**********************************************************************/
 	def DoPID(self, PID, FreezeIndex = -1):
 		try:
-			if PID in PidFunctions:
+			if PID in self.StaticData:
+				Result = self.StaticData[PID]
+			elif self.ThisPidDecoder.IsDecoded(PID):
+				Result = self.DecodePID(PID, FreezeIndex)
+			elif PID in PidFunctions:
 				Result = PidFunctions[PID](self, FreezeIndex)
+				# Remember vehicle data which never changes, so it is not requested again.
+				if PID in STATIC_PIDS and type(Result) is str and Result not in (STRING_NO_DATA, STRING_ERROR, STRING_TODO) and Result.find('|') == -1 and Result.find('\n') == -1:
+					self.StaticData[PID] = Result
+					self.SaveCapabilities()
 			else:
 				Result = STRING_NOT_IMPLEMENTED
 		except Exception as Catch:
@@ -527,192 +1124,1167 @@ class ELM327:
 
 
 
-#/*************************************************/
-#/* Talk to the ELM327 device over a serial port. */
-#/* Send request data, and wait for the response. */
-#/* The expected response ends with a prompt      */
-#/* character '>', the ELM327 provides promting   */
-#/* for more user requests.                       */
-#/* Otherwise a timeout occurs waiting for a      */
-#/* response.                                     */
-#/*************************************************/
-	def GetResponse(self, Data, no_ret = False):
-		Data = Data.replace(b'\r', SERIAL_LINEFEED_TYPE)
+#/**********************************************************************/
+#/* Get the value of a Mode 01 PID decoded by a formula from every ECU */
+#/* which answers, by CAN ID. Needs headers on to tell ECUs apart.     */
+#/**********************************************************************/
+	def DoEcuPID(self, PID):
+		Result = {}
 
-		if len(Data) > 0:
-			if DEBUG == "ON":
-				print("DEBUG SENDING [" + str(len(Data)) + "] " + str(Data))
-			self.ELM327.write(Data)
-			
-		Response = ""
-		ReadChar = 1
-		while ReadChar != b'>' and ReadChar != b'' and ReadChar != 0: #or (len(Response) >= 3 and Response[-3:] != b'OK\r'):
-			ReadChar = self.ELM327.read()
-			if ReadChar[0] > 127:
-				if DEBUG == "ON":
-					print("REJECTING RECEIVED CHARACTER: " + str(int(ReadChar[0])) + str(" [%c] " % (ReadChar[0])))
-			elif ReadChar != b'>':
-				Response += str(ReadChar.replace(b'\r',b'\n'), 'utf-8')
-				#print("[" + str('%r' % (Response)) + "]")
-				
-				if no_ret and Response == 'OK\n':
-					#print("Response matches")
-					break
-				
-		Result = Response.replace('\r', '\n').replace('\n\n', '\n').replace('NO DATA', '00000000000000').replace('SEARCHING...\n', '\n')
-		if Result[-1:] != '\n':
-			Result += '\n'
+		try:
+			if self.ThisPidDecoder.IsDecoded(PID) and PID[:2] == '01':
+				ResponseStart = bytes([0x41, int(PID[2:], 16)])
+				for EcuId, Message in self.SplitEcuMessages(self.GetObdResponse(PID)):
+					if Message[:2] == ResponseStart and EcuId not in Result:
+						Result[EcuId] = self.ThisPidDecoder.Decode(PID, Message[2:])
+		except Exception as Catch:
+			print(STRING_ERROR + " in PID" + str(PID) + " : " + str(Catch))
 
-		if DEBUG == "ON":
-			print("DEBUG RECEIVED [" + str(len(Result)) + "] " + str('%r' % Result))
+		return Result
+
+
+
+#/***********************************************************************/
+#/* Get and return the information for a list of PIDs from the ECU.     */
+#/* On CAN protocols Mode 01 PIDs are requested up to six at a time and */
+#/* the combined response split back into the data for each PID. Any    */
+#/* PID not answered by a batched request is requested on its own.      */
+#/***********************************************************************/
+	def DoPIDs(self, PIDs):
+		Result = {}
+
+		self.BatchPayloads.update(self.GetBatchPayloads(self.GetBatchPIDs(PIDs)))
+
+		# Decode the batched PIDs with formulas together, then get any others one at a time.
+		Decoded = self.ThisPidDecoder.DecodePayloads(self.BatchPayloads, STRING_ERROR)
+		for PID in PIDs:
+			if PID in Decoded:
+				Result[PID] = Decoded[PID]
+			elif PID not in Result:
+				Result[PID] = self.DoPID(PID)
+		self.BatchPayloads.clear()
 
 		return Result
 
-	def ChangeBaud(self, Data, ResponseID, newBaud):
-		
-		oldBaud = self.ELM327.baudrate
-		
-		if len(Data) > 0:
-			if DEBUG == "ON":
-				print("DEBUG SENDING [" + str(len(Data)) + "] " + str(Data))
-			self.ELM327.write(Data)
-			
-		Response = ""
-		ReadChar = 1
-		while ReadChar != b'\n':
-			ReadChar = self.ELM327.read()
-			if ReadChar[0] > 127:
-				if DEBUG == "ON":
-					print("REJECTING RECEIVED CHARACTER: " + str(int(ReadChar[0])) + str(" [%c] " % (ReadChar[0])))
-			else:
-				Response += str(ReadChar.replace(b'\r',b'\n'), 'utf-8')
-				#print("[" + str('%r' % (Response)) + "]")
-				if Response == 'OK\n':
-					#print("Response matches")
-					break
-		
-		if Response == 'OK\n':
-			self.ELM327.baudrate = newBaud
-			
-			Response = ""
-			ReadChar = 1
-			while ReadChar != b'\n' and ReadChar != b'\r':
-				ReadChar = self.ELM327.read()
-				if ReadChar[0] > 127:
-					if DEBUG == "ON":
-						print("REJECTING RECEIVED CHARACTER: " + str(int(ReadChar[0])) + str(" [%c] " % (ReadChar[0])))
-				else:
-					Response += str(ReadChar.replace(b'\r',b'\n'), 'utf-8')
-					#print("[" + str('%r' % (Response)) + "]")
-			
-			if Response != ResponseID:
-				self.ELM327.baudrate = (oldBaud)
-				print("FAILED to set baud " + str(newBaud))
-			else:
-				Response = self.GetResponse(b'\r')
-				if Response != 'OK\n':
-					self.InitResult += "FAILED\n"
-					print("FAILED to set baud " + str(newBaud))
-				else:
-					print("Set to  " + str(newBaud))
-					best_baud = newBaud
-		else:
-			print("Command failed with : " + Response)
-	
-		return self.ELM327.baudrate
 
 
 #/*****************************************************************/
-#/* Resolve a bitmaped supported PIDs response from the ECU and   */
-#/* add them to the list of currently supported PIDs for the ECU. */
+#/* Get the PIDs of a list which can be batched, the valid Mode   */
+#/* 01 PIDs with data bytes on CAN protocols, without repeats.    */
 #/*****************************************************************/
-	def ResolvePidData(self, PidMode, PidData, PidStart, PidDescriptions, FreezeIndex = -1):
-		print("[" + PidStart + "]")
-		print("[" + PidData + "]")
-		PidStartValue = int(PidStart, 16)
-		PidValue = int(PidData, 16)
-		Count = PidStartValue + (len(PidData) * 4)
-		while PidValue > 0:
-			if PidValue % 2 > 0:
-				PidIndex = '%2.2X' % Count
-				if PidMode == '02':
-					ThisFreezeIndex = "{:02d}".format(FreezeIndex)
-					if PidIndex in PidDescriptions:
-						self.ValidFreezePIDs[PidMode + PidIndex + ThisFreezeIndex] = PidDescriptions[PidIndex]
-					else:
-						self.ValidFreezePIDs[PidMode + PidIndex + ThisFreezeIndex] = STRING_NO_DESCRIPTION
-				else:
-					if PidIndex in PidDescriptions:
-						self.ValidPIDs[PidMode + PidIndex] = PidDescriptions[PidIndex]
-					else:
-						self.ValidPIDs[PidMode + PidIndex] = STRING_NO_DESCRIPTION
-				if DEBUG == "ON":
-					print("VALID PID FOUND: " + PidMode + PidIndex + " -> " + PidDescriptions[PidIndex])
-			PidValue = int(PidValue / 2)
-			Count -= 1
+	def GetBatchPIDs(self, PIDs):
+		Result = []
 
+		if self.IsCAN:
+			for PID in PIDs:
+				if len(PID) == 4 and PID[:2] == '01' and PID[2:] in PidDataBytes and PID in self.ValidPIDs and PID not in Result:
+					Result.append(PID)
 
+		return Result
 
-#/**********************************************************/
-#/* Convert pairs of data bytes into actual trouble codes, */
-#/* translating the first digit as required, and ignoring  */
-#/* zero value data.                                       */
-#/**********************************************************/
-	def DataToTroubleCodes(self, Data):
-		TroubleCodes = list()
-		while len(Data) > 0:
-			ThisCode = Data[:4]
-			if int(ThisCode) != 0:
-				TroubleCodes.append(self.TroubleCodePrefix[ThisCode[0]] + ThisCode[1:])
-			Data = Data[4:]
-		return TroubleCodes
 
 
+#/*****************************************************************/
+#/* Split batched PIDs into the groups sent in each request, up   */
+#/* to six PIDs in each.                                          */
+#/*****************************************************************/
+	def GetBatchGroups(self, BatchPIDs):
+		return [BatchPIDs[Index:Index + BATCH_PID_COUNT] for Index in range(0, len(BatchPIDs), BATCH_PID_COUNT)]
 
-#/*****************************************************/
-#/* Get the trouble codes from the ECU and lookup the */
-#/* trouble code descriptions. Return the data in a   */
-#/* data array.                                       */
-#/*****************************************************/
-	def GetTroubleCodeData(self, OBDIImode):
-		TroubleCodeData = {}
-		Response = self.GetResponse(OBDIImode + b'\r')
-		Response = self.PruneData(Response, 1)
-		TroubleCodes = self.DataToTroubleCodes(Response)
-		for TroubleCode in TroubleCodes:
-			if TroubleCode in self.TroubleCodeDescriptions:
-				TroubleCodeData[TroubleCode] = self.TroubleCodeDescriptions[TroubleCode]
-			else:
-				TroubleCodeData[TroubleCode] = STRING_NO_DESCRIPTION
-		return TroubleCodeData
 
 
+#/*****************************************************************/
+#/* Get the data bytes of Mode 01 PIDs, batched up to six PIDs in */
+#/* each request.                                                 */
+#/*****************************************************************/
+	def GetBatchPayloads(self, BatchPIDs):
+		Result = {}
 
-#/*******************************************************/
-#/* The OBDII protocol will sometimes prefix a response */
-#/* with confirmation of the request sent or other      */
-#/* unwanted bytes of data. Use this function to remove */
-#/* unwanted bytes from the start of lines, and         */
-#/* concatenate the remainder of the response into a    */
-#/* single line of data, ready for processing.          */
-#/*******************************************************/
-	def PruneData(self, Data, RemoveByteCount):
-		Response = ""
-		for Line in Data.split('\n'):
-			Response += Line[2 * RemoveByteCount:]
-		return Response
+		for Group in self.GetBatchGroups(BatchPIDs):
+			try:
+				Result.update(self.GetBatchData(Group))
+			except Exception as Catch:
+				print(STRING_ERROR + " in batch " + str(Group) + " : " + str(Catch))
 
+		return Result
 
-#/**************************************/
-#/* ODBII MODE 01 - Show current data. */
-#/**************************************/
 
-# PID0100 Supported PIDs for Mode 1 [01 -> 20].
-	def PID0100(self, FreezeIndex = -1):
-		Response = self.GetResponse(b'0100\r')
-		Response = self.PruneData(Response, 2)
-		self.ResolvePidData('01', Response, '00', self.PidDescriptionsMode01)
-	PidFunctions["0100"] = PID0100
+
+#/*****************************************************************/
+#/* Get and decode a PID with a formula, a Mode 01 PID or the     */
+#/* Mode 02 freeze frame equivalent when a freeze index is given. */
+#/*****************************************************************/
+	def DecodePID(self, PID, FreezeIndex = -1):
+		Result = STRING_NO_DATA
+
+		if '01' + PID[2:] in self.ValidPIDs:
+			Result = self.ThisPidDecoder.Decode(PID, self.GetPidBytes('01' + PID[2:], FreezeIndex))
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the target polling rate in Hz of a PID.                   */
+#/*****************************************************************/
+	def GetPidRate(self, PID):
+		Result = DEFAULT_PID_RATE
+
+		if PID in self.PidRates:
+			Result = self.PidRates[PID]
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the change in value of a PID which is treated as steady,  */
+#/* by default a fraction of the min to max range of the PID.     */
+#/* Zero when the PID has no numeric range.                       */
+#/*****************************************************************/
+	def GetPidDeadband(self, PID):
+		Result = 0.0
+
+		if PID in self.PidDeadbands:
+			Result = self.PidDeadbands[PID]
+		elif PID[:2] == '01' and PID[2:] in self.PidDescriptionsMode01:
+			Fields = self.PidDescriptionsMode01[PID[2:]].split('|')
+			if len(Fields) > FIELD_PID_MAX_1:
+				try:
+					Result = DEFAULT_DEADBAND_FRACTION * abs(float(Fields[FIELD_PID_MAX_1]) - float(Fields[FIELD_PID_MIN_1]))
+				except:
+					Result = 0.0
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get all the PIDs of a freeze frame in one call, as a          */
+#/* dictionary of PID to value, requesting the PIDs in batches on */
+#/* CAN. The frame is only read again when the trouble code which */
+#/* stored it, PID 0202, has changed since it was last read.      */
+#/*****************************************************************/
+	def GetFreezeFrame(self, FreezeIndex):
+		Result = {}
+
+		ThisFreezeIndex = "{:02d}".format(FreezeIndex)
+		FramePIDs = []
+		for PID in sorted(self.GetValidPIDs(FreezeIndex)):
+			if PID[4:] == ThisFreezeIndex and PID[2:4] not in SUPPORT_PIDS:
+				FramePIDs.append(PID[:4])
+		BatchCount = 1
+		if self.IsCAN:
+			BatchCount = BATCH_FREEZE_PID_COUNT
+
+		try:
+			TroubleCode = None
+			if '0202' in FramePIDs:
+				self.FreezePayloads.update(self.GetFreezeBatchData(['0202'], FreezeIndex))
+				TroubleCode = self.FreezePayloads.get('0202' + ThisFreezeIndex)
+			if TroubleCode != None and FreezeIndex in self.FreezeFrames and self.FreezeFrames[FreezeIndex][0] == TroubleCode:
+				# The same trouble code stored this frame, it hasn't changed.
+				Result = dict(self.FreezeFrames[FreezeIndex][1])
+			else:
+				BatchPIDs = []
+				for PID in FramePIDs:
+					if PID[2:] in PidDataBytes and PID + ThisFreezeIndex not in self.FreezePayloads:
+						BatchPIDs.append(PID)
+				for Index in range(0, len(BatchPIDs), BatchCount):
+					self.FreezePayloads.update(self.GetFreezeBatchData(BatchPIDs[Index:Index + BatchCount], FreezeIndex))
+				Payloads = {}
+				for PID in FramePIDs:
+					if self.ThisPidDecoder.IsDecoded(PID) and PID + ThisFreezeIndex in self.FreezePayloads:
+						Payloads[PID] = self.FreezePayloads.pop(PID + ThisFreezeIndex)
+				Result = self.ThisPidDecoder.DecodePayloads(Payloads, STRING_ERROR)
+				for PID in FramePIDs:
+					if PID in Result:
+						continue
+					elif self.ThisPidDecoder.IsDecoded(PID):
+						Result[PID] = STRING_NO_DATA
+					else:
+						# PIDs decoded by a function use the data received in the batches.
+						Result[PID] = self.DoPID(PID, FreezeIndex)
+				self.FreezeFrames[FreezeIndex] = [TroubleCode, dict(Result)]
+		except Exception as Catch:
+			print(STRING_ERROR + " in freeze frame " + ThisFreezeIndex + " : " + str(Catch))
+		self.FreezePayloads = {}
+
+		return Result
+
+
+
+#/*************************************************************/
+#/* Request several Mode 02 PIDs of a freeze frame in a       */
+#/* single request, and split the response into the data      */
+#/* bytes for each PID and freeze frame number.               */
+#/*************************************************************/
+	def GetFreezeBatchData(self, PIDs, FreezeIndex):
+		Payloads = {}
+
+		ThisFreezeIndex = "{:02d}".format(FreezeIndex)
+		Request = "02"
+		for PID in PIDs:
+			Request += PID[2:] + ThisFreezeIndex
+		Response = self.GetObdResponse(Request)
+		for PID, Data in self.SplitBatchResponse(Response, FreezeIndex).items():
+			Payloads[PID + ThisFreezeIndex] = Data
+
+		return Payloads
+
+
+
+#/*************************************************************/
+#/* Request several Mode 01 PIDs in a single CAN request, and */
+#/* split the response into the data bytes for each PID.      */
+#/*************************************************************/
+	def GetBatchData(self, PIDs):
+		Response = self.GetObdResponse(self.BatchRequest(PIDs))
+
+		return self.SplitBatchResponse(Response)
+
+
+
+#/*************************************************************/
+#/* Get the single Mode 01 request for several PIDs.          */
+#/*************************************************************/
+	def BatchRequest(self, PIDs):
+		Result = "01"
+		for PID in PIDs:
+			Result += PID[2:]
+
+		return Result
+
+
+
+#/*************************************************************/
+#/* Split a response into a list of [CAN ID, Data bytes] for  */
+#/* each ECU message, reassembling CAN messages sent in       */
+#/* multiple frames. The CAN ID is empty with headers off.    */
+#/* Lines which aren't hex data, for example SEARCHING or     */
+#/* STOPPED, are skipped.                                     */
+#/*************************************************************/
+	def SplitEcuMessages(self, Response):
+		HeaderDigits = IsoTp.HEADERS_OFF
+		if self.IsCAN:
+			HeaderDigits = self.HeaderDigits
+
+		return IsoTp.Reassemble(Response, HeaderDigits)
+
+
+
+#/*************************************************************/
+#/* Split a response into the data bytes of each ECU message. */
+#/* With headers on, the messages from the primary ECU come   */
+#/* first, so its data is used where several ECUs answer.     */
+#/*************************************************************/
+	def SplitMessages(self, Response):
+		Messages = self.SplitEcuMessages(Response)
+		if self.HeaderDigits != IsoTp.HEADERS_OFF:
+			Messages.sort(key = lambda Message: Message[0] != self.PrimaryEcu)
+
+		return [Message for EcuId, Message in Messages]
+
+
+
+#/*************************************************************/
+#/* Get the data bytes of the first ECU message of a response */
+#/* following the service and PID bytes.                      */
+#/*************************************************************/
+	def GetPayload(self, Response, RemoveByteCount):
+		Result = b''
+
+		Messages = self.SplitMessages(Response)
+		if len(Messages) > 0:
+			Result = Messages[0][RemoveByteCount:]
+
+		return Result
+
+
+
+#/*************************************************************/
+#/* Split the response to a batched Mode 01 request into the  */
+#/* data bytes for each PID. A Mode 02 response to a freeze   */
+#/* frame request has a frame number following each PID.      */
+#/*************************************************************/
+	def SplitBatchResponse(self, Response, FreezeIndex = -1):
+		Payloads = {}
+
+		for Message in self.SplitMessages(Response):
+			self.SplitBatchMessage(Message, Payloads, FreezeIndex)
+
+		return Payloads
+
+
+
+#/*************************************************************/
+#/* Add the data bytes for each PID in one ECU message of a   */
+#/* batched response to the payloads, where the PID has none  */
+#/* yet. Return the PIDs added.                               */
+#/*************************************************************/
+	def SplitBatchMessage(self, Message, Payloads, FreezeIndex = -1):
+		Result = []
+
+		Service = 0x41
+		PidNames = PidNames01
+		Skip = 1
+		if FreezeIndex != -1:
+			Service = 0x42
+			PidNames = PidNames02
+			Skip = 2
+		if len(Message) > 0 and Message[0] == Service:
+			Position = 1
+			while Position < len(Message):
+				DataLength = PidDataLengths[Message[Position]]
+				if DataLength == 0:
+					break
+				DataEnd = Position + Skip + DataLength
+				PID = PidNames[Message[Position]]
+				if PID not in Payloads and DataEnd <= len(Message):
+					Payloads[PID] = Message[Position + Skip:DataEnd]
+					Result.append(PID)
+				Position = DataEnd
+
+		return Result
+
+
+
+#/***************************************************************/
+#/* Get the data bytes returned for a Mode 01 PID, or the Mode  */
+#/* 02 freeze frame equivalent when a freeze index is provided. */
+#/* Data already received in a batched request is used first.   */
+#/***************************************************************/
+	def GetPidBytes(self, PID, FreezeIndex = -1):
+		if FreezeIndex == -1:
+			if PID in self.BatchPayloads:
+				Result = self.BatchPayloads.pop(PID)
+			else:
+				Result = self.GetPayload(self.GetObdResponse(PID), 2)
+		else:
+			FreezePID = "02" + PID[2:] + "{:02d}".format(FreezeIndex)
+			if FreezePID in self.FreezePayloads:
+				Result = self.FreezePayloads.pop(FreezePID)
+			else:
+				Result = self.GetPayload(self.GetObdResponse(FreezePID), 3)
+
+		return Result
+
+
+
+#/***************************************************************/
+#/* Get the data bytes returned for a PID as hex text, for PIDs */
+#/* which look up their data as text.                           */
+#/***************************************************************/
+	def GetPidData(self, PID, FreezeIndex = -1):
+		return self.GetPidBytes(PID, FreezeIndex).hex().upper()
+
+
+
+#/**************************************************************/
+#/* Learn how many ECUs answer Mode 01 and Mode 02 requests on */
+#/* this vehicle, so the count can be appended to requests and */
+#/* the ELM327 returns as soon as the last answer arrives.     */
+#/**************************************************************/
+	def LearnResponseCounts(self):
+		self.ResponseCounts = {}
+
+		for Service, Request in (('01', b'0100\r'), ('02', b'020000\r')):
+			Response = self.GetResponse(Request)
+			Count = self.CountMessages(Response, Service)
+			if self.NoData == False and 0 < Count < 16:
+				self.ResponseCounts[Service] = Count
+
+
+
+#/****************************************************************/
+#/* Count the ECU messages in a response to an OBDII service.    */
+#/****************************************************************/
+	def CountMessages(self, Response, Service):
+		Count = 0
+
+		ResponseService = 0x40 | int(Service, 16)
+		for Message in self.SplitMessages(Response):
+			if len(Message) > 0 and Message[0] == ResponseService:
+				Count += 1
+
+		return Count
+
+
+
+#/***************************************************************/
+#/* Send an OBDII request, appending the learned response count */
+#/* for the service where known. If the adapter rejects the     */
+#/* count, or the count turns out to be wrong, the request is   */
+#/* sent again without it and the learned count is corrected.   */
+#/***************************************************************/
+	def GetObdResponse(self, Request):
+		Service = Request[:2]
+
+		StartTime = time.perf_counter()
+		Path = "PLAIN"
+		if Service in self.ResponseCounts:
+			Response = self.GetResponse(self.ObdRequestData(Request, self.ResponseCounts[Service]))
+			Path = "LEARNED"
+			if self.CheckCountedResponse(Service, Response) == True:
+				StartTime = time.perf_counter()
+				Path = "PLAIN"
+		if Path == "PLAIN":
+			Response = self.GetResponse(self.ObdRequestData(Request))
+			self.CheckPlainResponse(Service)
+		self.CountRequestLatency(Path, StartTime)
+
+		if self.CheckBackOff(Response) == True:
+			self.BackOffTiming()
+			Response = self.GetResponse(self.ObdRequestData(Request))
+
+		return Response
+
+
+
+#/*****************************************************************/
+#/* Get the data to send for an OBDII request, with a response    */
+#/* count when one is given.                                      */
+#/*****************************************************************/
+	def ObdRequestData(self, Request, Count = None):
+		if Count != None:
+			Request += "{:X}".format(Count)
+
+		return bytearray(Request + "\r", 'UTF-8')
+
+
+
+#/*****************************************************************/
+#/* Check the response to a request sent with the learned         */
+#/* response count, correcting the count where the response shows */
+#/* it is wrong. Returns True when the request must be sent again */
+#/* without a count.                                              */
+#/*****************************************************************/
+	def CheckCountedResponse(self, Service, Response):
+		Result = False
+
+		if Response.strip() == '?':
+			# The ELM327 does not support a response count, stop using it.
+			self.ResponseCounts = {}
+			Result = True
+		elif self.NoData == True:
+			# The first ECU to answer may not hold the data, check without a response count.
+			Result = True
+		else:
+			# Fewer answers than expected means the ELM327 waited for its full timeout.
+			Count = self.CountMessages(Response, Service)
+			if Count == 0:
+				self.ResponseCounts.pop(Service, None)
+			elif Count < self.ResponseCounts[Service]:
+				self.ResponseCounts[Service] = Count
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* After a request sent without a count, stop using a learned    */
+#/* count which missed the data.                                  */
+#/*****************************************************************/
+	def CheckPlainResponse(self, Service):
+		if self.NoData == False:
+			self.ResponseCounts.pop(Service, None)
+
+
+
+#/*****************************************************************/
+#/* Add the time taken by a request to the latency of its path.   */
+#/*****************************************************************/
+	def CountRequestLatency(self, Path, StartTime):
+		self.RequestLatency[Path][0] += 1
+		self.RequestLatency[Path][1] += time.perf_counter() - StartTime
+
+
+
+#/*****************************************************************/
+#/* Count the responses the ECU fails to answer within the tuned  */
+#/* timeout. Returns True when there are enough in a row that the */
+#/* timeout must be backed off and the request sent again.        */
+#/*****************************************************************/
+	def CheckBackOff(self, Response):
+		Result = False
+
+		if self.TimingTuned == True:
+			if self.IsTimeOut(Response):
+				self.TimeoutFailCount += 1
+				if self.TimeoutFailCount >= ELM_TUNE_BACKOFF_COUNT and self.TimeoutValue < ELM_TIMEOUT_MAX:
+					Result = True
+			else:
+				self.TimeoutFailCount = 0
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Check if a response timed out, nothing was received or the    */
+#/* prompt never came. NO DATA is an answer, the ECU has no data  */
+#/* for the request, not a sign the timeout is too short.         */
+#/*****************************************************************/
+	def IsTimeOut(self, Response):
+		return self.PromptFound == False or Response.strip() == ""
+
+
+
+#/*****************************************************************/
+#/* Get the vehicle VIN used to save settings for this vehicle.   */
+#/*****************************************************************/
+	def GetVehicleId(self):
+		if self.VehicleId == "":
+			try:
+				if '0902' not in self.ValidPIDs:
+					self.PID0900()
+				VehicleId = self.DoPID("0902").replace(' ', '')
+				if VehicleId != "" and VehicleId != STRING_NO_DATA and VehicleId != STRING_ERROR:
+					self.VehicleId = VehicleId
+			except Exception as Catch:
+				print(STRING_ERROR + " getting VIN : " + str(Catch))
+
+		return self.VehicleId
+
+
+
+#/*****************************************************************/
+#/* Read the VIN from the ECU, whether or not Mode 09 support is  */
+#/* known yet.                                                    */
+#/*****************************************************************/
+	def ReadVehicleId(self):
+		Response = self.GetResponse(b'0902\r')
+		Response = self.PruneData(Response, 3)
+
+		return str(bytearray.fromhex(Response).replace(bytes([0x00]), b' '), 'UTF-8')
+
+
+
+#/*****************************************************************/
+#/* Measure the polling rate using a simple request the ECU will  */
+#/* always answer, returning requests per second or zero if any   */
+#/* request is not answered. The learned response count is        */
+#/* appended as for other requests, but not changed by the probe. */
+#/*****************************************************************/
+	def MeasurePollRate(self):
+		Request = self.ObdRequestData("0100", self.ResponseCounts.get('01'))
+
+		StartTime = time.perf_counter()
+		for Count in range(ELM_TUNE_SAMPLE_COUNT):
+			Response = self.GetResponse(Request)
+			if self.NoData == True or Response.find('41') == -1:
+				return 0.0
+
+		return ELM_TUNE_SAMPLE_COUNT / (time.perf_counter() - StartTime)
+
+
+
+#/*****************************************************************/
+#/* Set the ELM327 response timeout and adaptive timing mode.     */
+#/*****************************************************************/
+	def SetTiming(self, TimeoutValue, AdaptiveTiming):
+		self.TimeoutValue = TimeoutValue
+		self.AdaptiveTiming = AdaptiveTiming
+		self.GetResponse(bytearray("AT AT" + str(AdaptiveTiming) + "\r", 'UTF-8'))
+		self.GetResponse(bytearray("AT ST " + "{:02X}".format(TimeoutValue) + "\r", 'UTF-8'))
+
+
+
+#/*****************************************************************/
+#/* Find the lowest response timeout the ECU answers reliably     */
+#/* within, and the most aggressive adaptive timing which still   */
+#/* works. The settings are only kept when they poll faster than  */
+#/* the settings before tuning. Settings found are saved by       */
+#/* vehicle VIN and reused on later connections.                  */
+#/*****************************************************************/
+	def TuneTiming(self):
+		self.TimingTuned = False
+		self.TimeoutFailCount = 0
+
+		try:
+			PreviousTimeoutValue = self.TimeoutValue
+			PreviousAdaptiveTiming = self.AdaptiveTiming
+			self.PollRateBefore = self.MeasurePollRate()
+
+			VehicleId = self.GetVehicleId()
+			Records = LoadRecords(TIMING_FILE_NAME)
+			if VehicleId != "" and VehicleId in Records:
+				# Reuse the settings previously found for this vehicle.
+				self.SetTiming(int(Records[VehicleId]["ST"], 16), int(Records[VehicleId]["AT"]))
+				self.PollRateAfter = self.MeasurePollRate()
+				if self.PollRateAfter == 0.0:
+					self.SetTiming(PreviousTimeoutValue, PreviousAdaptiveTiming)
+					Records.pop(VehicleId, None)
+			if VehicleId == "" or VehicleId not in Records:
+				# With adaptive timing off, step the timeout down until the ECU stops answering.
+				TimeoutIndex = 0
+				for Index in range(len(ELM_TIMEOUT_STEPS)):
+					self.SetTiming(ELM_TIMEOUT_STEPS[Index], 0)
+					if self.MeasurePollRate() == 0.0:
+						break
+					TimeoutIndex = Index
+				# Keep one step of margin above the lowest timeout which worked.
+				TimeoutValue = ELM_TIMEOUT_STEPS[max(TimeoutIndex - 1, 0)]
+				# Try aggressive adaptive timing, then normal adaptive timing.
+				for AdaptiveTiming in (2, 1):
+					self.SetTiming(TimeoutValue, AdaptiveTiming)
+					self.PollRateAfter = self.MeasurePollRate()
+					if self.PollRateAfter > 0.0:
+						break
+			# Keep the settings before tuning when the new settings are no faster.
+			if self.PollRateAfter <= self.PollRateBefore:
+				self.SetTiming(PreviousTimeoutValue, PreviousAdaptiveTiming)
+				self.PollRateAfter = self.PollRateBefore
+			if VehicleId != "" and VehicleId not in Records:
+				Records[VehicleId] = { "ST": "{:02X}".format(self.TimeoutValue), "AT": str(self.AdaptiveTiming) }
+				SaveRecords(TIMING_FILE_NAME, Records)
+			self.TimingTuned = True
+		except Exception as Catch:
+			print(STRING_ERROR + " tuning timing : " + str(Catch))
+
+
+
+#/*****************************************************************/
+#/* Increase the response timeout and fall back to normal         */
+#/* adaptive timing when the ECU repeatedly fails to answer       */
+#/* within the tuned timeout, saving the new settings.            */
+#/*****************************************************************/
+	def BackOffTiming(self):
+		self.TimeoutFailCount = 0
+		self.SetTiming(min(2 * self.TimeoutValue, ELM_TIMEOUT_MAX), 1)
+		if self.VehicleId != "":
+			Records = LoadRecords(TIMING_FILE_NAME)
+			Records[self.VehicleId] = { "ST": "{:02X}".format(self.TimeoutValue), "AT": str(self.AdaptiveTiming) }
+			SaveRecords(TIMING_FILE_NAME, Records)
+		if DEBUG == "ON":
+			print("TIMING BACK OFF: AT ST " + "{:02X}".format(self.TimeoutValue))
+
+
+
+#/*****************************************************************/
+#/* Get the response timeout settings and the polling rate before */
+#/* and after they were tuned.                                    */
+#/*****************************************************************/
+	def GetTimingInfo(self):
+		Result = ""
+
+		if self.TimingTuned == True:
+			Result += "Response Timeout|AT ST " + "{:02X}".format(self.TimeoutValue) + " (" + str(4 * self.TimeoutValue) + " ms) AT AT" + str(self.AdaptiveTiming) + "\n"
+			Result += "Polling Rate Before Tuning|" + "{:1.1f}".format(self.PollRateBefore) + " requests/s\n"
+			Result += "Polling Rate After Tuning|" + "{:1.1f}".format(self.PollRateAfter) + " requests/s\n"
+
+		return Result
+
+
+
+#/*************************************************/
+#/* Talk to the ELM327 device over a serial port. */
+#/* Send request data, and wait for the response. */
+#/* The expected response ends with a prompt      */
+#/* character '>', the ELM327 provides promting   */
+#/* for more user requests.                       */
+#/* Otherwise a timeout occurs waiting for a      */
+#/* response.                                     */
+#/*************************************************/
+	def GetResponse(self, Data, no_ret = False):
+		Data = Data.replace(b'\r', SERIAL_LINEFEED_TYPE)
+
+		if len(Data) > 0:
+			if DEBUG == "ON":
+				print("DEBUG SENDING [" + str(len(Data)) + "] " + str(Data))
+			self.ELM327.write(Data)
+
+		StartTime = time.perf_counter()
+		ReceivedData = self.ReadResponse(no_ret)
+
+		return self.DecodeResponse(ReceivedData, StartTime)
+
+
+
+#/****************************************************/
+#/* Convert a raw response from the ELM327 device to */
+#/* text lines, and add it to the link statistics.   */
+#/****************************************************/
+	def DecodeResponse(self, ReceivedData, StartTime):
+		ParseTime = time.perf_counter()
+
+		# Reject characters above 127 and convert carriage returns to linefeeds in a single pass.
+		if DEBUG == "ON" and ReceivedData.translate(None, RESPONSE_DELETE) != ReceivedData:
+			print("REJECTING RECEIVED CHARACTERS: " + str([Char for Char in ReceivedData if Char > 127]))
+		Result = ReceivedData.translate(RESPONSE_TRANSLATE, RESPONSE_DELETE)
+		if b'\n\n' in Result:
+			Result = Result.replace(b'\n\n', b'\n')
+		self.NoData = b'NO DATA' in Result
+		if self.NoData:
+			# Seven zero data bytes, as a single frame from a CAN ID of zero with headers on.
+			if self.HeaderDigits == IsoTp.HEADERS_OFF:
+				Result = Result.replace(b'NO DATA', b'00000000000000')
+			else:
+				Result = Result.replace(b'NO DATA', b'0' * self.HeaderDigits + b'0700000000000000')
+		if b'SEARCHING...\n' in Result:
+			Result = Result.replace(b'SEARCHING...\n', b'\n')
+		Result = Result.decode('utf-8')
+		if Result[-1:] != '\n':
+			Result += '\n'
+
+		EndTime = time.perf_counter()
+		self.ResponseCount += 1
+		self.ReceivedByteCount += len(ReceivedData) + 1
+		self.ReceiveSeconds += ParseTime - StartTime
+		self.ParseSeconds += EndTime - ParseTime
+
+		if DEBUG == "ON":
+			print("DEBUG RECEIVED [" + str(len(Result)) + "] " + str('%r' % Result))
+
+		return Result
+
+
+
+#/****************************************************/
+#/* Read the raw response from the ELM327 device, in */
+#/* bulk as data arrives, up to the prompt character */
+#/* or a timeout. Any data following the prompt is   */
+#/* kept in the receive buffer for the next read.    */
+#/****************************************************/
+	def ReadResponse(self, no_ret = False):
+		Buffer = self.ReceiveBuffer
+		Prompt = self.FindResponseEnd(no_ret)
+		while Prompt == -1:
+			ReadData = self.ELM327.read(self.ELM327.in_waiting or 1)
+			if ReadData == b'':
+				self.PromptFound = False
+				return self.TakeReceived(len(Buffer))
+			SearchFrom = len(Buffer)
+			Buffer += ReadData
+			Prompt = self.FindResponseEnd(no_ret, SearchFrom)
+		self.PromptFound = True
+
+		return self.TakeReceived(Prompt)
+
+
+
+#/****************************************************/
+#/* Find the end of a whole response in the receive  */
+#/* buffer, the prompt or, when no prompt follows    */
+#/* the command, the carriage return after an OK.    */
+#/* Returns -1 when the response is not complete.    */
+#/****************************************************/
+	def FindResponseEnd(self, no_ret, SearchFrom = 0):
+		Buffer = self.ReceiveBuffer
+		Result = Buffer.find(b'>', SearchFrom)
+		if no_ret and Result == -1:
+			LineEnd = Buffer.find(b'\r')
+			if LineEnd != -1 and Buffer[:LineEnd].translate(None, RESPONSE_DELETE) == b'OK':
+				Result = LineEnd
+
+		return Result
+
+
+
+#/****************************************************/
+#/* Take received data from the front of the receive */
+#/* buffer, discarding the prompt or carriage return */
+#/* ending it.                                       */
+#/****************************************************/
+	def TakeReceived(self, Length):
+		ReceivedData = bytes(self.ReceiveBuffer[:Length])
+		del self.ReceiveBuffer[:Length + 1]
+
+		return ReceivedData
+
+
+
+#/****************************************************/
+#/* Get the response bytes and parse timing gathered */
+#/* by GetResponse since the last reset. The time of */
+#/* each response runs from sending the request to   */
+#/* the prompt, so includes the ECU response time    */
+#/* and is not the serial link throughput.           */
+#/****************************************************/
+	def GetLinkStatistics(self):
+		Result = ""
+
+		if self.ReceiveSeconds > 0:
+			Result += "Response Bytes Per Request Second|" + "{:1.0f}".format(self.ReceivedByteCount / self.ReceiveSeconds) + " bytes/s\n"
+		if self.ResponseCount > 0:
+			Result += "Responses Received|" + str(self.ResponseCount) + "\n"
+			Result += "Parse Time Per Response|" + "{:1.1f}".format(1000000 * self.ParseSeconds / self.ResponseCount) + " us\n"
+		if len(self.ResponseCounts) > 0:
+			Result += "Expected ECU Responses|"
+			for Service in sorted(self.ResponseCounts):
+				Result += "Mode " + Service + ": " + str(self.ResponseCounts[Service]) + " "
+			Result += "\n"
+		for Path, Label in (("LEARNED", "Request Latency With Count|"), ("PLAIN", "Request Latency Without Count|")):
+			if self.RequestLatency[Path][0] > 0:
+				Result += Label + "{:1.1f}".format(1000 * self.RequestLatency[Path][1] / self.RequestLatency[Path][0]) + " ms\n"
+
+		return Result
+
+
+
+#/*************************************************/
+#/* Reset the serial link statistics to zero.     */
+#/*************************************************/
+	def ResetLinkStatistics(self):
+		self.ResponseCount = 0
+		self.ReceivedByteCount = 0
+		self.ReceiveSeconds = 0.0
+		self.ParseSeconds = 0.0
+		self.RequestLatency = { "LEARNED": [0, 0.0], "PLAIN": [0, 0.0] }
+
+
+
+#/****************************************************/
+#/* Read a single line from the ELM327 device, up to */
+#/* a carriage return or a timeout, through the      */
+#/* receive buffer used by ReadResponse.             */
+#/****************************************************/
+	def ReadLine(self):
+		Buffer = self.ReceiveBuffer
+		LineEnd = Buffer.find(b'\r')
+		while LineEnd == -1:
+			ReadData = self.ELM327.read(self.ELM327.in_waiting or 1)
+			if ReadData == b'':
+				return self.TakeReceived(len(Buffer))
+			SearchFrom = len(Buffer)
+			Buffer += ReadData
+			LineEnd = Buffer.find(b'\r', SearchFrom)
+
+		return self.TakeReceived(LineEnd)
+
+
+
+	def ChangeBaud(self, Data, ResponseID, newBaud):
+		
+		oldBaud = self.ELM327.baudrate
+		
+		if len(Data) > 0:
+			if DEBUG == "ON":
+				print("DEBUG SENDING [" + str(len(Data)) + "] " + str(Data))
+			self.ELM327.write(Data)
+			
+		# The ELM327 confirms with OK and no prompt before changing baud rate.
+		Response = self.ReadResponse(no_ret = True).translate(RESPONSE_TRANSLATE, RESPONSE_DELETE)
+		Response = str(Response, 'utf-8').strip()
+		
+		if Response == 'OK':
+			self.ELM327.baudrate = newBaud
+			
+			Response = self.ReadLine().translate(RESPONSE_TRANSLATE, RESPONSE_DELETE)
+			Response = str(Response, 'utf-8')
+			
+			if Response.strip() != ResponseID.strip():
+				self.ELM327.baudrate = (oldBaud)
+				print("FAILED to set baud " + str(newBaud))
+				# The ELM327 returns to the old baud rate and prompts when no carriage return is received.
+				self.ReceiveBuffer = bytearray()
+				self.GetResponse(b'')
+			else:
+				Response = self.GetResponse(b'\r')
+				if Response != 'OK\n':
+					self.InitResult += "FAILED\n"
+					print("FAILED to set baud " + str(newBaud))
+				else:
+					print("Set to  " + str(newBaud))
+		else:
+			print("Command failed with : " + Response)
+			if self.PromptFound == False:
+				self.GetResponse(b'')
+	
+		return self.ELM327.baudrate
+
+
+#/*****************************************************************/
+#/* Check the serial link at the current baud rate with a burst   */
+#/* of device ID requests, returning the bytes per second         */
+#/* received and the number of corrupted responses and bytes.     */
+#/*****************************************************************/
+	def ProbeBaud(self, ResponseID):
+		ErrorCount = 0
+		ByteCount = 0
+
+		StartTime = time.perf_counter()
+		for Count in range(BAUD_PROBE_COUNT):
+			self.ELM327.write(b'AT I' + SERIAL_LINEFEED_TYPE)
+			ReceivedData = self.ReadResponse()
+			ByteCount += len(ReceivedData) + 1
+			Response = ReceivedData.translate(RESPONSE_TRANSLATE, RESPONSE_DELETE)
+			ErrorCount += len(ReceivedData) - len(Response)
+			if Response.decode('utf-8').replace('\n\n', '\n').strip() != ResponseID.strip():
+				ErrorCount += 1
+		ElapsedTime = time.perf_counter() - StartTime
+
+		return ByteCount / ElapsedTime, ErrorCount
+
+
+
+#/*****************************************************************/
+#/* Find the fastest baud rate the ELM327 device and serial port  */
+#/* communicate at without corruption, trying each rate from the  */
+#/* highest to the lowest. The rate found is saved for the serial */
+#/* port and device, and tried first on the next connection.      */
+#/*****************************************************************/
+	def NegotiateBaud(self, ResponseID):
+		self.BaudReport = []
+		BaseBaud = self.ELM327.baudrate
+		AdapterKey = str(SERIAL_PORT_NAME) + "," + ResponseID.strip()
+
+		Records = LoadRecords(BAUD_FILE_NAME)
+		Ladder = list(BAUD_RATE_LADDER)
+		if AdapterKey in Records:
+			# Try the baud rate previously found for this adapter first.
+			CachedBaud = int(Records[AdapterKey]["Baud"])
+			for ThisBaud, Command in BAUD_RATE_LADDER:
+				if ThisBaud == CachedBaud:
+					Ladder.remove((ThisBaud, Command))
+					Ladder.insert(0, (ThisBaud, Command))
+
+		BestBaud = BaseBaud
+		for ThisBaud, Command in Ladder:
+			if self.ChangeBaud(Command, ResponseID, ThisBaud) == ThisBaud:
+				BytesPerSecond, ErrorCount = self.ProbeBaud(ResponseID)
+				self.BaudReport.append((ThisBaud, BytesPerSecond, ErrorCount))
+				if ErrorCount == 0:
+					BestBaud = ThisBaud
+					break
+				# Return to the starting baud rate before trying the next rate.
+				self.ChangeBaud(BAUD_RATE_BASE_COMMAND, ResponseID, BaseBaud)
+			else:
+				self.BaudReport.append((ThisBaud, 0.0, -1))
+
+		if BestBaud == BaseBaud:
+			BytesPerSecond, ErrorCount = self.ProbeBaud(ResponseID)
+			self.BaudReport.append((BaseBaud, BytesPerSecond, ErrorCount))
+
+		Records[AdapterKey] = { "Baud": str(BestBaud) }
+		SaveRecords(BAUD_FILE_NAME, Records)
+
+		return BestBaud
+
+
+
+#/*****************************************************************/
+#/* Get the throughput and errors measured for each baud rate     */
+#/* tried when the baud rate was negotiated.                      */
+#/*****************************************************************/
+	def GetBaudInfo(self):
+		Result = ""
+
+		for ThisBaud, BytesPerSecond, ErrorCount in self.BaudReport:
+			Result += "Baud " + str(ThisBaud) + "|"
+			if ErrorCount == -1:
+				Result += "NOT ACCEPTED\n"
+			else:
+				Result += "{:1.0f}".format(BytesPerSecond) + " bytes/s, " + str(ErrorCount) + " errors\n"
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Find the PIDs supported in a mode, Mode 02 for a freeze frame */
+#/* or Mode 05 as 0501 for the oxygen sensors, requesting all the */
+#/* support PIDs in as few requests as the protocol allows, and   */
+#/* only while the last bitmap shows the next one is supported.   */
+#/*****************************************************************/
+	def DiscoverSupportedPIDs(self, Mode, FreezeIndex = -1):
+		PidDescriptions = self.PidDescriptionsMode01
+		if Mode[:2] == '05':
+			PidDescriptions = self.PidDescriptionsMode05
+		elif Mode == '09':
+			PidDescriptions = self.PidDescriptionsMode09
+		FreezeFrame = ""
+		BatchCount = 1
+		if Mode == '02':
+			FreezeFrame = "{:02d}".format(FreezeIndex)
+			if self.IsCAN:
+				BatchCount = BATCH_FREEZE_PID_COUNT
+		elif self.IsCAN:
+			BatchCount = BATCH_PID_COUNT
+
+		Bitmaps = {}
+		Index = 0
+		while Index < len(SUPPORT_PIDS):
+			Request = Mode
+			for Start in SUPPORT_PIDS[Index:Index + BatchCount]:
+				Request += Start + FreezeFrame
+			for EcuId, Start, Bitmap in self.SplitSupportResponse(Mode, self.GetObdResponse(Request)):
+				# The PIDs supported by any ECU are valid.
+				Bitmaps[Start] = Bitmaps.get(Start, 0) | Bitmap
+				if Mode != '02' and self.HeaderDigits != IsoTp.HEADERS_OFF:
+					self.ResolveEcuPidData(Mode, "{:08X}".format(Bitmap), Start, PidDescriptions, EcuId)
+			# Follow the next support PID bits through the bitmaps received.
+			BatchEnd = min(len(SUPPORT_PIDS), Index + BatchCount)
+			while Index < BatchEnd and Bitmaps.get(SUPPORT_PIDS[Index], 0) & 1:
+				Index += 1
+			if Index < BatchEnd:
+				break
+
+		for Start in SUPPORT_PIDS[:Index + 1]:
+			if Start in Bitmaps:
+				self.ResolvePidData(Mode, "{:08X}".format(Bitmaps[Start]), Start, PidDescriptions, FreezeIndex)
+
+
+
+#/*****************************************************************/
+#/* Split the response to a support PID request into a list of    */
+#/* [CAN ID, Support PID, Bitmap] for each bitmap answered.       */
+#/*****************************************************************/
+	def SplitSupportResponse(self, Mode, Response):
+		Result = []
+
+		ResponseStart = bytes([0x40 | int(Mode[:2], 16)]) + bytes.fromhex(Mode[2:])
+		# A freeze frame number follows each Mode 02 PID, and a message number each non CAN Mode 09 PID.
+		Skip = 1
+		if Mode == '02' or (Mode == '09' and not self.IsCAN):
+			Skip = 2
+		for EcuId, Message in self.SplitEcuMessages(Response):
+			if Message[:len(ResponseStart)] == ResponseStart:
+				Position = len(ResponseStart)
+				while Position + Skip + 4 <= len(Message) and Message[Position] in SUPPORT_PID_NUMBERS:
+					Bitmap = int.from_bytes(Message[Position + Skip:Position + Skip + 4], 'big')
+					Result.append([EcuId, SUPPORT_PID_NUMBERS[Message[Position]], Bitmap])
+					Position += Skip + 4
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Resolve a bitmaped supported PIDs response from the ECU and   */
+#/* add them to the list of currently supported PIDs for the ECU. */
+#/* Where several ECUs answer, their bitmaps are combined.        */
+#/*****************************************************************/
+	def ResolvePidData(self, PidMode, PidData, PidStart, PidDescriptions, FreezeIndex = -1):
+		PidValue = 0
+		for Index in range(0, len(PidData) - 7, 8):
+			PidValue |= int(PidData[Index:Index + 8], 16)
+		# Keep the bitmap so it can be saved with the vehicle capabilities.
+		if PidMode == '02':
+			ThisFreezeIndex = "{:02d}".format(FreezeIndex)
+			self.SupportData[PidMode + PidStart + "_" + ThisFreezeIndex] = "{:08X}".format(PidValue)
+			ValidPIDs = self.ValidFreezePIDs
+		else:
+			ThisFreezeIndex = ""
+			self.SupportData[PidMode + PidStart] = "{:08X}".format(PidValue)
+			ValidPIDs = self.ValidPIDs
+		PidIndexes = SupportPidIndexes[PidStart]
+		while PidValue > 0:
+			Bit = PidValue.bit_length() - 1
+			PidValue ^= 1 << Bit
+			PidIndex = PidIndexes[Bit]
+			# Mode 05 descriptions include the test ID, for example 0101.
+			if PidMode[2:] + PidIndex in PidDescriptions:
+				ValidPIDs[PidMode + PidIndex + ThisFreezeIndex] = PidDescriptions[PidMode[2:] + PidIndex]
+			else:
+				ValidPIDs[PidMode + PidIndex + ThisFreezeIndex] = STRING_NO_DESCRIPTION
+			if DEBUG == "ON":
+				print("VALID PID FOUND: " + PidMode + PidIndex + ThisFreezeIndex)
+
+
+
+#/*****************************************************************/
+#/* With headers on, resolve the supported PID bitmap answered by */
+#/* each ECU in a response to a support PID request.              */
+#/*****************************************************************/
+	def ResolveEcuSupport(self, PidMode, Response, PidStart, PidDescriptions):
+		if self.HeaderDigits != IsoTp.HEADERS_OFF:
+			ResponseStart = bytes([0x40 | int(PidMode, 16), int(PidStart, 16)])
+			for EcuId, Message in self.SplitEcuMessages(Response):
+				if Message[:2] == ResponseStart and len(Message) >= 6:
+					self.ResolveEcuPidData(PidMode, Message[2:6].hex().upper(), PidStart, PidDescriptions, EcuId)
+
+
+
+#/*****************************************************************/
+#/* Add the PIDs in a supported PID bitmap to the valid PIDs of   */
+#/* an ECU.                                                       */
+#/*****************************************************************/
+	def ResolveEcuPidData(self, PidMode, PidData, PidStart, PidDescriptions, EcuId):
+		# Keep the bitmap so it can be saved with the vehicle capabilities.
+		self.EcuSupportData[PidMode + PidStart + "_" + EcuId] = PidData
+		if EcuId not in self.EcuValidPIDs:
+			self.EcuValidPIDs[EcuId] = {}
+		PidIndexes = SupportPidIndexes[PidStart]
+		PidValue = int(PidData, 16)
+		while PidValue > 0:
+			Bit = PidValue.bit_length() - 1
+			PidValue ^= 1 << Bit
+			PidIndex = PidIndexes[Bit]
+			if PidMode[2:] + PidIndex in PidDescriptions:
+				self.EcuValidPIDs[EcuId][PidMode + PidIndex] = PidDescriptions[PidMode[2:] + PidIndex]
+			else:
+				self.EcuValidPIDs[EcuId][PidMode + PidIndex] = STRING_NO_DESCRIPTION
+
+
+
+#/**********************************************************/
+#/* Convert pairs of data bytes into actual trouble codes, */
+#/* translating the first digit as required, and ignoring  */
+#/* zero value data.                                       */
+#/**********************************************************/
+	def DataToTroubleCodes(self, Data):
+		TroubleCodes = list()
+		while len(Data) > 0:
+			ThisCode = Data[:4]
+			if int(ThisCode, 16) != 0:
+				TroubleCodes.append(self.TroubleCodePrefix[ThisCode[0]] + ThisCode[1:])
+			Data = Data[4:]
+		return TroubleCodes
+
+
+
+#/*****************************************************/
+#/* Get the trouble codes from the ECU and lookup the */
+#/* trouble code descriptions. Return the data in a   */
+#/* data array.                                       */
+#/*****************************************************/
+	def GetTroubleCodeData(self, OBDIImode):
+		TroubleCodeData = {}
+		Response = self.GetResponse(OBDIImode + b'\r')
+		# CAN protocols include a trouble code count byte, other protocols do not.
+		if self.IsCAN:
+			Response = self.PruneData(Response, 2)
+		else:
+			Response = self.PruneData(Response, 1)
+		TroubleCodes = self.DataToTroubleCodes(Response)
+		for TroubleCode in TroubleCodes:
+			if TroubleCode in self.TroubleCodeDescriptions:
+				TroubleCodeData[TroubleCode] = self.TroubleCodeDescriptions[TroubleCode]
+			else:
+				TroubleCodeData[TroubleCode] = STRING_NO_DESCRIPTION
+		return TroubleCodeData
+
+
+
+#/*******************************************************/
+#/* The OBDII protocol will sometimes prefix a response */
+#/* with confirmation of the request sent or other      */
+#/* unwanted bytes of data. Use this function to remove */
+#/* unwanted bytes from the start of each message, and  */
+#/* concatenate the remainder of the response into a    */
+#/* single line of data, ready for processing.          */
+#/*******************************************************/
+	def PruneData(self, Data, RemoveByteCount):
+		Response = ""
+		for Message in self.SplitMessages(Data):
+			Response += Message[RemoveByteCount:].hex().upper()
+		return Response
+
+
+#/**************************************/
+#/* ODBII MODE 01 - Show current data. */
+#/**************************************/
+
+# PIDs with a formula in DATA/PidFormulas.txt are decoded by DecodePID, and are not listed here.
+
+# PID0100 Supported PIDs for Mode 1 [01 -> 20].
+	def PID0100(self, FreezeIndex = -1):
+		Response = self.GetObdResponse('0100')
+		self.ResolveEcuSupport('01', Response, '00', self.PidDescriptionsMode01)
+		Response = self.PruneData(Response, 2)
+		self.ResolvePidData('01', Response, '00', self.PidDescriptionsMode01)
+	PidFunctions["0100"] = PID0100
 
 
 # PID0101 Get Monitor status since DTCs cleared from the ECU.
@@ -721,14 +2293,9 @@ class ELM327:
 		ResultArray = ()
 
 		if '0101' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0101\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0201" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
+			Data = self.GetPidBytes('0101', FreezeIndex)
 
-			ResultVal1 = int(Response[:2], 16)
+			ResultVal1 = Data[0]
 			if (ResultVal1 & 0x80) != 0:
 				self.MilOn = True
 				ResultArray += ("MIL:ON",)
@@ -738,7 +2305,7 @@ class ELM327:
 			self.FreezeFrameCount = ResultVal1 & 0x7F
 			ResultArray += ("STORED TROUBLE CODE COUNT|" + str(self.FreezeFrameCount),)
 
-			ResultVal1 = int(Response[2:4], 16)
+			ResultVal1 = Data[1]
 
 			AppendText = ""
 			if (ResultVal1 & 0x01) != 0:
@@ -764,8 +2331,8 @@ class ELM327:
 			if (ResultVal1 & 0x08) != 0:
 				ResultArray += ("IGNITION|COMPRESSION",)
 
-				ResultVal1 = int(Response[4:6], 16)
-				ResultVal2 = int(Response[6:8], 16)
+				ResultVal1 = Data[2]
+				ResultVal2 = Data[3]
 
 				AppendText = ""
 				if (ResultVal1 & 0x01) != 0:
@@ -825,8 +2392,8 @@ class ELM327:
 			else:
 				ResultArray += ("IGNITION|SPARK",)
 
-				ResultVal1 = int(Response[4:6], 16)
-				ResultVal2 = int(Response[6:8], 16)
+				ResultVal1 = Data[2]
+				ResultVal2 = Data[3]
 
 				AppendText = ""
 				if (ResultVal1 & 0x01) != 0:
@@ -839,378 +2406,104 @@ class ELM327:
 				if (ResultVal1 & 0x02) != 0:
 					AppendText = "HEATED CATALYST TEST"
 					if (ResultVal2 & 0x02) != 0:
-						AppendText += "|[INCOMPLETE]"
-				ResultArray += (AppendText,)
-
-				AppendText = ""
-				if (ResultVal1 & 0x04) != 0:
-					AppendText = "EVAPORATIVE SYSTEM TEST"
-					if (ResultVal2 & 0x04) != 0:
-						AppendText += "|[INCOMPLETE]"
-				ResultArray += (AppendText,)
-
-				AppendText = ""
-				if (ResultVal1 & 0x08) != 0:
-					AppendText = "SECONDARY AIR SYSTEM TEST"
-					if (ResultVal2 & 0x08) != 0:
-						AppendText += "|[INCOMPLETE]"
-				ResultArray += (AppendText,)
-
-				AppendText = ""
-				if (ResultVal1 & 0x10) != 0:
-					AppendText = "A/C REFRIGERANT TEST"
-					if (ResultVal2 & 0x10) != 0:
-						AppendText += "|[INCOMPLETE]"
-				ResultArray += (AppendText,)
-
-				AppendText = ""
-				if (ResultVal1 & 0x20) != 0:
-					AppendText = "OXYGEN SENSOR TEST"
-					if (ResultVal2 & 0x20) != 0:
-						AppendText += "|[INCOMPLETE]"
-				ResultArray += (AppendText,)
-
-				AppendText = ""
-				if (ResultVal1 & 0x40) != 0:
-					AppendText = "OXYGEN SENSOR HEATER TEST"
-					if (ResultVal2 & 0x40) != 0:
-						AppendText += "|[INCOMPLETE]"
-				ResultArray += (AppendText,)
-
-				AppendText = ""
-				if (ResultVal1 & 0x80) != 0:
-					AppendText = "EGR SYSTEM TEST"
-					if (ResultVal2 & 0x80) != 0:
-						AppendText += "|[INCOMPLETE]"
-				ResultArray += (AppendText,)
-
-			Result = ResultArray
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0101"] = PID0101
-	PidFunctions["0201"] = PID0101
-
-
-# PID0102 Freeze DTC.
-	def PID0102(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if FreezeIndex == -1:
-			Response = self.GetResponse(b'0102\r')
-			Response = self.PruneData(Response, 2)
-		else:
-			Response = self.GetResponse(bytearray("0202" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-			Response = self.PruneData(Response, 3)
-
-		TroubleCodes = self.DataToTroubleCodes(Response)
-		if TroubleCodes[0] in self.TroubleCodeDescriptions:
-			Result = TroubleCodes[0] + " " + self.TroubleCodeDescriptions[TroubleCodes[0]]
-		else:
-			Result = STRING_NO_DESCRIPTION
-
-		return Result
-	PidFunctions["0102"] = PID0102
-	PidFunctions["0202"] = PID0102
-
-
-# PID0103 Get the Fuel system status from the ECU.
-	def PID0103(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-		ResultArray = ()
-
-		if '0103' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0103\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0203" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			if Response[:2] in self.FuelSystemStatus:
-				ResultArray += ("Fuel System 1",)
-				ResultArray += (self.FuelSystemStatus[Response[:2]],)
-			else:
-				ResultArray += ("Fuel System 1",)
-				ResultArray += (STRING_INVALID,)
-			if Response[2:4] in self.FuelSystemStatus:
-				ResultArray += ("Fuel System 2",)
-				ResultArray += (self.FuelSystemStatus[Response[2:4]],)
-			else:
-				ResultArray += ("Fuel System 2",)
-				ResultArray += (STRING_INVALID,)
-
-			Result = ResultArray
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0103"] = PID0103
-	PidFunctions["0203"] = PID0103
-
-
-# PID0104 Get the current Calculated Engine Load from the ECU.
-	def PID0104(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0104' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0104\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0204" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = 100 * int(Response, 16) / 255
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0104"] = PID0104
-	PidFunctions["0204"] = PID0104
-
-
-# PID0105 Get the current Engine Coolant Temperature from the ECU.
-	def PID0105(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0105' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0105\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0205" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = int(Response, 16) - 40
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0105"] = PID0105
-	PidFunctions["0205"] = PID0105
-
-
-# PID0106 Get the current Short Term Fuel Trim Bank1 from the ECU.
-	def PID0106(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0106' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0106\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0206" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = (100 * int(Response, 16) / 128) - 100
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0106"] = PID0106
-	PidFunctions["0206"] = PID0106
-
-
-# PID0107 Get the Long term fuel trim—Bank from the ECU.
-	def PID0107(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0107' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0107\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0207" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = (100 * int(Response, 16) / 128) - 100
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0107"] = PID0107
-	PidFunctions["0207"] = PID0107
-
-
-# PID0108 Get the Short term fuel trim—Bank 2 from the ECU.
-	def PID0108(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0108' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0108\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0208" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = (100 * int(Response, 16) / 128) - 100
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0108"] = PID0108
-	PidFunctions["0208"] = PID0108
-
-
-# PID0109 Get the Long term fuel trim—Bank 2 from the ECU.
-	def PID0109(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0109' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0109\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0209" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = (100 * int(Response, 16) / 128) - 100
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0109"] = PID0109
-	PidFunctions["0209"] = PID0109
-
-
-# PID010A Get the Fuel pressure (gauge pressure) from the ECU.
-	def PID010A(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '010A' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'010A\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("020A" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = 3 * int(Response, 16)
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["010A"] = PID010A
-	PidFunctions["020A"] = PID010A
-
-
-# PID010B Get the Intake manifold absolute pressure from the ECU.
-	def PID010B(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '010B' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'010B\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("020B" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = int(Response, 16)
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["010B"] = PID010B
-	PidFunctions["020B"] = PID010B
-
-
-# PID010C Get the current Engine RPM from the ECU.
-	def PID010C(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
+						AppendText += "|[INCOMPLETE]"
+				ResultArray += (AppendText,)
 
-		if '010C' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'010C\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("020C" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = (256 * int(Response[:2], 16) + int(Response[2:4], 16)) / 4
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["010C"] = PID010C
-	PidFunctions["020C"] = PID010C
+				AppendText = ""
+				if (ResultVal1 & 0x04) != 0:
+					AppendText = "EVAPORATIVE SYSTEM TEST"
+					if (ResultVal2 & 0x04) != 0:
+						AppendText += "|[INCOMPLETE]"
+				ResultArray += (AppendText,)
 
+				AppendText = ""
+				if (ResultVal1 & 0x08) != 0:
+					AppendText = "SECONDARY AIR SYSTEM TEST"
+					if (ResultVal2 & 0x08) != 0:
+						AppendText += "|[INCOMPLETE]"
+				ResultArray += (AppendText,)
 
-# PID010D Get the Vehicle speed from the ECU.
-	def PID010D(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
+				AppendText = ""
+				if (ResultVal1 & 0x10) != 0:
+					AppendText = "A/C REFRIGERANT TEST"
+					if (ResultVal2 & 0x10) != 0:
+						AppendText += "|[INCOMPLETE]"
+				ResultArray += (AppendText,)
 
-		if '010D' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'010D\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("020D" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = int(Response[:2], 16) * 0.621371		# Convert km/h -> mph (non-standard)
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["010D"] = PID010D
-	PidFunctions["020D"] = PID010D
+				AppendText = ""
+				if (ResultVal1 & 0x20) != 0:
+					AppendText = "OXYGEN SENSOR TEST"
+					if (ResultVal2 & 0x20) != 0:
+						AppendText += "|[INCOMPLETE]"
+				ResultArray += (AppendText,)
 
+				AppendText = ""
+				if (ResultVal1 & 0x40) != 0:
+					AppendText = "OXYGEN SENSOR HEATER TEST"
+					if (ResultVal2 & 0x40) != 0:
+						AppendText += "|[INCOMPLETE]"
+				ResultArray += (AppendText,)
 
-# PID010E Get the Timing advance from the ECU.
-	def PID010E(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
+				AppendText = ""
+				if (ResultVal1 & 0x80) != 0:
+					AppendText = "EGR SYSTEM TEST"
+					if (ResultVal2 & 0x80) != 0:
+						AppendText += "|[INCOMPLETE]"
+				ResultArray += (AppendText,)
 
-		if '010E' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'010E\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("020E" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = (int(Response[:2], 16) / 2) - 64
+			Result = ResultArray
 		if DEBUG == "ON":
 			print(Result)
 		return Result
-	PidFunctions["010E"] = PID010E
-	PidFunctions["020E"] = PID010E
+	PidFunctions["0101"] = PID0101
+	PidFunctions["0201"] = PID0101
 
 
-# PID010F Get the Intake air temperature from the ECU.
-	def PID010F(self, FreezeIndex = -1):
+# PID0102 Freeze DTC.
+	def PID0102(self, FreezeIndex = -1):
 		Result = STRING_NO_DATA
 
-		if '010F' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'010F\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("020F" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = int(Response[:2], 16) - 40
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["010F"] = PID010F
-	PidFunctions["020F"] = PID010F
-
+		Response = self.GetPidData('0102', FreezeIndex)
 
-# PID0110 Get the MAF air flow rate from the ECU.
-	def PID0110(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
+		TroubleCodes = self.DataToTroubleCodes(Response)
+		if len(TroubleCodes) == 0:
+			Result = STRING_NO_DATA
+		elif TroubleCodes[0] in self.TroubleCodeDescriptions:
+			Result = TroubleCodes[0] + " " + self.TroubleCodeDescriptions[TroubleCodes[0]]
+		else:
+			Result = STRING_NO_DESCRIPTION
 
-		if '0110' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0110\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0210" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = (256 * int(Response[:2], 16) + int(Response[2:4], 16)) / 100
-		if DEBUG == "ON":
-			print(Result)
 		return Result
-	PidFunctions["0110"] = PID0110
-	PidFunctions["0210"] = PID0110
+	PidFunctions["0102"] = PID0102
+	PidFunctions["0202"] = PID0102
 
 
-# PID0111 Get the Throttle position from the ECU.
-	def PID0111(self, FreezeIndex = -1):
+# PID0103 Get the Fuel system status from the ECU.
+	def PID0103(self, FreezeIndex = -1):
 		Result = STRING_NO_DATA
+		ResultArray = ()
 
-		if '0111' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0111\r')
-				Response = self.PruneData(Response, 2)
+		if '0103' in self.ValidPIDs:
+			Response = self.GetPidData('0103', FreezeIndex)
+			if Response[:2] in self.FuelSystemStatus:
+				ResultArray += ("Fuel System 1",)
+				ResultArray += (self.FuelSystemStatus[Response[:2]],)
+			else:
+				ResultArray += ("Fuel System 1",)
+				ResultArray += (STRING_INVALID,)
+			if Response[2:4] in self.FuelSystemStatus:
+				ResultArray += ("Fuel System 2",)
+				ResultArray += (self.FuelSystemStatus[Response[2:4]],)
 			else:
-				Response = self.GetResponse(bytearray("0211" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = 100 * int(Response[:2], 16) / 255
+				ResultArray += ("Fuel System 2",)
+				ResultArray += (STRING_INVALID,)
+
+			Result = ResultArray
 		if DEBUG == "ON":
 			print(Result)
 		return Result
-	PidFunctions["0111"] = PID0111
-	PidFunctions["0211"] = PID0111
+	PidFunctions["0103"] = PID0103
+	PidFunctions["0203"] = PID0103
 
 
 # PID0112 Get the Commanded secondary air status from the ECU.
@@ -1218,12 +2511,7 @@ class ELM327:
 		Result = STRING_NO_DATA
 
 		if '0112' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0112\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0212" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
+			Response = self.GetPidData('0112', FreezeIndex)
 			if Response in self.CommandedSecondaryAirStatus:
 				Result = self.CommandedSecondaryAirStatus[Response]
 			else:
@@ -1239,13 +2527,8 @@ class ELM327:
 		Result = STRING_NO_DATA
 
 		if '0113' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0113\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0213" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			ResultVal = int(Response[:2], 16)
+			Data = self.GetPidBytes('0113', FreezeIndex)
+			ResultVal = Data[0]
 			Result = ( "BANK1", (ResultVal & 0x0F), "BANK2", (ResultVal & 0xF0) >> 4)
 		if DEBUG == "ON":
 			print(Result)
@@ -1254,162 +2537,12 @@ class ELM327:
 	PidFunctions["0213"] = PID0113
 
 
-# PID0114 Get the current Oxygen Sensor 1 Voltage & Short Term Fuel Trim from the ECU.
-	def PID0114(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0114' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0114\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0214" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( int(Response[:2], 16) / 200, (100 * int(Response[2:4], 16) / 128) - 100 )
-
-		return Result
-	PidFunctions["0114"] = PID0114
-	PidFunctions["0214"] = PID0114
-
-
-# PID0115 Get the current Oxygen Sensor 2 Voltage & Short Term Fuel Trim from the ECU.
-	def PID0115(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0115' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0115\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0215" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( int(Response[:2], 16) / 200, (100 * int(Response[2:4], 16) / 128) - 100 )
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0115"] = PID0115
-	PidFunctions["0215"] = PID0115
-
-
-# PID0116 Get the current Oxygen Sensor 3 Voltage & Short Term Fuel Trim from the ECU.
-	def PID0116(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0116' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0116\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0216" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( int(Response[:2], 16) / 200, (100 * int(Response[2:4], 16) / 128) - 100 )
-
-		return Result
-	PidFunctions["0116"] = PID0116
-	PidFunctions["0216"] = PID0116
-
-
-# PID0117 Get the current Oxygen Sensor 4 Voltage & Short Term Fuel Trim from the ECU.
-	def PID0117(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0117' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0117\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0217" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( int(Response[:2], 16) / 200, (100 * int(Response[2:4], 16) / 128) - 100 )
-
-		return Result
-	PidFunctions["0117"] = PID0117
-	PidFunctions["0217"] = PID0117
-
-
-# PID0118 Get the current Oxygen Sensor 5 Voltage & Short Term Fuel Trim from the ECU.
-	def PID0118(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0118' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0118\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0218" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( int(Response[:2], 16) / 200, (100 * int(Response[2:4], 16) / 128) - 100 )
-
-		return Result
-	PidFunctions["0118"] = PID0118
-	PidFunctions["0218"] = PID0118
-
-
-# PID0119 Get the current Oxygen Sensor 6 Voltage & Short Term Fuel Trim from the ECU.
-	def PID0119(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0119' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0119\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0219" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( int(Response[:2], 16) / 200, (100 * int(Response[2:4], 16) / 128) - 100 )
-
-		return Result
-	PidFunctions["0119"] = PID0119
-	PidFunctions["0219"] = PID0119
-
-
-# PID011A Get the current Oxygen Sensor 7 Voltage & Short Term Fuel Trim from the ECU.
-	def PID011A(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '011A' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'011A\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("021A" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( int(Response[:2], 16) / 200, (100 * int(Response[2:4], 16) / 128) - 100 )
-
-		return Result
-	PidFunctions["011A"] = PID011A
-	PidFunctions["021A"] = PID011A
-
-
-# PID011B Get the current Oxygen Sensor 8 Voltage & Short Term Fuel Trim from the ECU.
-	def PID011B(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '011B' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'011B\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("021B" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( int(Response[:2], 16) / 200, (100 * int(Response[2:4], 16) / 128) - 100 )
-
-		return Result
-	PidFunctions["011B"] = PID011B
-	PidFunctions["021B"] = PID011B
-
-
 # PID011C Get the OBD standards this vehicle conforms to from the ECU.
 	def PID011C(self, FreezeIndex = -1):
 		Result = STRING_NO_DATA
 
 		if '011C' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'011C\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("021C" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
+			Response = self.GetPidData('011C', FreezeIndex)
 			if Response in self.VehicleObdStandards:
 				Result = self.VehicleObdStandards[Response]
 			else:
@@ -1425,255 +2558,44 @@ class ELM327:
 # PID011E Auxiliary input status
 
 
-# PID011F Run time since engine start
-	def PID011F(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '011F' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'011F\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("011F" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = 256 * int(Response[:2], 16) + int(Response[2:4], 16)
-	PidFunctions["011F"] = PID011F
-	PidFunctions["021F"] = PID011F
-
-
 # PID0120 Supported PIDs for Mode 1 [21 -> 40].
 	def PID0120(self, FreezeIndex = -1):
-		Response = self.GetResponse(b'0120\r')
+		Response = self.GetObdResponse('0120')
+		self.ResolveEcuSupport('01', Response, '20', self.PidDescriptionsMode01)
 		Response = self.PruneData(Response, 2)
 		self.ResolvePidData('01', Response, '20', self.PidDescriptionsMode01)
 	PidFunctions["0120"] = PID0120
 
 
-# PID0121 Get the Distance traveled with malfunction indicator lamp (MIL) on from the ECU.
-	def PID0121(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0121' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0121\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0221" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = 256 * int(Response[:2], 16) + int(Response[2:4], 16)
-
-		return Result
-	PidFunctions["0121"] = PID0121
-	PidFunctions["0221"] = PID0121
-
-
-# PID0122 Fuel Rail Pressure
-	def PID0122(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0122' in self.ValidPIDs:
-			Response = self.GetResponse(b'0122\r')
-			Response = self.PruneData(Response, 2)
-			Result = 0.079 * (256 * int(Response[:2], 16) + int(Response[2:4], 16))
-
-		return Result
-	PidFunctions["0122"] = PID0122
-	
-	
-# PID0123 Fuel Rail Gauge Pressure
-	def PID0123(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0123' in self.ValidPIDs:
-			Response = self.GetResponse(b'0123\r')
-			Response = self.PruneData(Response, 2)
-			Result = 10 * (256 * int(Response[:2], 16) + int(Response[2:4], 16))
-
-		return Result
-	PidFunctions["0123"] = PID0123
-	
-
-# PID0124 Oxygen Sensor 1 (F-A ratio, Voltage)
-	def PID0124(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0124' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0124\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0224" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( (2 / 65536) * (256 * int(Response[:2], 16) + int(Response[2:4], 16)), (8 / 65536) * (256 * int(Response[4:6], 16) + int(Response[6:8], 16)) )
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0124"] = PID0124
-	PidFunctions["0224"] = PID0124
-	
-
-# PID0125 Oxygen Sensor 2 (F-A ratio, Voltage)
-# PID0126 Oxygen Sensor 3 (F-A ratio, Voltage)
-# PID0127 Oxygen Sensor 4 (F-A ratio, Voltage)
-# PID0128 Oxygen Sensor 5 (F-A ratio, Voltage)
-# PID0129 Oxygen Sensor 6 (F-A ratio, Voltage)
-# PID012A Oxygen Sensor 7 (F-A ratio, Voltage)
-# PID012B Oxygen Sensor 8 (F-A ratio, Voltage)
-# PID012C Commanded EGR
-# PID012D EGR Error
-# PID012E Commanded evaporative purge
-# PID012F Fuel tank level input
-# PID0130 Warm-ups since codes cleared
-
-
-# PID0131 Distance traveled since codes cleared
-	def PID0131(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0131' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0131\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0231" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = 256 * int(Response[:2], 16) + int(Response[2:4], 16)
-
-		return Result
-	PidFunctions["0131"] = PID0131
-	PidFunctions["0231"] = PID0131
-
-
-# PID0132 Evap. system vapor pressure
-# PID0133 Absolute barometric pressure
-
-
-# PID0134 Oxygen Sensor 1 (F-A ratio, Current)
-	def PID0134(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0134' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0134\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0234" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = ( (2 / 65536) * (256 * int(Response[:2], 16) + int(Response[2:4], 16)), int(Response[4:6], 16) + (int(Response[6:8], 16) / 256) - 128 )
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0134"] = PID0134
-	PidFunctions["0234"] = PID0134
-	
-	
-# PID0135 Oxygen Sensor 2 (F-A ratio, Current)
-# PID0136 Oxygen Sensor 3 (F-A ratio, Current)
-# PID0137 Oxygen Sensor 4 (F-A ratio, Current)
-# PID0138 Oxygen Sensor 5 (F-A ratio, Current)
-# PID0139 Oxygen Sensor 6 (F-A ratio, Current)
-# PID013A Oxygen Sensor 7 (F-A ratio, Current)
-# PID013B Oxygen Sensor 8 (F-A ratio, Current)
-# PID013C Catalyst Temperature: Bank 1, Sensor 1
-# PID013D Catalyst Temperature: Bank 2, Sensor 1
-# PID013E Catalyst Temperature: Bank 1, Sensor 2
-# PID013F Catalyst Temperature: Bank 2, Sensor 2
-
-
 # PID0140 Supported PIDs for Mode 1 [41 -> 60].
 	def PID0140(self, FreezeIndex = -1):
-		Response = self.GetResponse(b'0140\r')
+		Response = self.GetObdResponse('0140')
+		self.ResolveEcuSupport('01', Response, '40', self.PidDescriptionsMode01)
 		Response = self.PruneData(Response, 2)
 		self.ResolvePidData('01', Response, '40', self.PidDescriptionsMode01)
 	PidFunctions["0140"] = PID0140
 
 
 # PID0141 Monitor status this drive cycle
-# PID0142 Control module voltage
-# PID0143 Absolute load value
-# PID0144 Fuel–Air commanded equivalence ratio
-# PID0145 Relative throttle position
-# PID0146 Ambient air pressure
-# PID0147 Absolute throttle position B
-	def PID0147(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0147' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0147\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0211" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = int(Response, 16)
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0147"] = PID0147
-	PidFunctions["0247"] = PID0147
 	
-# PID0148 Absolute throttle position C
-# PID0149 Accelerator pedal position D
-# PID014A Accelerator pedal position E
-# PID014B Accelerator pedal position F
-# PID014C Commanded throttle actuator
-# PID014D Time run with MIL on
-# PID014E Time since trouble codes cleared
 # PID014F Maximum value for Fuel–Air equivalence ratio, oxygen sensor voltage, oxygen sensor current, and intake manifold absolute pressure
-# PID0150 Maximum value for air flow rate from mass air flow sensor
 # PID0151 Fuel Type
-# PID0152 Ethanol fuel %
-# PID0153 Absolute Evap system Vapor Pressure
-# PID0154 Evap system vapor pressure
-# PID0155 Short term secondary oxygen sensor trim, A: bank 1, B: bank 3
-# PID0156 Long term secondary oxygen sensor trim, A: bank 1, B: bank 3
-# PID0157 Short term secondary oxygen sensor trim, A: bank 2, B: bank 4
-# PID0158 Long term secondary oxygen sensor trim, A: bank 2, B: bank 4
-# PID0159 Fuel rail absolute pressure
-# PID015A Relative accelerator pedal position
-# PID015B Hybrid battery pack remaining life
-# PID015C Engine oil temperature
-# PID015D Fuel injection timing
-# PID015E Engine fuel rate
 # PID015F Emission requirements to which vehicle is designed
 
 
 # PID0160 Supported PIDs for Mode 1 [61 -> 80].
 	def PID0160(self, FreezeIndex = -1):
-		Response = self.GetResponse(b'0160\r')
+		Response = self.GetObdResponse('0160')
+		self.ResolveEcuSupport('01', Response, '60', self.PidDescriptionsMode01)
 		Response = self.PruneData(Response, 2)
 		self.ResolvePidData('01', Response, '60', self.PidDescriptionsMode01)
 	PidFunctions["0160"] = PID0160
 
 
-# PID0161 Driver's demand engine - percent torque
-# PID0162 Actual engine - percent torque
-# PID0163 Engine reference torque
-# PID0164 Engine percent torque data
-	def PID0164(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0164' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0164\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0211" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = int(Response, 16)
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0164"] = PID0164
-	PidFunctions["0264"] = PID0164
-
 # PID0165 Auxiliary input / output supported
 # PID0166 Mass air flow sensor
-# PID0167 Engine coolant temperature
-# PID0168 Intake air temperature sensor
 # PID0169 Commanded EGR and EGR Error
 # PID016A Commanded Diesel intake air flow control and relative intake air flow position
-# PID016B Exhaust gas recirculation temperature
 # PID016C Commanded throttle actuator control and relative throttle position
 # PID016D Fuel pressure control system
 # PID016E Injection pressure control system
@@ -1683,11 +2605,6 @@ class ELM327:
 # PID0172 Wastegate control
 # PID0173 Exhaust pressure
 # PID0174 Turbocharger RPM
-# PID0175 Turbocharger temperature
-# PID0176 Turbocharger temperature
-# PID0177 Charge air cooler temperature (CACT)
-# PID0178 Exhaust Gas temperature (EGT) Bank 1
-# PID0179 Exhaust Gas temperature (EGT) Bank 2
 # PID017A Diesel particulate filter (DPF)
 # PID017B Diesel particulate filter (DPF)
 # PID017C Diesel particulate filter (DPF) temperature
@@ -1698,7 +2615,8 @@ class ELM327:
 
 # PID0180 Supported PIDs for Mode 1 [81 -> A0].
 	def PID0180(self, FreezeIndex = -1):
-		Response = self.GetResponse(b'0180\r')
+		Response = self.GetObdResponse('0180')
+		self.ResolveEcuSupport('01', Response, '80', self.PidDescriptionsMode01)
 		Response = self.PruneData(Response, 2)
 		self.ResolvePidData('01', Response, '80', self.PidDescriptionsMode01)
 	PidFunctions["0180"] = PID0180
@@ -1707,23 +2625,6 @@ class ELM327:
 # PID0181 Engine run time for Auxiliary Emissions Control Device(AECD)
 # PID0182 Engine run time for Auxiliary Emissions Control Device(AECD)
 # PID0183 NOx sensor
-# PID0184 Manifold surface temperature
-	def PID0184(self, FreezeIndex = -1):
-		Result = STRING_NO_DATA
-
-		if '0184' in self.ValidPIDs:
-			if FreezeIndex == -1:
-				Response = self.GetResponse(b'0184\r')
-				Response = self.PruneData(Response, 2)
-			else:
-				Response = self.GetResponse(bytearray("0284" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
-				Response = self.PruneData(Response, 3)
-			Result = int(Response, 16)
-		if DEBUG == "ON":
-			print(Result)
-		return Result
-	PidFunctions["0184"] = PID0184
-	PidFunctions["0284"] = PID0184
 
 # PID0185 NOx reagent system
 # PID0186 Particulate matter (PM) sensor
@@ -1733,8 +2634,6 @@ class ELM327:
 # PID018A Run Time for AECD #16-#20
 # PID018B Diesel Aftertreatment
 # PID018C O2 Sensor (Wide Range)
-# PID018D Throttle Position G
-# PID018E Engine Friction - Percent Torque
 # PID018F PM Sensor Bank 1 & 2
 # PID0190 WWH-OBD Vehicle OBD System Information
 # PID0191 WWH-OBD Vehicle OBD System Information
@@ -1756,7 +2655,8 @@ class ELM327:
 
 # PID01A0 Supported PIDs for Mode 1 [A1 -> C0].
 	def PID01A0(self, FreezeIndex = -1):
-		Response = self.GetResponse(b'01A0\r')
+		Response = self.GetObdResponse('01A0')
+		self.ResolveEcuSupport('01', Response, 'A0', self.PidDescriptionsMode01)
 		Response = self.PruneData(Response, 2)
 		self.ResolvePidData('01', Response, 'A0', self.PidDescriptionsMode01)
 	PidFunctions["01A0"] = PID01A0
@@ -1797,7 +2697,8 @@ class ELM327:
 
 # PID01C0 Supported PIDs for Mode 1 [C1 -> E0].
 	def PID01C0(self, FreezeIndex = -1):
-		Response = self.GetResponse(b'01C0\r')
+		Response = self.GetObdResponse('01C0')
+		self.ResolveEcuSupport('01', Response, 'C0', self.PidDescriptionsMode01)
 		Response = self.PruneData(Response, 2)
 		self.ResolvePidData('01', Response, 'C0', self.PidDescriptionsMode01)
 	PidFunctions["01C0"] = PID01C0
@@ -1843,7 +2744,7 @@ class ELM327:
 
 # PID0200 Supported PIDs for Mode 2 [01 -> 20].
 	def PID0200(self, FreezeIndex = -1):
-		Response = self.GetResponse(bytearray("0200" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
+		Response = self.GetObdResponse("0200" + "{:02d}".format(FreezeIndex))
 		Response = self.PruneData(Response, 3)
 		self.ResolvePidData('02', Response, '00', self.PidDescriptionsMode01, FreezeIndex)
 	PidFunctions["0200"] = PID0200
@@ -1851,7 +2752,7 @@ class ELM327:
 
 # PID0220 Supported PIDs for Mode 2 [21 -> 40].
 	def PID0220(self, FreezeIndex = -1):
-		Response = self.GetResponse(bytearray("0220" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
+		Response = self.GetObdResponse("0220" + "{:02d}".format(FreezeIndex))
 		Response = self.PruneData(Response, 3)
 		self.ResolvePidData('02', Response, '20', self.PidDescriptionsMode01, FreezeIndex)
 	PidFunctions["0220"] = PID0220
@@ -1859,7 +2760,7 @@ class ELM327:
 
 # PID0240 Supported PIDs for Mode 2 [41 -> 60].
 	def PID0240(self, FreezeIndex = -1):
-		Response = self.GetResponse(bytearray("0240" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
+		Response = self.GetObdResponse("0240" + "{:02d}".format(FreezeIndex))
 		Response = self.PruneData(Response, 3)
 		self.ResolvePidData('02', Response, '40', self.PidDescriptionsMode01, FreezeIndex)
 	PidFunctions["0240"] = PID0240
@@ -1867,7 +2768,7 @@ class ELM327:
 
 # PID0260 Supported PIDs for Mode 2 [61 -> 80].
 	def PID0260(self, FreezeIndex = -1):
-		Response = self.GetResponse(bytearray("0260" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
+		Response = self.GetObdResponse("0260" + "{:02d}".format(FreezeIndex))
 		Response = self.PruneData(Response, 3)
 		self.ResolvePidData('02', Response, '60', self.PidDescriptionsMode01, FreezeIndex)
 	PidFunctions["0260"] = PID0260
@@ -1875,7 +2776,7 @@ class ELM327:
 
 # PID0280 Supported PIDs for Mode 2 [81 -> A0].
 	def PID0280(self, FreezeIndex = -1):
-		Response = self.GetResponse(bytearray("0280" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
+		Response = self.GetObdResponse("0280" + "{:02d}".format(FreezeIndex))
 		Response = self.PruneData(Response, 3)
 		self.ResolvePidData('02', Response, '80', self.PidDescriptionsMode01, FreezeIndex)
 	PidFunctions["0280"] = PID0280
@@ -1883,7 +2784,7 @@ class ELM327:
 
 # PID02A0 Supported PIDs for Mode 2 [A1 -> C0].
 	def PID02A0(self, FreezeIndex = -1):
-		Response = self.GetResponse(bytearray("02A0" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
+		Response = self.GetObdResponse("02A0" + "{:02d}".format(FreezeIndex))
 		Response = self.PruneData(Response, 3)
 		self.ResolvePidData('02', Response, 'A0', self.PidDescriptionsMode01, FreezeIndex)
 	PidFunctions["02A0"] = PID02A0
@@ -1891,9 +2792,9 @@ class ELM327:
 
 # PID02C0 Supported PIDs for Mode 2 [C1 -> E0].
 	def PID02C0(self, FreezeIndex = -1):
-		Response = self.GetResponse(bytearray("02C0" + "{:02d}".format(FreezeIndex) + "\r", 'UTF-8'))
+		Response = self.GetObdResponse("02C0" + "{:02d}".format(FreezeIndex))
 		Response = self.PruneData(Response, 3)
-		self.ResolvePidData('02', Response, 'C0', self.PidDescriptionsMode01)
+		self.ResolvePidData('02', Response, 'C0', self.PidDescriptionsMode01, FreezeIndex)
 	PidFunctions["02C0"] = PID02C0
 
 
@@ -1913,7 +2814,14 @@ class ELM327:
 
 # PID04 Erase all Pending/Stored Trouble Codes and Data from the ECU.
 	def PID04(self, FreezeIndex = -1):
-		return self.GetResponse(b'04\r')
+		Result = self.GetResponse(b'04\r')
+		# The freeze frames are cleared with the trouble codes, along with their Mode 02 PID support.
+		self.FreezePayloads = {}
+		self.FreezeFrames = {}
+		self.ValidFreezePIDs = {}
+		for Name in [Name for Name in self.SupportData if Name[:2] == '02']:
+			del self.SupportData[Name]
+		return Result
 	PidFunctions["04"] = PID04
 
 
@@ -1923,9 +2831,7 @@ class ELM327:
 
 # PID050100 Supported PIDs for Mode 0501 [01 -> 20].
 	def PID050100(self, FreezeIndex = -1):
-		Response = self.GetResponse(b'050100\r').replace(str([0x00]), b'0')		# TODO check this.
-		#Response = self.PruneData(Response, 3)
-		self.ResolvePidData('05', Response, '00', self.PidDescriptionsMode05)
+		self.DiscoverSupportedPIDs('0501')
 	PidFunctions["050100"] = PID050100
 
 
@@ -2006,9 +2912,12 @@ class ELM327:
 # PID0900 Supported PIDs for Mode 09 [01 -> 20].
 	def PID0900(self, FreezeIndex = -1):
 		Response = self.GetResponse(b'0900\r')
-		Response = self.PruneData(Response, 3)
-		print("0900 returned ")
-		print(Response)
+		self.ResolveEcuSupport('09', Response, '00', self.PidDescriptionsMode09)
+		# Non CAN protocols include a message number byte, CAN protocols do not.
+		if self.IsCAN:
+			Response = self.PruneData(Response, 2)
+		else:
+			Response = self.PruneData(Response, 3)
 		self.ResolvePidData('09', Response, '00', self.PidDescriptionsMode09)
 	PidFunctions["0900"] = PID0900
 
@@ -2031,9 +2940,7 @@ class ELM327:
 		Result = STRING_NO_DATA
 
 		if '0902' in self.ValidPIDs:
-			Response = self.GetResponse(b'0902\r')
-			Response = self.PruneData(Response, 3)
-			Result = str(bytearray.fromhex(Response).replace(bytes([0x00]), b' '), 'UTF-8')
+			Result = self.ReadVehicleId()
 
 		return Result
 	PidFunctions["0902"] = PID0902
@@ -0,0 +1,841 @@
+#!/usr/bin/python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: Emulator                                                         */
+#/* Emulate an ELM327 device and vehicle on a Linux pseudo terminal, or on  */
+#/* a local TCP port as a WiFi adapter, for testing and profiling without   */
+#/* an ELM327 device or vehicle. Run this file, then set the serial port to */
+#/* the link name or tcp:// name it prints. Emulates the AT commands used   */
+#/* by the ELM327 class and OBDII Modes 01, 02, 03, 04, 07 and 09, from one */
+#/* or more ECUs, with configurable response latency, serial baud rate      */
+#/* limit and noise. With --can the ECUs answer OBDII requests on a         */
+#/* SocketCAN interface, such as vcan0, set the serial port to can://vcan0. */
+#/* Vehicle signals are synthetic, or played back from a recording of lines */
+#/* of the form:                                                            */
+#/* Seconds|PID|HexData   for example   12.50|010C|1AF8                     */
+#/***************************************************************************/
+
+
+
+import os
+import tty
+import select
+import socket
+import math
+import time
+import random
+import argparse
+import IsoTp
+import SocketCan
+
+
+
+# Default name of the link created to the pseudo terminal.
+EMULATOR_LINK_NAME = "/tmp/ELM327"
+
+# Identity reported by the emulated ELM327 device.
+EMULATOR_ID = "ELM327 v1.5"
+EMULATOR_DESCRIPTION = "OBDII to RS232 Interpreter"
+
+# Serial baud rate of the emulated ELM327 device after a reset.
+EMULATOR_BAUD = 38400
+
+# Time in seconds an automatic protocol search takes before the vehicle protocol is found.
+SEARCH_TIME = 2.0
+
+# Response timeout in seconds used while adaptive timing is on, when it is shorter than AT ST.
+ADAPTIVE_TIMEOUT = { "1": 0.032, "2": 0.016 }
+
+# CAN protocol numbers, all other protocols are emulated as ISO 9141-2.
+CAN_PROTOCOLS = "6789ABC"
+
+# Vehicle identification number and ECU names reported in Mode 09.
+VEHICLE_VIN = "1EMUL8TR0BD000001"
+
+# Emulated ECUs: CAN address, ISO 9141-2 address, name and the Mode 01 PIDs supported.
+EcuDefinitions = [
+	["7E8", "10", "ECM-EngineControl", ["01", "04", "05", "06", "07", "0B", "0C", "0D", "0E", "0F", "10", "11", "1C", "1F", "2F", "33", "42", "46", "5C"]],
+	["7E9", "18", "TCM-TransmisCtrl", ["01", "05", "0D", "1C", "42"]],
+]
+
+# Emulated stored and pending trouble codes.
+STORED_TROUBLE_CODES = ["P0133", "P0300"]
+PENDING_TROUBLE_CODES = ["P0171"]
+
+
+
+#/*****************************************************************/
+#/* Synthetic vehicle signals. Each gives the value of a Mode 01  */
+#/* PID at a time in seconds since the emulator started, and the  */
+#/* data bytes encoding that value.                               */
+#/*****************************************************************/
+def SignalRpm(Seconds):
+	return 800 + 2200 * (0.5 + 0.5 * math.sin(Seconds / 3))
+
+def SignalSpeed(Seconds):
+	return 60 + 40 * math.sin(Seconds / 10)
+
+def SignalCoolant(Seconds):
+	return min(90, 20 + Seconds / 2)
+
+SyntheticSignals = {
+	"04": lambda Seconds: [int(2.55 * (20 + 15 * (0.5 + 0.5 * math.sin(Seconds / 3))))],
+	"05": lambda Seconds: [int(SignalCoolant(Seconds)) + 40],
+	"06": lambda Seconds: [128 + int(5 * math.sin(Seconds))],
+	"07": lambda Seconds: [130],
+	"0B": lambda Seconds: [int(30 + 20 * (0.5 + 0.5 * math.sin(Seconds / 3)))],
+	"0C": lambda Seconds: list(int(4 * SignalRpm(Seconds)).to_bytes(2, 'big')),
+	"0D": lambda Seconds: [int(SignalSpeed(Seconds))],
+	"0E": lambda Seconds: [128 + int(2 * (10 + 5 * math.sin(Seconds / 3)))],
+	"0F": lambda Seconds: [25 + 40],
+	"10": lambda Seconds: list(int(100 * (3 + SignalRpm(Seconds) / 200)).to_bytes(2, 'big')),
+	"11": lambda Seconds: [int(2.55 * (15 + 10 * (0.5 + 0.5 * math.sin(Seconds / 3))))],
+	"1C": lambda Seconds: [0x01],
+	"1F": lambda Seconds: list(int(Seconds).to_bytes(2, 'big')),
+	"2F": lambda Seconds: [int(2.55 * max(5, 75 - Seconds / 100))],
+	"33": lambda Seconds: [101],
+	"42": lambda Seconds: list(int(1000 * (14.1 + 0.1 * math.sin(Seconds))).to_bytes(2, 'big')),
+	"46": lambda Seconds: [18 + 40],
+	"5C": lambda Seconds: [int(min(100, 20 + Seconds / 2.5)) + 40],
+}
+
+
+
+class Emulator:
+	def __init__(self, Protocol = "6", EcuCount = 1, Latency = 0.02, MaxBaud = 500000, Noise = 0.0, Recording = None):
+		# Vehicle protocol number, as reported by AT DPN.
+		self.Protocol = Protocol
+		self.IsCAN = Protocol in CAN_PROTOCOLS
+		self.Ecus = EcuDefinitions[:max(1, EcuCount)]
+		# Time in seconds each ECU takes to answer a request.
+		self.Latency = Latency
+		# Highest baud rate which works without corrupting data.
+		self.MaxBaud = MaxBaud
+		# Probability of a response being corrupted.
+		self.Noise = Noise
+		# Recorded PID data, by PID then a list of [Seconds, HexData].
+		self.Recording = {}
+		self.RecordingLength = 0.0
+		if Recording != None:
+			self.LoadRecording(Recording)
+
+		self.StartTime = time.perf_counter()
+		self.Master = -1
+		self.LinkName = ""
+		# Listening socket and connection when emulating a WiFi adapter.
+		self.Listener = None
+		self.Connection = None
+		# CAN socket when emulating the ECUs on a SocketCAN interface.
+		self.CanSocket = None
+		self.Reset()
+		self.StoredTroubleCodes = list(STORED_TROUBLE_CODES)
+		self.PendingTroubleCodes = list(PENDING_TROUBLE_CODES)
+		# Freeze frame data captured when the first trouble code was stored.
+		self.FreezeFrame = {}
+		if len(self.StoredTroubleCodes) > 0:
+			self.FreezeFrame = self.CaptureFreezeFrame()
+
+
+
+#/*****************************************************************/
+#/* Return the ELM327 settings to their power on state.           */
+#/*****************************************************************/
+	def Reset(self):
+		self.Echo = True
+		self.Linefeeds = False
+		self.Spaces = True
+		self.Headers = False
+		self.Timeout = 0x32
+		self.Adaptive = "1"
+		self.SelectedProtocol = "0"
+		self.ProtocolFound = False
+		self.Searched = False
+		self.Baud = EMULATOR_BAUD
+		self.BaudTimeout = 0x0F
+		self.LastCommand = ""
+		# CAN ID requests are sent to, "" for the functional broadcast address.
+		self.RequestHeader = ""
+
+
+
+#/*****************************************************************/
+#/* Load recorded vehicle signals, played back in a loop.         */
+#/*****************************************************************/
+	def LoadRecording(self, FileName):
+		with open(FileName) as ThisFile:
+			for ThisLine in ThisFile:
+				Fields = ThisLine.strip().split('|')
+				if len(Fields) >= 3 and Fields[1][:2] == "01":
+					Seconds = float(Fields[0])
+					self.Recording.setdefault(Fields[1][2:], []).append([Seconds, Fields[2]])
+					self.RecordingLength = max(self.RecordingLength, Seconds)
+
+
+
+#/*****************************************************************/
+#/* Open the pseudo terminal and link a fixed name to it.         */
+#/*****************************************************************/
+	def Open(self, LinkName = EMULATOR_LINK_NAME):
+		self.Master, Slave = os.openpty()
+		tty.setraw(Slave)
+		self.SlaveName = os.ttyname(Slave)
+		self.LinkName = LinkName
+		if self.LinkName != "":
+			if os.path.islink(self.LinkName):
+				os.remove(self.LinkName)
+			os.symlink(self.SlaveName, self.LinkName)
+
+		return self.SlaveName
+
+
+
+#/*****************************************************************/
+#/* Listen on a local TCP port, as a WiFi ELM327 adapter does.    */
+#/*****************************************************************/
+	def OpenTcp(self, Port, Host = "127.0.0.1"):
+		self.Listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+		self.Listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+		self.Listener.bind((Host, Port))
+		self.Listener.listen(1)
+
+		return "tcp://" + Host + ":" + str(self.Listener.getsockname()[1])
+
+
+
+#/*****************************************************************/
+#/* Serve each TCP connection in turn, from a reset, until        */
+#/* interrupted.                                                  */
+#/*****************************************************************/
+	def RunTcp(self):
+		while True:
+			self.Connection, Address = self.Listener.accept()
+			self.Connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+			self.Master = self.Connection.fileno()
+			self.Reset()
+			self.Run()
+			self.Connection.close()
+			self.Connection = None
+			self.Master = -1
+
+
+
+#/*****************************************************************/
+#/* Open a SocketCAN interface, for example vcan0, to answer      */
+#/* OBDII requests sent as CAN frames, as the ECUs on a bus do.   */
+#/*****************************************************************/
+	def OpenCan(self, Interface):
+		self.CanSocket = SocketCan.OpenCanSocket(Interface)
+		self.IsCAN = True
+
+		return SocketCan.CAN_PREFIX + Interface
+
+
+
+#/*****************************************************************/
+#/* Answer OBDII requests sent as CAN frames until interrupted.   */
+#/* Each ECU answers the latency after a request. The rest of a   */
+#/* multiple frame answer is sent when the tester sends flow      */
+#/* control, until then that ECU's later answers wait.            */
+#/*****************************************************************/
+	def RunCan(self):
+		# Answers waiting to be sent, as [Time due, ECU CAN ID, Frames].
+		Pending = []
+		# Consecutive frames each ECU is waiting for flow control to send.
+		Waiting = {}
+		try:
+			while True:
+				Wait = None
+				Ready = [Answer for Answer in Pending if Answer[1] not in Waiting]
+				if len(Ready) > 0:
+					Wait = max(0.0, Ready[0][0] - time.perf_counter())
+				if len(select.select([self.CanSocket], [], [], Wait)[0]) > 0:
+					Frame = SocketCan.ReceiveFrame(self.CanSocket)
+					if Frame != None:
+						self.DoCanFrame(Frame[0], Frame[1], Pending, Waiting)
+				Now = time.perf_counter()
+				for Answer in [Answer for Answer in Pending if Answer[0] <= Now and Answer[1] not in Waiting]:
+					Due, EcuId, Frames = Answer
+					if EcuId not in Waiting:
+						Pending.remove(Answer)
+						SocketCan.SendFrame(self.CanSocket, EcuId, Frames[0])
+						if len(Frames) > 1:
+							Waiting[EcuId] = Frames[1:]
+		except (EOFError, OSError):
+			pass
+
+
+
+#/*****************************************************************/
+#/* Handle a CAN frame from the tester, an OBDII request sent to  */
+#/* the broadcast or an ECU's address, or flow control.           */
+#/*****************************************************************/
+	def DoCanFrame(self, CanId, Data, Pending, Waiting):
+		if len(Data) == 0:
+			return
+		FrameType = Data[0] >> 4
+		if FrameType == IsoTp.FRAME_FLOW_CONTROL and CanId + 8 in Waiting:
+			for Frame in Waiting.pop(CanId + 8):
+				SocketCan.SendFrame(self.CanSocket, CanId + 8, Frame)
+		elif FrameType == IsoTp.FRAME_SINGLE and (CanId == 0x7DF or 0x7E0 <= CanId <= 0x7E7) and 1 <= (Data[0] & 0x0F) <= 7:
+			Request = Data[1:1 + (Data[0] & 0x0F)].hex().upper()
+			self.RequestHeader = "{:03X}".format(CanId)
+			Due = time.perf_counter() + self.Latency
+			for Ecu, EcuData in self.GetEcuData(int(Request[:2], 16), Request[2:]):
+				Pending.append([Due, int(Ecu[0], 16), SocketCan.SegmentMessage(bytes(EcuData))])
+
+
+
+#/*****************************************************************/
+#/* Remove the link and close the pseudo terminal.                */
+#/*****************************************************************/
+	def Close(self):
+		if self.LinkName != "" and os.path.islink(self.LinkName):
+			os.remove(self.LinkName)
+		if self.Connection != None:
+			self.Connection.close()
+			self.Connection = None
+		elif self.Master != -1:
+			os.close(self.Master)
+		self.Master = -1
+		if self.Listener != None:
+			self.Listener.close()
+			self.Listener = None
+		if self.CanSocket != None:
+			self.CanSocket.close()
+			self.CanSocket = None
+
+
+
+#/*****************************************************************/
+#/* Send text to the host, no faster than the current baud rate,  */
+#/* corrupted when the baud rate is above the clean limit.        */
+#/*****************************************************************/
+	def Send(self, Text):
+		Data = bytearray(Text, 'utf-8')
+		if self.Baud > self.MaxBaud:
+			for Index in range(len(Data)):
+				if random.random() < 0.2:
+					Data[Index] = random.randrange(0x80, 0x100)
+		time.sleep(len(Data) * 10 / self.Baud)
+		os.write(self.Master, Data)
+
+
+
+#/*****************************************************************/
+#/* Read one command from the host, up to a carriage return.      */
+#/* Return None if no carriage return arrives in the time out.    */
+#/*****************************************************************/
+	def ReadCommand(self, TimeOut = None):
+		Command = bytearray()
+		EndTime = None
+		if TimeOut != None:
+			EndTime = time.perf_counter() + TimeOut
+		while True:
+			if EndTime != None:
+				Wait = EndTime - time.perf_counter()
+				if Wait <= 0 or len(select.select([self.Master], [], [], Wait)[0]) == 0:
+					return None
+			Char = os.read(self.Master, 1)
+			if Char == b'':
+				raise EOFError("Pseudo terminal closed")
+			if Char == b'\r':
+				return Command.decode('utf-8', 'replace')
+			elif Char != b'\n':
+				Command += Char
+
+
+
+#/*****************************************************************/
+#/* Serve commands until the pseudo terminal closes.              */
+#/*****************************************************************/
+	def Run(self):
+		try:
+			while True:
+				Command = self.ReadCommand()
+				if self.Echo == True:
+					self.Send(Command + "\r")
+				Command = Command.replace(" ", "")
+				# An empty command repeats the last command.
+				if Command == "":
+					Command = self.LastCommand
+				else:
+					self.LastCommand = Command
+				Response = self.DoCommand(Command.upper())
+				if Response != None:
+					self.SendResponse(Response)
+		except (EOFError, OSError):
+			pass
+
+
+
+#/*****************************************************************/
+#/* Send response lines followed by the prompt.                   */
+#/*****************************************************************/
+	def SendResponse(self, Lines):
+		LineEnd = "\r"
+		if self.Linefeeds == True:
+			LineEnd = "\r\n"
+		Text = ""
+		for Line in Lines:
+			Text += Line + LineEnd
+		self.Send(Text + LineEnd + ">")
+
+
+
+#/*****************************************************************/
+#/* Perform an AT or OBDII command, returning the response lines, */
+#/* or None when the response has already been sent.              */
+#/*****************************************************************/
+	def DoCommand(self, Command):
+		if Command[:2] == "AT":
+			Result = self.DoAtCommand(Command[2:])
+		elif len(Command) >= 2 and all(Char in "0123456789ABCDEF" for Char in Command):
+			Result = self.DoObdCommand(Command)
+		else:
+			Result = ["?"]
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Perform an AT command.                                        */
+#/*****************************************************************/
+	def DoAtCommand(self, Command):
+		Result = ["OK"]
+
+		if Command in ("Z", "WS"):
+			self.Reset()
+			time.sleep(0.5)
+			Result = ["", "", EMULATOR_ID]
+		elif Command == "D":
+			Headers = self.Headers
+			self.Reset()
+			self.Headers = Headers
+		elif Command in ("I",):
+			Result = [EMULATOR_ID]
+		elif Command == "@1":
+			Result = [EMULATOR_DESCRIPTION]
+		elif Command == "@2":
+			Result = ["?"]
+		elif Command in ("E0", "E1"):
+			self.Echo = (Command[1] == "1")
+		elif Command in ("L0", "L1"):
+			self.Linefeeds = (Command[1] == "1")
+		elif Command in ("S0", "S1"):
+			self.Spaces = (Command[1] == "1")
+		elif Command in ("H0", "H1"):
+			self.Headers = (Command[1] == "1")
+		elif Command[:2] == "SH" and len(Command) in (5, 8):
+			self.RequestHeader = Command[2:]
+		elif Command in ("AT0", "AT1", "AT2"):
+			self.Adaptive = Command[2]
+		elif Command[:2] == "ST" and len(Command) == 4:
+			self.Timeout = int(Command[2:], 16)
+			if self.Timeout == 0:
+				self.Timeout = 0x32
+		elif Command[:3] == "BRT" and len(Command) == 5:
+			self.BaudTimeout = int(Command[3:], 16)
+		elif Command[:3] == "BRD" and len(Command) == 5:
+			self.ChangeBaud(int(Command[3:], 16))
+			Result = None
+		elif Command[:2] == "SP" and len(Command) >= 3:
+			self.SelectedProtocol = Command[2:]
+			self.ProtocolFound = False
+		elif Command == "DP":
+			Result = [self.GetProtocolName()]
+		elif Command == "DPN":
+			if self.ProtocolFound == True and self.Searched == True:
+				Result = ["A" + self.Protocol]
+			elif self.ProtocolFound == True:
+				Result = [self.Protocol]
+			else:
+				Result = ["A" + self.SelectedProtocol[-1:]]
+		elif Command == "RV":
+			Result = ["{:1.1f}V".format(12.6 + 0.2 * random.random())]
+		elif Command == "CS":
+			Result = ["T:00 R:00"]
+		elif Command == "KW":
+			Result = ["1:00 2:00"]
+		elif Command == "BD":
+			Result = ["00 00 00 00 00 00 00 00 00 00 00 00 00"]
+		elif Command == "PPS":
+			Result = ["00:FF F  01:FF F  02:FF F  03:32 F"]
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Change baud rate as the ELM327 does: confirm at the current   */
+#/* rate, then send the ID at the new rate and keep the new rate  */
+#/* only if the host answers with a carriage return in time.      */
+#/*****************************************************************/
+	def ChangeBaud(self, Divisor):
+		if Divisor == 0:
+			self.SendResponse(["?"])
+			return
+		self.Send("OK\r")
+		OldBaud = self.Baud
+		self.Baud = int(4000000 / Divisor)
+		self.Send(EMULATOR_ID + "\r")
+		# A baud rate timeout of 00 is the longest, 256 periods of 5 ms.
+		BaudTimeout = self.BaudTimeout
+		if BaudTimeout == 0:
+			BaudTimeout = 0x100
+		if self.ReadCommand(BaudTimeout * 0.005) == "" and self.Baud <= self.MaxBaud:
+			self.SendResponse(["OK"])
+		else:
+			self.Baud = OldBaud
+			self.Send("\r>")
+
+
+
+#/*****************************************************************/
+#/* Get the description of the current protocol for AT DP.        */
+#/*****************************************************************/
+	def GetProtocolName(self):
+		Result = "ISO 9141-2"
+
+		if self.IsCAN == True:
+			Result = "ISO 15765-4 (CAN 11/500)"
+		if self.ProtocolFound == True and self.Searched == True:
+			Result = "AUTO, " + Result
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Find the vehicle protocol, searching when auto detect is set, */
+#/* returning the lines to send before the response, or None if   */
+#/* no protocol can connect.                                      */
+#/*****************************************************************/
+	def FindProtocol(self):
+		Result = []
+
+		if self.ProtocolFound == False:
+			Selected = self.SelectedProtocol
+			if Selected == self.Protocol:
+				self.Searched = False
+				self.ProtocolFound = True
+			elif Selected == "0" or Selected[:1] == "A":
+				# Search the protocols, the requested protocol first.
+				time.sleep(SEARCH_TIME)
+				self.Searched = True
+				self.ProtocolFound = True
+				Result.append("SEARCHING...")
+			else:
+				time.sleep(SEARCH_TIME / 4)
+				Result = None
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the current data bytes of a Mode 01 PID, from the         */
+#/* recording when one is loaded, otherwise synthetic.            */
+#/*****************************************************************/
+	def GetPidBytes(self, PID, Seconds = None):
+		Result = None
+
+		if Seconds == None:
+			Seconds = time.perf_counter() - self.StartTime
+		if PID in self.Recording:
+			Samples = self.Recording[PID]
+			Position = Seconds % max(self.RecordingLength, 1.0)
+			HexData = Samples[0][1]
+			for SampleSeconds, SampleData in Samples:
+				if SampleSeconds > Position:
+					break
+				HexData = SampleData
+			Result = list(bytes.fromhex(HexData))
+		elif PID in SyntheticSignals:
+			Result = [Byte & 0xFF for Byte in SyntheticSignals[PID](Seconds)]
+		elif PID == "01":
+			MilCount = len(self.StoredTroubleCodes)
+			if MilCount > 0:
+				MilCount |= 0x80
+			Result = [MilCount, 0x07, 0x65, 0x00]
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the support bitmap bytes of a PID range for a set of PIDs */
+#/* supported, including the next range PID when any PID beyond   */
+#/* the range is supported.                                       */
+#/*****************************************************************/
+	def GetSupportBytes(self, Start, SupportedPIDs):
+		Bits = 0
+		for PID in SupportedPIDs:
+			Offset = int(PID, 16) - Start
+			if 1 <= Offset <= 32:
+				Bits |= 1 << (32 - Offset)
+			elif Offset > 32:
+				Bits |= 1
+		return list(Bits.to_bytes(4, 'big'))
+
+
+
+#/*****************************************************************/
+#/* Capture the current signals as the freeze frame.              */
+#/*****************************************************************/
+	def CaptureFreezeFrame(self):
+		Result = {}
+
+		for PID in self.Ecus[0][3]:
+			Data = self.GetPidBytes(PID)
+			if Data != None and PID != "01":
+				Result[PID] = Data
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Encode trouble codes as data bytes.                           */
+#/*****************************************************************/
+	def EncodeTroubleCodes(self, TroubleCodes):
+		Result = []
+
+		for TroubleCode in TroubleCodes:
+			Value = ("PCBU".index(TroubleCode[0]) << 14) | int(TroubleCode[1:], 16)
+			Result += [Value >> 8, Value & 0xFF]
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the data each ECU returns for an OBDII request, as a list */
+#/* of [ECU, Data bytes] for the ECUs which answer.               */
+#/*****************************************************************/
+	def GetEcuData(self, Mode, Request):
+		Result = []
+
+		for Ecu in self.Ecus:
+			Supported = Ecu[3]
+			IsEngine = (Ecu == self.Ecus[0])
+			Data = None
+			# A physically addressed CAN request is only answered by that ECU, which answers on its address plus 8.
+			if self.IsCAN == True and self.RequestHeader not in ("", "7DF") and self.RequestHeader != "{:03X}".format(int(Ecu[0], 16) - 8):
+				continue
+			if Mode == 0x01:
+				Data = [0x41]
+				PIDs = [Request[Index:Index + 2] for Index in range(0, len(Request), 2)]
+				if self.IsCAN == False:
+					PIDs = PIDs[:1]
+				for PID in PIDs[:6]:
+					if int(PID, 16) % 0x20 == 0:
+						PidData = self.GetSupportBytes(int(PID, 16), Supported)
+						if PID != "00" and max([int(Item, 16) for Item in Supported]) <= int(PID, 16):
+							PidData = None
+					elif PID in Supported:
+						PidData = self.GetPidBytes(PID)
+					else:
+						PidData = None
+					if PidData != None:
+						Data += [int(PID, 16)] + PidData
+				if len(Data) == 1:
+					Data = None
+			elif Mode == 0x02 and IsEngine == True and len(Request) >= 4 and len(Request) % 4 == 0:
+				# Up to three PID and frame number pairs in a CAN request.
+				Data = [0x42]
+				Pairs = [Request[Index:Index + 4] for Index in range(0, len(Request), 4)]
+				if self.IsCAN == False:
+					Pairs = Pairs[:1]
+				for Pair in Pairs[:3]:
+					PID = Pair[:2]
+					Frame = int(Pair[2:], 16)
+					PidData = None
+					if Frame == 0 and len(self.FreezeFrame) > 0:
+						if int(PID, 16) % 0x20 == 0:
+							PidData = self.GetSupportBytes(int(PID, 16), ["02"] + list(self.FreezeFrame))
+							if PID != "00" and max([int(Item, 16) for Item in self.FreezeFrame]) <= int(PID, 16):
+								PidData = None
+						elif PID == "02":
+							PidData = self.EncodeTroubleCodes(self.StoredTroubleCodes[:1])
+						elif PID in self.FreezeFrame:
+							PidData = self.FreezeFrame[PID]
+					if PidData != None:
+						Data += [int(PID, 16), Frame] + PidData
+				if len(Data) == 1:
+					Data = None
+			elif Mode in (0x03, 0x07) and IsEngine == True:
+				TroubleCodes = self.StoredTroubleCodes
+				if Mode == 0x07:
+					TroubleCodes = self.PendingTroubleCodes
+				Data = [Mode + 0x40]
+				if self.IsCAN == True:
+					Data += [len(TroubleCodes)]
+				Data += self.EncodeTroubleCodes(TroubleCodes)
+			elif Mode == 0x04:
+				self.StoredTroubleCodes = []
+				self.PendingTroubleCodes = []
+				self.FreezeFrame = {}
+				Data = [0x44]
+			elif Mode == 0x09 and len(Request) > 2 and self.IsCAN == True and Request[:2] == "00":
+				# Batched support PIDs, only the first range is supported.
+				Data = [0x49, 0x00] + self.GetSupportBytes(0, ["02", "0A"])
+			elif Mode == 0x09 and len(Request) == 2:
+				if Request == "00" and self.IsCAN == False:
+					Data = [0x49, 0x00, 0x01] + self.GetSupportBytes(0, ["02", "0A"])
+				elif Request == "00":
+					Data = [0x49, 0x00] + self.GetSupportBytes(0, ["02", "0A"])
+				elif Request == "02" and IsEngine == True:
+					Data = [0x49, 0x02, 0x01] + list(VEHICLE_VIN.encode('utf-8'))
+				elif Request == "0A":
+					Data = [0x49, 0x0A, 0x01] + list(Ecu[2].encode('utf-8')[:20].ljust(20, b'\0'))
+			if Data != None:
+				Result.append([Ecu, Data])
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Format bytes as hex, with spaces when they are turned on.     */
+#/*****************************************************************/
+	def FormatBytes(self, Data):
+		Separator = ""
+		if self.Spaces == True:
+			Separator = " "
+		return Separator.join(["{:02X}".format(Byte) for Byte in Data])
+
+
+
+#/*****************************************************************/
+#/* Format the data from an ECU as the ELM327 displays it, as CAN */
+#/* single or multiple frames, or ISO 9141-2 messages.            */
+#/*****************************************************************/
+	def FormatEcuData(self, Ecu, Data):
+		Result = []
+		Separator = ""
+		if self.Spaces == True:
+			Separator = " "
+
+		if self.IsCAN == True:
+			if len(Data) <= 7:
+				if self.Headers == True:
+					Result.append(Ecu[0] + Separator + self.FormatBytes([len(Data)] + Data))
+				else:
+					Result.append(self.FormatBytes(Data))
+			else:
+				Frames = [Data[:6]]
+				for Index in range(6, len(Data), 7):
+					Frames.append(Data[Index:Index + 7])
+				if self.Headers == True:
+					Result.append(Ecu[0] + Separator + self.FormatBytes([0x10 | (len(Data) >> 8), len(Data) & 0xFF] + Frames[0]))
+					for Index in range(1, len(Frames)):
+						Result.append(Ecu[0] + Separator + self.FormatBytes([0x20 | (Index & 0x0F)] + Frames[Index] + [0x00] * (7 - len(Frames[Index]))))
+				else:
+					Result.append("{:03X}".format(len(Data)))
+					for Index in range(len(Frames)):
+						Result.append("{:X}".format(Index & 0x0F) + ":" + Separator + self.FormatBytes(Frames[Index] + [0x00] * (len(Frames[0]) + (Index > 0) - len(Frames[Index]))))
+		else:
+			Header = [0x48, 0x6B, int(Ecu[1], 16)]
+			if len(Data) > 7 and Data[0] == 0x49:
+				# Mode 09 data is sent as numbered messages of 4 bytes.
+				Messages = []
+				Payload = Data[3:]
+				for Index in range(0, len(Payload), 4):
+					Messages.append(Data[:2] + [Index // 4 + 1] + Payload[Index:Index + 4] + [0x00] * (4 - len(Payload[Index:Index + 4])))
+			else:
+				Messages = [Data]
+			for Message in Messages:
+				if self.Headers == True:
+					Message = Header + Message + [sum(Header + Message) & 0xFF]
+				Result.append(self.FormatBytes(Message))
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Perform an OBDII request, waiting the ECU latency and the     */
+#/* response timeout as the ELM327 and vehicle would.             */
+#/*****************************************************************/
+	def DoObdCommand(self, Command):
+		# An odd length request ends with the number of responses expected.
+		Expected = None
+		if len(Command) % 2 == 1:
+			Expected = int(Command[-1], 16)
+			Command = Command[:-1]
+		Mode = int(Command[:2], 16)
+
+		Result = self.FindProtocol()
+		if Result == None:
+			return ["UNABLE TO CONNECT"]
+
+		EcuData = self.GetEcuData(Mode, Command[2:])
+		time.sleep(self.Latency * max(1, len(EcuData)))
+		if Expected == None or Expected > len(EcuData):
+			# Wait for further responses until the response timeout.
+			Timeout = self.Timeout * 0.004
+			if self.Adaptive in ADAPTIVE_TIMEOUT:
+				Timeout = min(Timeout, ADAPTIVE_TIMEOUT[self.Adaptive])
+			time.sleep(Timeout)
+
+		if len(EcuData) == 0:
+			Result.append("NO DATA")
+		for Ecu, Data in EcuData:
+			Lines = self.FormatEcuData(Ecu, Data)
+			if self.Noise > 0 and random.random() < self.Noise:
+				Index = random.randrange(len(Lines))
+				Position = random.randrange(len(Lines[Index]))
+				Lines[Index] = Lines[Index][:Position] + random.choice("0123456789ABCDEF") + Lines[Index][Position + 1:]
+			Result += Lines
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Run the emulator from the command line.                       */
+#/*****************************************************************/
+if __name__ == "__main__":
+	Parser = argparse.ArgumentParser(description = "Emulate an ELM327 device and vehicle on a pseudo terminal.")
+	Parser.add_argument("--link", default = EMULATOR_LINK_NAME, help = "name of the link to the pseudo terminal")
+	Parser.add_argument("--protocol", default = "6", help = "vehicle protocol number, 6 for CAN or 3 for ISO 9141-2")
+	Parser.add_argument("--ecus", type = int, default = 1, help = "number of ECUs answering, 1 or 2")
+	Parser.add_argument("--latency", type = float, default = 0.02, help = "ECU response time in seconds")
+	Parser.add_argument("--max-baud", type = int, default = 500000, help = "highest baud rate which works without corruption")
+	Parser.add_argument("--noise", type = float, default = 0.0, help = "probability of a corrupted response")
+	Parser.add_argument("--recording", default = None, help = "file of recorded signals to play back")
+	Parser.add_argument("--tcp", type = int, default = None, help = "listen on this local TCP port, as a WiFi adapter, rather than a pseudo terminal")
+	Parser.add_argument("--can", default = None, help = "answer as the ECUs on this SocketCAN interface, for example vcan0, rather than as an ELM327")
+	Arguments = Parser.parse_args()
+
+	ThisEmulator = Emulator(Arguments.protocol.upper(), Arguments.ecus, Arguments.latency, Arguments.max_baud, Arguments.noise, Arguments.recording)
+	try:
+		if Arguments.can != None:
+			print("ECU EMULATOR ON " + ThisEmulator.OpenCan(Arguments.can))
+			ThisEmulator.RunCan()
+		elif Arguments.tcp != None:
+			print("ELM327 EMULATOR ON " + ThisEmulator.OpenTcp(Arguments.tcp))
+			ThisEmulator.RunTcp()
+		else:
+			SlaveName = ThisEmulator.Open(Arguments.link)
+			print("ELM327 EMULATOR ON " + SlaveName + " LINKED AS " + Arguments.link)
+			ThisEmulator.Run()
+	except KeyboardInterrupt:
+		pass
+	ThisEmulator.Close()
@@ -0,0 +1,167 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* ISO 15765-2 (ISO-TP) reassembly of the CAN frames in an ELM327 response */
+#/* into the complete message sent by each ECU.                             */
+#/*                                                                         */
+#/* Headers on, each line is a CAN ID followed by the frame data, starting  */
+#/* with the protocol control information byte. Frames are grouped by CAN   */
+#/* ID, so messages from several ECUs may be interleaved, and consecutive   */
+#/* frames must follow in sequence.                                         */
+#/*                                                                         */
+#/* Headers off, the ELM327 removes the protocol control information. A     */
+#/* single frame is a line of data. A multiple frame message is a line of   */
+#/* the byte count, followed by lines of data numbered 0: to F: repeating.  */
+#/* Numbered lines are matched to the oldest incomplete message expecting   */
+#/* that number. Lines of other protocols are single frames.                */
+#/*                                                                         */
+#/* Only complete messages are returned, truncated to their byte count.     */
+#/***************************************************************************/
+
+
+
+# Frame types, the high nibble of the protocol control information byte.
+FRAME_SINGLE = 0x0
+FRAME_FIRST = 0x1
+FRAME_CONSECUTIVE = 0x2
+FRAME_FLOW_CONTROL = 0x3
+
+# Hex digits of the CAN ID on each line with headers on, or 0 with headers off.
+HEADERS_OFF = 0
+HEADERS_11_BIT = 3
+HEADERS_29_BIT = 8
+
+# Positions in the list kept for each message being reassembled.
+MESSAGE_ECU = 0
+MESSAGE_DATA = 1
+MESSAGE_LENGTH = 2
+MESSAGE_SEQUENCE = 3
+
+
+
+#/*****************************************************************/
+#/* Reassemble the response text from the ELM327 into the message */
+#/* from each ECU. Return a list of [CAN ID, Data bytes] for each */
+#/* complete message, in the order they started. The CAN ID is    */
+#/* empty with headers off.                                       */
+#/*****************************************************************/
+def Reassemble(Response, HeaderDigits = HEADERS_OFF):
+	if ' ' in Response:
+		Response = Response.replace(' ', '')
+	if HeaderDigits == HEADERS_OFF:
+		Messages = ReassembleHeadersOff(Response)
+	else:
+		Messages = ReassembleHeadersOn(Response, HeaderDigits)
+
+	Result = []
+	for EcuId, Data, Length, Sequence in Messages:
+		if len(Data) >= Length:
+			Result.append([EcuId, bytes(Data[:Length])])
+
+	return Result
+
+
+
+#/*****************************************************************/
+#/* Reassemble lines with the CAN ID and protocol control         */
+#/* information of each frame.                                    */
+#/*****************************************************************/
+def ReassembleHeadersOn(Response, HeaderDigits):
+	Messages = []
+
+	# The incomplete message from each ECU.
+	Receiving = {}
+	for Line in Response.split('\n'):
+		if len(Line) <= HeaderDigits:
+			continue
+		try:
+			Frame = bytes.fromhex(Line[HeaderDigits:])
+		except ValueError:
+			continue
+		EcuId = Line[:HeaderDigits]
+		FrameType = Frame[0] >> 4
+		if FrameType == FRAME_SINGLE:
+			Length = Frame[0] & 0x0F
+			Start = 1
+			# CAN FD escape, the length follows in the next byte.
+			if Length == 0 and len(Frame) > 1:
+				Length = Frame[1]
+				Start = 2
+			Messages.append([EcuId, Frame[Start:], Length, 0])
+		elif FrameType == FRAME_FIRST and len(Frame) > 1:
+			Length = ((Frame[0] & 0x0F) << 8) | Frame[1]
+			Start = 2
+			# Escape for messages over 4095 bytes, a 32 bit length follows.
+			if Length == 0 and len(Frame) > 5:
+				Length = int.from_bytes(Frame[2:6], 'big')
+				Start = 6
+			Message = [EcuId, bytearray(Frame[Start:]), Length, 1]
+			Messages.append(Message)
+			Receiving[EcuId] = Message
+		elif FrameType == FRAME_CONSECUTIVE and EcuId in Receiving:
+			Message = Receiving[EcuId]
+			if Frame[0] & 0x0F == Message[MESSAGE_SEQUENCE]:
+				Message[MESSAGE_DATA] += Frame[1:]
+				Message[MESSAGE_SEQUENCE] = (Message[MESSAGE_SEQUENCE] + 1) & 0x0F
+				if len(Message[MESSAGE_DATA]) >= Message[MESSAGE_LENGTH]:
+					del Receiving[EcuId]
+			else:
+				# A frame is missing, the message can't be completed.
+				del Receiving[EcuId]
+		# Flow control frames are sent by the ELM327, not part of a message.
+
+	return Messages
+
+
+
+#/*****************************************************************/
+#/* Reassemble lines with the protocol control information        */
+#/* removed by the ELM327.                                        */
+#/*****************************************************************/
+def ReassembleHeadersOff(Response):
+	Messages = []
+
+	# The incomplete multiple frame messages, oldest first.
+	Receiving = []
+	for Line in Response.split('\n'):
+		if Line[1:2] == ':':
+			try:
+				Sequence = int(Line[0], 16)
+				Frame = bytes.fromhex(Line[2:])
+			except ValueError:
+				continue
+			for Message in Receiving:
+				if Message[MESSAGE_SEQUENCE] == Sequence:
+					Message[MESSAGE_DATA] += Frame
+					Message[MESSAGE_SEQUENCE] = (Sequence + 1) & 0x0F
+					if len(Message[MESSAGE_DATA]) >= Message[MESSAGE_LENGTH]:
+						Receiving.remove(Message)
+					break
+		elif len(Line) == 3:
+			try:
+				Message = ["", bytearray(), int(Line, 16), 0]
+			except ValueError:
+				continue
+			Messages.append(Message)
+			Receiving.append(Message)
+		elif Line != "":
+			try:
+				Frame = bytes.fromhex(Line)
+			except ValueError:
+				continue
+			Messages.append(["", Frame, len(Frame), 0])
+
+	return Messages
@@ -66,9 +66,14 @@
 import subprocess
 import datetime
 import random
-import _thread
 import pygame
 import ELM327
+import SocketCan
+import RemoteELM327
+import Acquisition
+import CommandQueue
+import Scheduler
+import PidStore
 import Visual
 import Button
 import Gadgit
@@ -83,23 +88,74 @@ import PDF
 DISPLAY_PERIOD = 100
 TIMER_PERIOD = 100
 
+# Age in seconds of stored PID values which can be shown in a data frame, rather than requested again.
+FRAME_DATA_TOLERANCE = 1.0
+
 
 # Start value for pygame user events.
 EVENT_TIMER = pygame.USEREVENT + 1
 
-# Lock to prevent ELM327 communications occuring when an existing one still running.
-LockELM327 = _thread.allocate_lock()
+# Longest time in seconds to wait for ELM327 communications needed before the user interface can continue.
+UI_COMMAND_TIME_OUT = 60
 
-# Lock to prevent multiple aquisition threads of execution.
-LockAquisition = _thread.allocate_lock()
+# Queue running all ELM327 communications in turn on a single thread, user requests before background polling.
+ThisCommandQueue = CommandQueue.CommandQueue()
 
 # List of visual class instances to be flashed.
 FlashVisuals = {}
 
+#/*****************************************************************/
+#/* Get the backend a serial port name selects, the ELM327 daemon */
+#/* on a socket, a SocketCAN interface or an ELM327 device.       */
+#/*****************************************************************/
+def GetBackend(PortName):
+	if RemoteELM327.IsDaemonName(PortName):
+		Result = "DAEMON:" + RemoteELM327.GetSocketName(PortName)
+	elif SocketCan.IsCanName(PortName):
+		Result = "CAN"
+	else:
+		Result = "ELM327"
+
+	return Result
+
+
+
+#/*****************************************************************/
+#/* Create the ELM327 class instance for a serial port name, with */
+#/* the PID store and scheduler polling through it.               */
+#/*****************************************************************/
+def CreateBackend(PortName):
+	global ThisBackend, ThisELM327, ThisPidStore, ThisScheduler
+
+	ThisBackend = GetBackend(PortName)
+	if RemoteELM327.IsDaemonName(PortName):
+		ThisELM327 = RemoteELM327.RemoteELM327(RemoteELM327.GetSocketName(PortName))
+	elif SocketCan.IsCanName(PortName):
+		ThisELM327 = SocketCan.SocketCanELM327()
+	else:
+		ThisELM327 = ELM327.ELM327()
+	ThisPidStore = PidStore.PidStore(ThisELM327)
+	ThisScheduler = Scheduler.Scheduler(ThisELM327, ThisPidStore)
+
+
+
+#/*****************************************************************/
+#/* Close the current backend and create the one a new serial     */
+#/* port name selects. Runs on the command queue, so no other     */
+#/* ELM327 communications are using the backend.                  */
+#/*****************************************************************/
+def ChangeBackend(PortName):
+	ThisELM327.Close()
+	CreateBackend(PortName)
+
+
+
 #  /***************************************/
 # /* Create application class instances. */
 #/***************************************/
-ThisELM327 = ELM327.ELM327()
+# The configured serial port selects the ELM327 device, a SocketCAN interface or the ELM327 daemon.
+Config.LoadConfig()
+CreateBackend(Config.ConfigValues["SerialPort"])
 ThisDisplay = Display.Display()
 ThisPDF = PDF.PDF()
 
@@ -123,7 +179,15 @@ def ApplyConfig():
 	Config.LoadConfig()
 	ELM327.DEBUG = Config.ConfigValues["Debug"]
 	ELM327.SERIAL_PORT_NAME = Config.ConfigValues["SerialPort"]
+	ELM327.CAPTURE_FILE_NAME = Config.ConfigValues["CaptureFile"]
+	ELM327.REPLAY_FILE_NAME = Config.ConfigValues["ReplayFile"]
+	ELM327.REPLAY_SPEED = float(Config.ConfigValues["ReplaySpeed"])
+	ELM327.HEADERS = Config.ConfigValues["Headers"]
+	ELM327.ECU_ADDRESS = Config.ConfigValues["EcuAddress"]
 	ThisDisplay.DEBUG = Config.ConfigValues["Debug"]
+	# A serial port of another kind, or another daemon socket, needs a new backend.
+	if GetBackend(Config.ConfigValues["SerialPort"]) != ThisBackend:
+		ThisCommandQueue.Submit(ChangeBackend, (Config.ConfigValues["SerialPort"], ), TimeOut = UI_COMMAND_TIME_OUT).result(UI_COMMAND_TIME_OUT)
 	ThisELM327.LoadVehicle(Config.ConfigValues["Vehicle"])
 	Visual.VisualZOrder[0].SetFont(Config.ConfigValues["FontName"])
 
@@ -155,18 +219,16 @@ def SavePdfReport(FileName):
 	ThisDisplay.Buttons["BUSY"].SetDown(True)
 	ThisDisplay.Display()
 	try:
-		# Get OBDII vehicle data.
-		if LockELM327.acquire(0):
-			VehicleData(ThisDisplay)
-		# Get OBDII trouble data.
-		if LockELM327.acquire(0):
-			TroubleInfo(ThisDisplay)
-		# Get OBDII data frame.
-		if LockELM327.acquire(0):
-			FrameData(ThisDisplay)
-		# Get OBDII freeze frame.
-		if LockELM327.acquire(0):
-			FreezeFrameData(ThisDisplay)
+		# Get OBDII vehicle data, trouble data, data frame and freeze frame, ahead of any background polling.
+		# Commands still queued when the report gives up waiting are not run.
+		Futures = []
+		Futures.append(ThisCommandQueue.Submit(VehicleData, (ThisDisplay, ), TimeOut = UI_COMMAND_TIME_OUT))
+		Futures.append(ThisCommandQueue.Submit(TroubleInfo, (ThisDisplay, ), TimeOut = UI_COMMAND_TIME_OUT))
+		Futures.append(ThisCommandQueue.Submit(FrameData, (ThisDisplay, ), TimeOut = UI_COMMAND_TIME_OUT))
+		Futures.append(ThisCommandQueue.Submit(FreezeFrameData, (ThisDisplay, ), TimeOut = UI_COMMAND_TIME_OUT))
+		Futures.append(ThisCommandQueue.Submit(ThisELM327.GetInfo, TimeOut = UI_COMMAND_TIME_OUT))
+		for ThisFuture in Futures:
+			ThisFuture.result(UI_COMMAND_TIME_OUT)
 		# Add data to the PDF report.
 		Now = datetime.datetime.now()
 		NowTime = Now.strftime("%H:%M")
@@ -176,7 +238,7 @@ def SavePdfReport(FileName):
 			["OBDII TROUBLE INFORMATION", ThisDisplay.TroubleInfo["INFO"].GetText()],
 			["OBDII DATA FREEZE FRAMES", ThisDisplay.FreezeFrameData["INFO"].GetText()],
 			["OBDII DATA FRAME", ThisDisplay.FrameData["INFO"].GetText()],
-			["ELM327 INFORMATION", ThisELM327.GetInfo()],
+			["ELM327 INFORMATION", Futures[-1].result()],
 		]
 		ThisPDF.CreateReport(FileName, "FreeMono", PdfData)
 	except Exception as Catch:
@@ -188,6 +250,16 @@ def SavePdfReport(FileName):
 
 
 
+#/**************************************************/
+#/* Show the progress of a connection to the ECU,  */
+#/* called by the ELM327 class as each phase of    */
+#/* the connection starts.                         */
+#/**************************************************/
+def ConnectProgress(Phase, Elapsed):
+	ThisDisplay.SetVisualText(ThisDisplay.ELM327Info, "INFO", "{:5.1f}s ".format(Elapsed) + Phase + "\n", True)
+
+
+
 #/***************************************************/
 #/* Perform a connection to the CAN BUS of the ECU. */
 #/***************************************************/
@@ -200,10 +272,13 @@ def ConnectELM327(ThisDisplay):
 	try:
 		# Notify the user a connection attempt is taking place.
 		ThisDisplay.SetVisualText(ThisDisplay.ELM327Info, "INFO", "CONNECTING TO CAN BUS FOR OBDII COMMUNICATION...\n", False)
-		# Connect to the CAN BUS of the ECU.
-		Result = ThisELM327.Connect()
+		# Connect to the CAN BUS of the ECU, showing each phase of the connection as it starts.
+		Result = ThisELM327.Connect(ConnectProgress)
+		# Forget the polling rates and PID values of any previous connection.
+		ThisScheduler.Reset()
+		ThisPidStore.Clear()
 		# Display issues initializing the ELM327 device.
-		ThisDisplay.SetVisualText(ThisDisplay.ELM327Info, "INFO", ThisELM327.GetInitResult(), False)
+		ThisDisplay.SetVisualText(ThisDisplay.ELM327Info, "INFO", ThisELM327.GetInitResult(), True)
 		# Notify the user of any failures.
 		if Result == ELM327.CONNECT_ELM327_FAIL:
 			ThisDisplay.SetVisualText(ThisDisplay.ELM327Info, "INFO", "FAILED TO CONNECT TO ELM327 DEVICE.\n", True)
@@ -217,8 +292,6 @@ def ConnectELM327(ThisDisplay):
 	# Stop flashing connect button after connection attempt.
 	FlashVisuals.pop("CONNECT", None)
 	ThisDisplay.ELM327Info["CONNECT"].SetDown(False)
-	# Allow another ELM327 communication now this one is complete.
-	LockELM327.release()
 	# Check for MIL status after connection attempt.
 	if ThisELM327.GetMilOn() == True:
 		FlashVisuals["MIL"] = ThisDisplay.Buttons["MIL"]
@@ -239,18 +312,18 @@ def FrameData(ThisDisplay):
 	try:
 		# Get a list of all valid PIDs the connected ECU supports.
 		ValidPIDs = ThisELM327.GetValidPIDs()
-		# Get the information available for each of the supported PIDs.
-		ThisDisplay.SetVisualText(ThisDisplay.FrameData, "INFO", "", False)
+		# Get the information available for each of the supported PIDs, using any recently read by meters or plots.
+		FramePIDs = []
 		for PID in sorted(ValidPIDs):
-			if ValidPIDs[PID][ELM327.FIELD_PID_DESCRIPTION] != '!':
-				# Display the information returned for the current PID.
-				if PID[1] == '1':
-					PidData = ThisELM327.DoPID(PID)
-					ThisDisplay.SetVisualText(ThisDisplay.FrameData, "INFO", "[" + PID + "] " + ValidPIDs[PID] + "\n", True, PidData)
+			if ValidPIDs[PID][ELM327.FIELD_PID_DESCRIPTION] != '!' and PID[1] == '1':
+				FramePIDs.append(PID)
+		PidData = ThisPidStore.GetPIDs(FramePIDs, FRAME_DATA_TOLERANCE)
+		ThisDisplay.SetVisualText(ThisDisplay.FrameData, "INFO", "", False)
+		for PID in FramePIDs:
+			# Display the information returned for the current PID.
+			ThisDisplay.SetVisualText(ThisDisplay.FrameData, "INFO", "[" + PID + "] " + ValidPIDs[PID] + "\n", True, PidData[PID])
 	except Exception as Catch:
 		print(str(Catch))
-	# Allow another ELM327 communication now this one is complete.
-	LockELM327.release()
 
 
 
@@ -259,18 +332,17 @@ def FrameData(ThisDisplay):
 #/*****************************************************/
 def FreezeFrameData(ThisDisplay):
 	try:
+		ThisDisplay.SetVisualText(ThisDisplay.FreezeFrameData, "INFO", "", False)
 		for FreezeIndex in range(ThisELM327.GetFreezeFrameCount()):
 			# Get a list of all valid PIDs the connected ECU supports.
 			ValidPIDs = ThisELM327.GetValidPIDs(FreezeIndex)
-			# Get the information available for each of the supported PIDs.
-			ThisDisplay.SetVisualText(ThisDisplay.FreezeFrameData, "INFO", "", False)
+			# Get the information available for all of the supported PIDs of the freeze frame in one call.
+			FrameData = ThisELM327.GetFreezeFrame(FreezeIndex)
 			for PID in sorted(ValidPIDs):
-				PidData = ThisELM327.DoPID(PID[:4], FreezeIndex)
-				ThisDisplay.SetVisualText(ThisDisplay.FreezeFrameData, "INFO", "[" + PID + "] " + ValidPIDs[PID] + "\n", True, PidData)
+				if PID[:4] in FrameData and PID[4:] == "{:02d}".format(FreezeIndex):
+					ThisDisplay.SetVisualText(ThisDisplay.FreezeFrameData, "INFO", "[" + PID + "] " + ValidPIDs[PID] + "\n", True, FrameData[PID[:4]])
 	except Exception as Catch:
 		print(str(Catch))
-	# Allow another ELM327 communication now this one is complete.
-	LockELM327.release()
 
 
 
@@ -291,8 +363,6 @@ def VehicleData(ThisDisplay):
 					ThisDisplay.SetVisualText(ThisDisplay.VehicleInfo, "INFO", "[" + PID + "] " + ValidPIDs[PID] + "\n", True, PidData)
 	except Exception as Catch:
 		print(str(Catch))
-	# Allow another ELM327 communication now this one is complete.
-	LockELM327.release()
 
 
 
@@ -322,8 +392,6 @@ def TroubleInfo(ThisDisplay):
 				ThisDisplay.SetVisualText(ThisDisplay.TroubleInfo, "INFO", str(TroubleCode) + " " + str(TroubleCodes[TroubleCode]) + "\n", True)
 	except Exception as Catch:
 		print(str(Catch))
-	# Allow another ELM327 communication now this one is complete.
-	LockELM327.release()
 
 
 
@@ -335,79 +403,95 @@ def ClearTroubleInfo(ThisDisplay):
 		TroubleCodes = ThisELM327.DoPID("04")
 	except Exception as Catch:
 		print(str(Catch))
-	# Allow another ELM327 communication now this one is complete.
-	LockELM327.release()
-	if LockELM327.acquire(0):
-		_thread.start_new_thread(TroubleInfo, (ThisDisplay, ))
+	# Show the trouble information after clearing.
+	TroubleInfo(ThisDisplay)
 
 
 
-#/*********************************************************/
-#/* Update the data for the created gadgits from the ECU. */
-#/*********************************************************/
-def MeterData(ThisDisplay):
-	ThisDisplay.Buttons["BUSY"].SetVisible(True)
-	FlashVisuals["BUSY"] = ThisDisplay.Buttons["BUSY"]
-	try:
-		# Get the information available for each of the meter related PIDs.
-		for ThisGadgit in ThisDisplay.Meters:
-			if type(ThisDisplay.Meters[ThisGadgit]) is Gadgit.Gadgit:
-				PID = ThisDisplay.Meters[ThisGadgit].GetPID()
-				if PID != "":
-					# Store the information returned for the current PID on the related meter.
-					PidData = ThisELM327.DoPID(PID)
-					ThisDisplay.Meters[ThisGadgit].SetData(PidData)
-	except Exception as Catch:
-		print(str(Catch))
-	# Allow another ELM327 communication now this one is complete.
-	LockELM327.release()
-	FlashVisuals.pop("BUSY", None)
-	ThisDisplay.Buttons["BUSY"].SetVisible(False)
+#/*****************************************************************/
+#/* Check if meter or plot data should currently be acquired.     */
+#/*****************************************************************/
+def IsAquisitionActive():
+	Result = False
 
+	if ThisDisplay.Meters["GO_STOP"].GetDown() == True and ThisDisplay.Meters["LOCK"].GetDown() == True:
+		Result = True
+	elif ThisDisplay.Plots["GO_STOP"].GetDown() == True:
+		Result = True
 
+	return Result
 
-#/*********************************************************/
-#/* Update the data for the created gadgits from the ECU. */
-#/*********************************************************/
-def PlotData(ThisDisplay):
-	ThisDisplay.Buttons["BUSY"].SetVisible(True)
-	FlashVisuals["BUSY"] = ThisDisplay.Buttons["BUSY"]
-	try:
-		# Get the information available for each of the plot related PIDs.
+
+
+#/*****************************************************************/
+#/* Update the data for the meters and plots from the ECU, with   */
+#/* the PIDs for both scheduled together, each at its own rate.   */
+#/* Queued by the acquisition thread to run on the command queue. */
+#/*****************************************************************/
+def AquisitionSweep():
+	Result = False
+
+	# Get the meter related PIDs.
+	MeterPIDs = {}
+	if ThisDisplay.Meters["GO_STOP"].GetDown() == True and ThisDisplay.Meters["LOCK"].GetDown() == True:
+		for ThisGadgit in list(ThisDisplay.Meters):
+			if type(ThisDisplay.Meters[ThisGadgit]) is Gadgit.Gadgit:
+				PID = ThisDisplay.Meters[ThisGadgit].GetPID()
+				if PID != "":
+					MeterPIDs[ThisGadgit] = PID
+	# Get the plot related PIDs.
+	PlotPIDs = {}
+	if ThisDisplay.Plots["GO_STOP"].GetDown() == True:
 		for Index in range(Plot.PLOT_COUNT):
 			if ThisDisplay.Plots["PLOT"].IsDataEnd(Index) == False:
 				PID = ThisDisplay.Plots["PLOT"].GetPID(Index)
 				if PID != "":
-					# Plot the information returned for the current PID.
-					PidData = ThisELM327.DoPID(PID)
-					ThisDisplay.Plots["PLOT"].SetData(Index, PidData)
-	except Exception as Catch:
-		print(str(Catch))
-	# Allow another ELM327 communication now this one is complete.
-	LockELM327.release()
-	FlashVisuals.pop("BUSY", None)
-	ThisDisplay.Buttons["BUSY"].SetVisible(False)
+					PlotPIDs[Index] = PID
+
+	PIDs = []
+	for PID in list(MeterPIDs.values()) + list(PlotPIDs.values()):
+		if PID not in PIDs:
+			PIDs.append(PID)
+	if len(PIDs) > 0:
+		ThisDisplay.Buttons["BUSY"].SetVisible(True)
+		FlashVisuals["BUSY"] = ThisDisplay.Buttons["BUSY"]
+		try:
+			# Get the information for the active PIDs which are due, in as few requests as possible.
+			PidData = ThisScheduler.Sweep(PIDs)
+			# Store the information returned for each PID on the related meter.
+			for ThisGadgit in MeterPIDs:
+				if ThisGadgit in ThisDisplay.Meters and MeterPIDs[ThisGadgit] in PidData:
+					ThisDisplay.Meters[ThisGadgit].SetData(PidData[MeterPIDs[ThisGadgit]])
+			# Plot the information returned for each PID.
+			for Index in PlotPIDs:
+				if PlotPIDs[Index] in PidData:
+					ThisDisplay.Plots["PLOT"].SetData(Index, PidData[PlotPIDs[Index]])
+			Result = True
+		finally:
+			FlashVisuals.pop("BUSY", None)
+			ThisDisplay.Buttons["BUSY"].SetVisible(False)
 
+	return Result
 
 
-#/*********************************************************/
-#/* Aquire data as fast as possible for plots and meters. */
-#/*********************************************************/
-def AquisitionLoop(ThisDisplay):
-	try:
-		while (ThisDisplay.Meters["GO_STOP"].GetDown() == True or ThisDisplay.Plots["GO_STOP"].GetDown() == True):
-			# Update the gadgit data from the ECU.
-			if ThisDisplay.CurrentTab == ThisDisplay.Meters and ThisDisplay.Meters["LOCK"].GetDown() == True and ThisDisplay.Meters["GO_STOP"].GetDown() == True:
-				if LockELM327.acquire(0):
-					_thread.start_new_thread(MeterData, (ThisDisplay, ))
-			# Update the plot data from the ECU.
-			if ThisDisplay.CurrentTab == ThisDisplay.Plots and ThisDisplay.Plots["GO_STOP"].GetDown() == True:
-				if LockELM327.acquire(0):
-					_thread.start_new_thread(PlotData, (ThisDisplay, ))
-	except Exception as Catch:
-		print(str(Catch))
-	# Allow this function to be called again if required.
-	LockAquisition.release()
+
+#/*****************************************************************/
+#/* Show the acquisition statistics, the polling rate achieved    */
+#/* for each PID, the PID store counts and the command queue wait */
+#/* times when acquisition stops.                                 */
+#/*****************************************************************/
+def AquisitionStopped(Statistics):
+	Statistics += ThisScheduler.GetRateInfo()
+	Statistics += ThisPidStore.GetStatistics()
+	Statistics += ThisCommandQueue.GetStatistics()
+	if Statistics != "":
+		print(Statistics)
+		ThisDisplay.SetVisualText(ThisDisplay.ELM327Info, "INFO", Statistics, True)
+
+
+
+# Single long running thread aquiring data for plots and meters while GO/STOP is down.
+ThisAcquisition = Acquisition.Acquisition(ThisCommandQueue, IsAquisitionActive, AquisitionSweep, AquisitionStopped)
 
 
 
@@ -418,9 +502,8 @@ ApplyConfig()
 # Create a timer for updating the displayed time/date and updating gadgit data from the ECU.
 pygame.time.set_timer(EVENT_TIMER, TIMER_PERIOD)
 
-# Aquire a lock for use when communicating with the ELM327 device.
-if LockELM327.acquire(0):
-	_thread.start_new_thread(ConnectELM327, (ThisDisplay, ))
+# Connect to the ELM327 device.
+ThisCommandQueue.Submit(ConnectELM327, (ThisDisplay, ))
 
 # Application message loop.
 ExitFlag = False
@@ -459,17 +542,19 @@ while ExitFlag == False:
 						FlashVisuals[ThisVisual].SetDown(False)
 			except Exception as Catch:
 				print(str(Catch))
-		# Only process the following events if the ELM327 device is currently communicating.
-		elif LockELM327.locked() == True:
+		# Only process the following events while user requested ELM327 communications are queued or running.
+		elif ThisCommandQueue.IsBusy() == True:
 			if ThisEvent.type == pygame.MOUSEBUTTONDOWN:
 				# Allow GO/STOP button to be toggled while ELM327 communications are occuring.
 				if ThisDisplay.CurrentTab == ThisDisplay.Meters:
 					ThisDisplay.Meters["GO_STOP"].IsEvent(Visual.EVENT_MOUSE_DOWN, ThisEvent.pos[0], ThisEvent.pos[1], ThisEvent.button)
 				elif ThisDisplay.CurrentTab == ThisDisplay.Plots:
 					ThisDisplay.Plots["GO_STOP"].IsEvent(Visual.EVENT_MOUSE_DOWN, ThisEvent.pos[0], ThisEvent.pos[1], ThisEvent.button)
+				# Let the acquisition thread know GO/STOP may have changed.
+				ThisAcquisition.Notify()
 
-		# Only process the following events if the ELM327 device is not currently communicating.
-		elif LockELM327.locked() == False:
+		# Only process the following events if no user requested ELM327 communications are queued or running.
+		else:
 			if ThisEvent.type == pygame.MOUSEBUTTONDOWN:
 				# Pass button down events to all buttons and gadgits.
 				ButtonGadgit = ThisDisplay.IsEvent(Visual.EVENT_MOUSE_DOWN, ThisEvent.pos[0], ThisEvent.pos[1], ThisEvent.button)
@@ -486,8 +571,7 @@ while ExitFlag == False:
 						if ButtonGadgit["GADGIT"] == "CONFIRM_EXIT":
 							ExitFlag = True
 						elif ButtonGadgit["GADGIT"] == "CONFIRM_CLEAR_ECU":
-							if LockELM327.acquire(0):
-								_thread.start_new_thread(ClearTroubleInfo, (ThisDisplay, ))
+							ThisCommandQueue.Submit(ClearTroubleInfo, (ThisDisplay, ))
 					# If confirm dialog button no is pressed, close the dialog.
 					elif ButtonGadgit["BUTTON"] == "NO":
 						ThisDisplay.CurrentTab.pop("CONFIRM", None)
@@ -530,7 +614,7 @@ while ExitFlag == False:
 						FileName = "SAVE/"
 						FileName += Now.strftime("%Y-%m-%d_%H-%M-%S_")
 						# Get Vehicle VIN for report filename.
-						FileName += ThisELM327.DoPID("0902").replace(' ', '') + ".pdf"
+						FileName += ThisCommandQueue.Submit(ThisELM327.DoPID, ("0902", ), TimeOut = UI_COMMAND_TIME_OUT).result(UI_COMMAND_TIME_OUT).replace(' ', '') + ".pdf"
 						# Save PDF Report.
 						Result = SavePdfReport(FileName)
 						# Display PDF saved message.
@@ -569,8 +653,7 @@ while ExitFlag == False:
 						ThisDisplay.CurrentTab["SELECT"] = Select.Select(ThisDisplay.ThisSurface, "SELECT_SERIAL_PORT_NAME", SelectText)
 					# If connect button is pressed, connect to the CAN BUS.
 					elif ButtonGadgit["BUTTON"] == "CONNECT":
-						if LockELM327.acquire(0):
-							_thread.start_new_thread(ConnectELM327, (ThisDisplay, ))
+						ThisCommandQueue.Submit(ConnectELM327, (ThisDisplay, ))
 					# If select button is pressed, select a PID for the specific gadgit.
 					elif ButtonGadgit["BUTTON"] == "SELECT" or ButtonGadgit["BUTTON"][:5] == "PLOT_":
 						# Remember which gadgit the select is for.
@@ -596,48 +679,41 @@ while ExitFlag == False:
 							ThisDisplay.CurrentTab.pop("CONFIGURE", None)
 					# If vehicle button is pressed, get the vehicle data from the ECU.
 					elif ButtonGadgit["BUTTON"] == "VEHICLE":
-						if LockELM327.acquire(0):
-							_thread.start_new_thread(VehicleData, (ThisDisplay, ))
+						ThisCommandQueue.Submit(VehicleData, (ThisDisplay, ))
 					# If trouble or refresh button is pressed, get the trobule related data from the ECU.
 					elif ButtonGadgit["BUTTON"] == "TROUBLE" or ButtonGadgit["BUTTON"] == "MIL" or ButtonGadgit["BUTTON"] == "REFRESH":
-						if LockELM327.acquire(0):
-							_thread.start_new_thread(TroubleInfo, (ThisDisplay, ))
-							# Check for MIL status after reading trouble data.
-							FlashVisuals.pop("MIL", None)
-							ThisDisplay.Buttons["MIL"].SetDown(False)
-							if ThisELM327.GetMilOn() == True:
-								FlashVisuals["MIL"] = ThisDisplay.Buttons["MIL"]
+						ThisCommandQueue.Submit(TroubleInfo, (ThisDisplay, ))
+						# Check for MIL status after reading trouble data.
+						FlashVisuals.pop("MIL", None)
+						ThisDisplay.Buttons["MIL"].SetDown(False)
+						if ThisELM327.GetMilOn() == True:
+							FlashVisuals["MIL"] = ThisDisplay.Buttons["MIL"]
 					# If clear button is pressed, clear the trouble and related data on the ECU.
 					elif ButtonGadgit["BUTTON"] == "CLEAR":
 						# Display a confirmation to clear ECU trouble codes.
 						ThisDisplay.CurrentTab["CONFIRM"] = Confirm.Confirm(ThisDisplay.ThisSurface, "CONFIRM_CLEAR_ECU", "Clear all trouble codes\nand related data\non the ECU?")
 					# If freeze button is pressed.
 					elif ButtonGadgit["BUTTON"] == "FREEZE" or ButtonGadgit["BUTTON"] == "RELOAD_FREEZE":
-						if LockELM327.acquire(0):
-							_thread.start_new_thread(FreezeFrameData, (ThisDisplay, ))
+						ThisCommandQueue.Submit(FreezeFrameData, (ThisDisplay, ))
 					# If frame button is pressed, get a frame of data from the ECU.
 					elif ButtonGadgit["BUTTON"] == "FRAME" or ButtonGadgit["BUTTON"] == "RELOAD":
-						if LockELM327.acquire(0):
-							_thread.start_new_thread(FrameData, (ThisDisplay, ))
+						ThisCommandQueue.Submit(FrameData, (ThisDisplay, ))
 					# If add button is pressed, add a new gadgit to the meters tab.
 					elif ButtonGadgit["BUTTON"] == "ADD":
 						if ThisDisplay.CurrentTab == ThisDisplay.Meters:
 							NewName = "{:X}".format(random.getrandbits(128))
 							ThisDisplay.Meters[NewName] = Gadgit.Gadgit(ThisDisplay.ThisSurface, NewName, Visual.PRESS_NONE, 0, 2 * Visual.BUTTON_HEIGHT, ThisDisplay.GadgitWidth, ThisDisplay.GadgitHeight, "NEW")
-					# If GO/STOP button is pressed, start data aquisition.
+					# If GO/STOP button is pressed, start or stop data aquisition.
 					elif ButtonGadgit["BUTTON"] == "GO_STOP":
-						if ThisDisplay.CurrentTab == ThisDisplay.Meters or ThisDisplay.CurrentTab == ThisDisplay.Plots:
-							if LockAquisition.acquire(0):
-								_thread.start_new_thread(AquisitionLoop, (ThisDisplay, ))
-								print("able to lock\n")
-							else:
-								print("unable to lock\n")
+						ThisAcquisition.Notify()
 					# If add button is pressed, add a new gadgit to the meters tab.
 					elif ButtonGadgit["BUTTON"] == "LOCK":
 						if ThisDisplay.Meters["LOCK"].GetDown() == False:
 							ThisDisplay.Meters["ADD"].SetVisible(True)
 						else:
 							ThisDisplay.Meters["ADD"].SetVisible(False)
+						# Meters are only aquired while locked.
+						ThisAcquisition.Notify()
 						for ThisGadget in ThisDisplay.Meters:
 							if type(ThisDisplay.Meters[ThisGadget]) is not str and type(ThisDisplay.Meters[ThisGadget]) is not Button.Button:
 								for ThisButton in ThisDisplay.Meters[ThisGadget].Buttons:
@@ -666,6 +742,8 @@ ThisDisplay.SaveMetersTab()
 ThisDisplay.Plots["PLOT"].SaveSeriesConfig()
 
 # Terminate application.
+ThisAcquisition.Close()
+ThisCommandQueue.Close()
 pygame.time.set_timer(EVENT_TIMER, 0)
 ThisDisplay.Close()
 quit()
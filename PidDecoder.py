@@ -0,0 +1,131 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: PidDecoder                                                       */
+#/* Decode PID data bytes using a table of formulas, one line per PID of    */
+#/* the form PID|Data bytes|Formula, for example 010C|2|(256 * A + B) / 4   */
+#/* where A, B, C... are the data bytes. Each formula is compiled once when */
+#/* the table is loaded. Mode 01 formulas also decode the Mode 02 freeze    */
+#/* frame PIDs.                                                             */
+#/***************************************************************************/
+
+
+
+import re
+
+
+
+# Names of the data bytes in formulas, in order.
+FORMULA_BYTE_NAMES = "ABCDEFGHIJKLM"
+
+
+
+#/*****************************************************************/
+#/* Get the signed value of a two's complement number of bits.    */
+#/*****************************************************************/
+def Signed(Value, Bits):
+	Result = Value
+
+	if Value >= 1 << (Bits - 1):
+		Result = Value - (1 << Bits)
+
+	return Result
+
+
+
+# Functions which formulas may use.
+FormulaFunctions = {
+	"Signed": Signed,
+}
+
+
+
+class PidDecoder:
+	def __init__(self):
+		# Number of data bytes and compiled formula of each PID.
+		self.Formulas = {}
+
+
+
+#/*****************************************************************/
+#/* Compile a formula into a function of the data bytes.          */
+#/*****************************************************************/
+	def CompileFormula(self, Formula):
+		Text = re.sub(r'\b([' + FORMULA_BYTE_NAMES + r'])\b', lambda Match: "Data[" + str(FORMULA_BYTE_NAMES.index(Match.group(1))) + "]", Formula)
+		Namespace = { "__builtins__": {} }
+		Namespace.update(FormulaFunctions)
+
+		return eval("lambda Data: (" + Text + ")", Namespace)
+
+
+
+#/*****************************************************************/
+#/* Load and compile the table of PID formulas. Mode 01 PIDs also */
+#/* give their Mode 02 freeze frame PIDs.                         */
+#/*****************************************************************/
+	def Load(self, FileName):
+		self.Formulas = {}
+
+		with open(FileName) as ThisFile:
+			for ThisLine in ThisFile:
+				ThisLine = ThisLine.strip()
+				if ThisLine != "" and ThisLine[0] != '#':
+					PID, DataBytes, Formula = ThisLine.split('|')
+					Decoder = [int(DataBytes), self.CompileFormula(Formula)]
+					self.Formulas[PID] = Decoder
+					if PID[:2] == '01':
+						self.Formulas['02' + PID[2:]] = Decoder
+
+
+
+#/*****************************************************************/
+#/* Check if a PID is decoded by a formula.                       */
+#/*****************************************************************/
+	def IsDecoded(self, PID):
+		return PID in self.Formulas
+
+
+
+#/*****************************************************************/
+#/* Decode the data bytes of a PID.                               */
+#/*****************************************************************/
+	def Decode(self, PID, Data):
+		DataBytes, Formula = self.Formulas[PID]
+		if len(Data) < DataBytes:
+			raise ValueError("PID" + PID + " data too short : " + Data.hex())
+
+		return Formula(Data)
+
+
+
+#/*****************************************************************/
+#/* Decode the data bytes of all PIDs with a formula in a single  */
+#/* loop, returning the value of each PID decoded, or the error   */
+#/* value for PIDs which fail to decode.                          */
+#/*****************************************************************/
+	def DecodePayloads(self, Payloads, ErrorValue):
+		Result = {}
+
+		for PID in Payloads:
+			if PID in self.Formulas:
+				DataBytes, Formula = self.Formulas[PID]
+				try:
+					Result[PID] = Formula(Payloads[PID])
+				except Exception as Catch:
+					print(ErrorValue + " in PID" + PID + " : " + str(Catch))
+					Result[PID] = ErrorValue
+
+		return Result
@@ -0,0 +1,109 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: PidStore                                                         */
+#/* Latest value of each PID read from the ECU, shared between meters,      */
+#/* plots and reports. Readers are given a stored value when it is newer    */
+#/* than they require, otherwise the PID is requested from the ECU. All     */
+#/* requests run on the command queue thread, one reader at a time.         */
+#/***************************************************************************/
+
+
+
+import time
+import threading
+
+
+
+class PidStore:
+	def __init__(self, ThisELM327):
+		self.ThisELM327 = ThisELM327
+		# Protects the stored values.
+		self.Lock = threading.Lock()
+		# Time each PID was read and the value read.
+		self.Values = {}
+		self.ResetStatistics()
+
+
+
+#/*****************************************************************/
+#/* Clear the hit, miss and coalesced request counts.             */
+#/*****************************************************************/
+	def ResetStatistics(self):
+		self.HitCount = 0
+		self.MissCount = 0
+		self.CoalescedCount = 0
+
+
+
+#/*****************************************************************/
+#/* Forget all stored values, when a new vehicle is connected.    */
+#/*****************************************************************/
+	def Clear(self):
+		with self.Lock:
+			self.Values = {}
+		self.ResetStatistics()
+
+
+
+#/*****************************************************************/
+#/* Get the values of a list of PIDs, each no older than the      */
+#/* tolerance in seconds. PIDs not stored recently enough are     */
+#/* requested from the ECU together, in as few requests as        */
+#/* possible. Must be called on the command queue thread.         */
+#/*****************************************************************/
+	def GetPIDs(self, PIDs, Tolerance):
+		Result = {}
+
+		FetchPIDs = []
+		Now = time.perf_counter()
+		with self.Lock:
+			for PID in PIDs:
+				if PID in Result or PID in FetchPIDs:
+					# Asked for more than once by this reader.
+					self.CoalescedCount += 1
+				elif PID in self.Values and Now - self.Values[PID][0] <= Tolerance:
+					Result[PID] = self.Values[PID][1]
+					self.HitCount += 1
+				else:
+					FetchPIDs.append(PID)
+					self.MissCount += 1
+
+		if len(FetchPIDs) > 0:
+			PidData = self.ThisELM327.DoPIDs(FetchPIDs)
+			with self.Lock:
+				Now = time.perf_counter()
+				for PID in FetchPIDs:
+					if PID in PidData:
+						self.Values[PID] = [Now, PidData[PID]]
+			Result.update(PidData)
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the hit, miss and coalesced request counts. Misses are    */
+#/* the only PIDs actually requested from the ECU.                */
+#/*****************************************************************/
+	def GetStatistics(self):
+		Result = ""
+
+		Result += "PID Store Hits|" + str(self.HitCount) + "\n"
+		Result += "PID Store Misses|" + str(self.MissCount) + "\n"
+		Result += "PID Store Coalesced|" + str(self.CoalescedCount) + "\n"
+
+		return Result
@@ -0,0 +1,399 @@
+#!/usr/bin/python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: RemoteELM327                                                     */
+#/* Client of the ELM327 daemon, which owns the ELM327 device and shares it */
+#/* between several programs. Selected as a serial port of the form         */
+#/* unix://<socket>, the daemon socket /tmp/PiOBDII.sock when none is       */
+#/* given. Has the ELM327 class functions used by PiOBDII, so the dashboard */
+#/* runs as one client of the daemon. The valid PIDs and PID rates are kept */
+#/* from the connection, the rest are calls to the daemon. PIDs may also be */
+#/* subscribed to at a rate, the daemon then sends their values as they     */
+#/* are due.                                                                */
+#/*                                                                         */
+#/* Messages each way are JSON objects, one per line. Calls are             */
+#/* {"Id":n,"Call":name,"Args":[...]}, answered by {"Id":n,"Result":value}  */
+#/* or {"Id":n,"Error":text}. Connect progress is sent as                   */
+#/* {"Id":n,"Progress":[Phase,Elapsed]} and subscribed values as            */
+#/* {"Time":seconds,"Values":{PID:value}}.                                  */
+#/*                                                                         */
+#/* Run this file to query PIDs once, or to log them at a rate:             */
+#/* ./RemoteELM327.py [--rate Hz] [--info] PID [PID ...]                    */
+#/***************************************************************************/
+
+
+
+import sys
+import time
+import json
+import socket
+import argparse
+import threading
+import concurrent.futures
+import ELM327
+
+
+
+# Port name prefix of the daemon socket.
+DAEMON_PREFIX = "unix://"
+
+# Default name of the daemon socket.
+DAEMON_SOCKET_NAME = "/tmp/PiOBDII.sock"
+
+# Largest number of bytes received from the socket at once.
+RECEIVE_SIZE = 4096
+
+
+
+#/*****************************************************************/
+#/* Check if a port name is the ELM327 daemon.                    */
+#/*****************************************************************/
+def IsDaemonName(PortName):
+	return PortName != None and PortName[:len(DAEMON_PREFIX)] == DAEMON_PREFIX
+
+
+
+#/*****************************************************************/
+#/* Get the socket name of a daemon port name.                    */
+#/*****************************************************************/
+def GetSocketName(PortName):
+	Result = PortName[len(DAEMON_PREFIX):]
+
+	if Result == "":
+		Result = DAEMON_SOCKET_NAME
+
+	return Result
+
+
+
+#/*****************************************************************/
+#/* Encode a message as a line of JSON. Values JSON has no type   */
+#/* for are sent as text.                                         */
+#/*****************************************************************/
+def EncodeMessage(Message):
+	return bytes(json.dumps(Message, separators = (',', ':'), default = str) + "\n", 'utf-8')
+
+
+
+#/*****************************************************************/
+#/* Split the complete lines received into messages. Return the   */
+#/* list of messages and the data of any incomplete line.         */
+#/*****************************************************************/
+def SplitMessages(Received):
+	Messages = []
+
+	Lines = Received.split(b'\n')
+	for Line in Lines[:-1]:
+		try:
+			Message = json.loads(Line)
+			if type(Message) is dict:
+				Messages.append(Message)
+		except ValueError as Catch:
+			print(ELM327.STRING_ERROR + " invalid message : " + str(Catch))
+
+	return Messages, Lines[-1]
+
+
+
+class RemoteELM327:
+	def __init__(self, SocketName = DAEMON_SOCKET_NAME):
+		self.SocketName = SocketName
+		self.Connection = None
+		# Protects the connection and the calls waiting for an answer.
+		self.Lock = threading.Lock()
+		self.Sequence = 0
+		# Futures of the calls waiting for an answer from the daemon, by call id.
+		self.Waiting = {}
+		# Called with each phase of a connection, as the daemon connects.
+		self.PhaseCallback = None
+		# Called with the time and values of subscribed PIDs, as the daemon sends them.
+		self.ValuesCallback = None
+		# The daemon loads the vehicle in its own configuration.
+		self.VehicleFile = ""
+		self.SetState({})
+
+
+
+#/*****************************************************************/
+#/* Keep the state of the daemon connection to the vehicle.       */
+#/*****************************************************************/
+	def SetState(self, State):
+		self.IsCAN = State.get("IsCAN", False)
+		self.InitResult = State.get("InitResult", "")
+		self.ValidPIDs = State.get("ValidPIDs", {})
+		self.PidRates = State.get("PidRates", {})
+		self.PidDeadbands = State.get("PidDeadbands", {})
+
+
+
+#/*****************************************************************/
+#/* Connect to the daemon socket, and start the thread receiving  */
+#/* messages from the daemon.                                     */
+#/*****************************************************************/
+	def Open(self):
+		Connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		try:
+			Connection.connect(self.SocketName)
+		except:
+			Connection.close()
+			raise
+		with self.Lock:
+			self.Connection = Connection
+		threading.Thread(target = self.Receive, args = (Connection, ), name = "RemoteELM327", daemon = True).start()
+
+
+
+#/*****************************************************************/
+#/* Close the connection to the daemon.                           */
+#/*****************************************************************/
+	def Close(self):
+		with self.Lock:
+			Connection = self.Connection
+			self.Connection = None
+		if Connection != None:
+			try:
+				Connection.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
+			Connection.close()
+
+
+
+#/*****************************************************************/
+#/* Receive thread. Pass each message from the daemon to the call */
+#/* waiting for it, or to the progress or values callback. When   */
+#/* the connection is lost, all waiting calls fail.               */
+#/*****************************************************************/
+	def Receive(self, Connection):
+		Received = b''
+		while True:
+			try:
+				Data = Connection.recv(RECEIVE_SIZE)
+			except OSError:
+				Data = b''
+			if Data == b'':
+				break
+			Messages, Received = SplitMessages(Received + Data)
+			for Message in Messages:
+				try:
+					self.DoMessage(Message)
+				except Exception as Catch:
+					print(str(Catch))
+
+		with self.Lock:
+			if self.Connection is Connection:
+				self.Connection = None
+			Waiting = self.Waiting
+			self.Waiting = {}
+		for Future in Waiting.values():
+			Future.set_exception(ConnectionError("Lost connection to daemon " + self.SocketName))
+
+
+
+#/*****************************************************************/
+#/* Act on a message from the daemon.                             */
+#/*****************************************************************/
+	def DoMessage(self, Message):
+		if "Values" in Message:
+			if self.ValuesCallback != None:
+				self.ValuesCallback(Message.get("Time", 0.0), Message["Values"])
+		elif "Progress" in Message:
+			if self.PhaseCallback != None:
+				self.PhaseCallback(*Message["Progress"])
+		elif "Id" in Message:
+			with self.Lock:
+				Future = self.Waiting.pop(Message["Id"], None)
+			if Future != None:
+				if "Error" in Message:
+					Future.set_exception(RuntimeError(Message["Error"]))
+				else:
+					Future.set_result(Message.get("Result"))
+
+
+
+#/*****************************************************************/
+#/* Call a function of the daemon and wait for its result. Calls  */
+#/* using the ELM327 device wait in turn with those of the other  */
+#/* clients.                                                      */
+#/*****************************************************************/
+	def Call(self, Name, *Args):
+		Future = concurrent.futures.Future()
+		with self.Lock:
+			if self.Connection == None:
+				raise ConnectionError("Not connected to daemon " + self.SocketName)
+			self.Sequence += 1
+			self.Waiting[self.Sequence] = Future
+			self.Connection.sendall(EncodeMessage({ "Id": self.Sequence, "Call": Name, "Args": list(Args) }))
+
+		return Future.result()
+
+
+
+#/*****************************************************************/
+#/* Connect to the daemon, which connects to the vehicle when it  */
+#/* is not already connected, showing each phase of the           */
+#/* connection. A vehicle already connected is shared, not        */
+#/* connected again.                                              */
+#/*****************************************************************/
+	def Connect(self, PhaseCallback = None):
+		Result = ELM327.CONNECT_ELM327_FAIL
+
+		self.PhaseCallback = PhaseCallback
+		try:
+			if self.Connection == None:
+				self.Open()
+			Result = self.Call("Connect")
+			self.SetState(self.Call("GetState"))
+		except Exception as Catch:
+			print(str(Catch))
+			self.SetState({})
+			self.InitResult = "FAILED TO CONNECT TO DAEMON: " + self.SocketName + "\n"
+		self.PhaseCallback = None
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* ELM327 class functions answered from the connection state.    */
+#/*****************************************************************/
+	def LoadVehicle(self, VehicleFile):
+		self.VehicleFile = VehicleFile
+
+
+	def GetInitResult(self):
+		return self.InitResult
+
+
+	def GetPidRate(self, PID):
+		return self.PidRates.get(PID, ELM327.DEFAULT_PID_RATE)
+
+
+	def GetPidDeadband(self, PID):
+		return self.PidDeadbands.get(PID, 0.0)
+
+
+
+#/*****************************************************************/
+#/* ELM327 class functions called on the daemon.                  */
+#/*****************************************************************/
+	def GetInfo(self):
+		return self.Call("GetInfo")
+
+
+	# The trouble codes may be read or cleared by another client, so these are asked for each time.
+	def GetMilOn(self):
+		return self.Call("GetMilOn")
+
+
+	def GetFreezeFrameCount(self):
+		return self.Call("GetFreezeFrameCount")
+
+
+	def GetValidPIDs(self, FreezeIndex = -1):
+		Result = self.ValidPIDs
+
+		if FreezeIndex != -1:
+			Result = self.Call("GetValidPIDs", FreezeIndex)
+
+		return Result
+
+
+	def GetFreezeFrame(self, FreezeIndex):
+		return self.Call("GetFreezeFrame", FreezeIndex)
+
+
+	def DoPID(self, PID, FreezeIndex = -1):
+		if FreezeIndex == -1:
+			Result = self.Call("DoPID", PID)
+		else:
+			Result = self.Call("DoPID", PID, FreezeIndex)
+
+		return Result
+
+
+	def DoPIDs(self, PIDs):
+		return self.Call("DoPIDs", list(PIDs))
+
+
+
+#/*****************************************************************/
+#/* Name this client in the daemon statistics.                    */
+#/*****************************************************************/
+	def SetName(self, Name):
+		return self.Call("SetName", Name)
+
+
+
+#/*****************************************************************/
+#/* Subscribe to a PID at a rate in Hz, or stop the subscription  */
+#/* with a rate of 0. Values are passed to the values callback.   */
+#/*****************************************************************/
+	def Subscribe(self, PID, Rate):
+		return self.Call("Subscribe", PID, Rate)
+
+
+
+#/*****************************************************************/
+#/* Get the daemon link and client statistics.                    */
+#/*****************************************************************/
+	def GetDaemonInfo(self):
+		return self.Call("GetDaemonInfo")
+
+
+
+#/*****************************************************************/
+#/* Print subscribed PID values as lines of Seconds|PID|Value.    */
+#/*****************************************************************/
+def PrintValues(StartTime, Time, Values):
+	for PID in sorted(Values):
+		print("{:1.3f}".format(Time - StartTime) + "|" + PID + "|" + str(Values[PID]))
+
+
+
+if __name__ == "__main__":
+	Parser = argparse.ArgumentParser(description = "Query PIDs from the ELM327 daemon, once or logged at a rate.")
+	Parser.add_argument("--socket", default = DAEMON_SOCKET_NAME, help = "name of the daemon socket")
+	Parser.add_argument("--rate", type = float, default = 0.0, help = "log the PIDs at this rate in Hz until interrupted, rather than once")
+	Parser.add_argument("--name", default = "query", help = "name of this client in the daemon statistics")
+	Parser.add_argument("--info", action = "store_true", help = "print the daemon statistics")
+	Parser.add_argument("PIDs", nargs = "*", help = "PIDs to get, for example 010C 010D")
+	Arguments = Parser.parse_args()
+
+	ThisRemoteELM327 = RemoteELM327(Arguments.socket)
+	if ThisRemoteELM327.Connect() != ELM327.CONNECT_SUCCESS:
+		print(ThisRemoteELM327.GetInitResult())
+		sys.exit(1)
+	try:
+		ThisRemoteELM327.SetName(Arguments.name)
+		if Arguments.info == True:
+			print(ThisRemoteELM327.GetDaemonInfo())
+		if Arguments.rate > 0 and len(Arguments.PIDs) > 0:
+			StartTime = time.time()
+			ThisRemoteELM327.ValuesCallback = lambda Time, Values: PrintValues(StartTime, Time, Values)
+			for PID in Arguments.PIDs:
+				ThisRemoteELM327.Subscribe(PID.upper(), Arguments.rate)
+			while ThisRemoteELM327.Connection != None:
+				time.sleep(ELM327.ELM_POLL_PERIOD)
+		elif len(Arguments.PIDs) > 0:
+			PidData = ThisRemoteELM327.DoPIDs([PID.upper() for PID in Arguments.PIDs])
+			for PID in PidData:
+				print(PID + "|" + str(PidData[PID]))
+	except KeyboardInterrupt:
+		pass
+	ThisRemoteELM327.Close()
@@ -0,0 +1,214 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: Scheduler                                                        */
+#/* Choose which of the active PIDs to request on each acquisition sweep,   */
+#/* so each PID is polled close to its target rate. PIDs are ordered by how */
+#/* far through their polling period they are, so PIDs which are due go     */
+#/* first, and any spare room in a request is filled with the PIDs nearest  */
+#/* to being due. The rate of a PID is lowered while its value stays in     */
+#/* its deadband, and raised while its value is changing fast.              */
+#/***************************************************************************/
+
+
+
+import time
+import heapq
+import ELM327
+
+
+
+# Number of recent polls of each PID over which the achieved polling rate is measured.
+RATE_POLL_COUNT = 10
+
+# Limits of the adaptive factor applied to the target rate of a PID.
+MIN_RATE_FACTOR = 0.125
+MAX_RATE_FACTOR = 2.0
+# Factor applied to the adaptive factor on each poll where the value is steady, or changing fast.
+RATE_SLOW_STEP = 0.5
+RATE_FAST_STEP = 2.0
+# Rate of change, in deadbands per second, above which a value is changing fast.
+FAST_CHANGE_DEADBANDS = 5.0
+
+
+
+class Scheduler:
+	def __init__(self, ThisELM327, ThisPidStore):
+		self.ThisELM327 = ThisELM327
+		# Shared latest PID values, so PIDs just read for another reader are not requested again.
+		self.ThisPidStore = ThisPidStore
+		# Time each PID was last polled.
+		self.LastPollTime = {}
+		# Recent poll times of each PID, for the achieved polling rate.
+		self.PollTimes = {}
+		# Adaptive factor applied to the target rate of each PID.
+		self.RateFactors = {}
+		# Time and value of the last reading of each PID, and the reading steady values are compared against.
+		self.LastValues = {}
+
+
+
+#/*****************************************************************/
+#/* Forget the polling history, when a new vehicle is connected.  */
+#/*****************************************************************/
+	def Reset(self):
+		self.LastPollTime = {}
+		self.PollTimes = {}
+		self.RateFactors = {}
+		self.LastValues = {}
+
+
+
+#/*****************************************************************/
+#/* Get the current polling rate in Hz of a PID, the target rate  */
+#/* adjusted by how much the value is changing.                   */
+#/*****************************************************************/
+	def GetRate(self, PID):
+		Result = self.ThisELM327.GetPidRate(PID)
+
+		if PID in self.RateFactors:
+			Result *= self.RateFactors[PID]
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Adjust the polling rate of a PID from a new reading. Readings */
+#/* inside the deadband of the last reading lower the rate, fast  */
+#/* changing readings raise it. Non numeric PIDs keep their rate. */
+#/*****************************************************************/
+	def AdaptRate(self, PID, Value, Now):
+		Deadband = self.ThisELM327.GetPidDeadband(PID)
+		if Deadband > 0 and (type(Value) is float or type(Value) is int):
+			Factor = self.RateFactors.get(PID, 1.0)
+			if PID not in self.LastValues:
+				self.LastValues[PID] = [Now, Value, Value]
+			else:
+				LastTime, LastValue, SteadyValue = self.LastValues[PID]
+				if Now > LastTime and abs(Value - LastValue) / (Now - LastTime) > FAST_CHANGE_DEADBANDS * Deadband:
+					# Changing fast, poll more often using the bus time freed by steady PIDs.
+					Factor = min(MAX_RATE_FACTOR, max(1.0, Factor) * RATE_FAST_STEP)
+					SteadyValue = Value
+				elif abs(Value - SteadyValue) <= Deadband:
+					# Steady, poll less often. Keep comparing against the same reading so slow drift is seen.
+					Factor = max(MIN_RATE_FACTOR, Factor * RATE_SLOW_STEP)
+				else:
+					# Changing, return to the target rate.
+					Factor = max(1.0, Factor * RATE_SLOW_STEP)
+					SteadyValue = Value
+				self.LastValues[PID] = [Now, Value, SteadyValue]
+			self.RateFactors[PID] = Factor
+
+
+
+#/*****************************************************************/
+#/* Get the number of PIDs which can be requested in one sweep.   */
+#/* CAN protocols allow several Mode 01 PIDs in a single request. */
+#/*****************************************************************/
+	def GetSlotCount(self):
+		Result = 1
+
+		if self.ThisELM327.IsCAN == True:
+			Result = ELM327.BATCH_PID_COUNT
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Choose the PIDs to request this sweep. The weight of a PID is */
+#/* the time since it was last polled multiplied by its current   */
+#/* rate, so a weight of 1 or more means the PID is due. PIDs     */
+#/* never polled are always chosen first.                         */
+#/*****************************************************************/
+	def ChoosePIDs(self, PIDs, Now):
+		Weights = []
+		for PID in PIDs:
+			if PID not in self.LastPollTime:
+				Weight = float("inf")
+			else:
+				Weight = (Now - self.LastPollTime[PID]) * self.GetRate(PID)
+			Weights.append((Weight, PID))
+
+		Result = []
+		for Weight, PID in heapq.nlargest(self.GetSlotCount(), Weights):
+			Result.append(PID)
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Request the chosen PIDs from the ECU through the PID store,   */
+#/* returning the data for only those PIDs polled in this sweep.  */
+#/*****************************************************************/
+	def Sweep(self, PIDs):
+		Result = {}
+
+		Unique = []
+		for PID in PIDs:
+			if PID not in Unique:
+				Unique.append(PID)
+		if len(Unique) > 0:
+			Now = time.perf_counter()
+			ChosenPIDs = self.ChoosePIDs(Unique, Now)
+			# Accept values read within half the period of the fastest PID chosen.
+			Tolerance = 0.5 / max([self.GetRate(PID) for PID in ChosenPIDs])
+			Result = self.ThisPidStore.GetPIDs(ChosenPIDs, Tolerance)
+			for PID in ChosenPIDs:
+				self.LastPollTime[PID] = Now
+				if PID not in self.PollTimes:
+					self.PollTimes[PID] = []
+				self.PollTimes[PID].append(Now)
+				if len(self.PollTimes[PID]) > RATE_POLL_COUNT:
+					self.PollTimes[PID].pop(0)
+				if PID in Result:
+					self.AdaptRate(PID, Result[PID], Now)
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the achieved polling rate in Hz of a PID.                 */
+#/*****************************************************************/
+	def GetAchievedRate(self, PID):
+		Result = 0.0
+
+		if PID in self.PollTimes and len(self.PollTimes[PID]) > 1:
+			Seconds = self.PollTimes[PID][-1] - self.PollTimes[PID][0]
+			if Seconds > 0:
+				Result = (len(self.PollTimes[PID]) - 1) / Seconds
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the achieved polling rate against the target rate for     */
+#/* each PID polled, with the current adaptive rate factor.       */
+#/*****************************************************************/
+	def GetRateInfo(self):
+		Result = ""
+
+		for PID in sorted(self.PollTimes):
+			Result += "Poll Rate " + PID + "|" + "{:1.1f}".format(self.GetAchievedRate(PID)) + " / " + "{:1.1f}".format(self.ThisELM327.GetPidRate(PID)) + " Hz"
+			if PID in self.RateFactors:
+				Result += " x" + "{:1.3g}".format(self.RateFactors[PID])
+			Result += "\n"
+
+		return Result
@@ -0,0 +1,606 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: SocketCanELM327                                                  */
+#/* OBDII over a Linux SocketCAN interface, for example can0 on a CAN HAT   */
+#/* or vcan0 for testing, selected as the serial port can://can0. Requests  */
+#/* are sent as raw ISO 15765-4 CAN frames, so there is no ELM327 serial    */
+#/* link limiting the sample rate. The ELM327 class functions are used      */
+#/* unchanged: requests are answered with the text an ELM327 gives with     */
+#/* headers on, and the few AT commands the ELM327 class sends are handled  */
+#/* here.                                                                   */
+#/*                                                                         */
+#/* Batched Mode 01 requests are pipelined, several requests are waiting    */
+#/* for answers at once. Every frame received is timestamped by the kernel, */
+#/* giving the time each PID value was sent by the ECU.                     */
+#/*                                                                         */
+#/* The interface bit rate is set outside this program, for example:        */
+#/* ip link set can0 up type can bitrate 500000                             */
+#/***************************************************************************/
+
+
+
+import time
+import struct
+import socket
+import select
+import IsoTp
+import ELM327
+
+
+
+# Port name prefix of a SocketCAN interface.
+CAN_PREFIX = "can://"
+
+# Network interface type of CAN interfaces, in /sys/class/net/<name>/type.
+ARPHRD_CAN = "280"
+
+# Linux struct can_frame: CAN ID and flags, data length, padding, data.
+CAN_FRAME_FORMAT = "=IB3x8s"
+CAN_FRAME_SIZE = struct.calcsize(CAN_FRAME_FORMAT)
+
+# Flags in the CAN ID of a frame.
+CAN_EFF_FLAG = 0x80000000
+CAN_RTR_FLAG = 0x40000000
+CAN_ERR_FLAG = 0x20000000
+CAN_EFF_MASK = 0x1FFFFFFF
+
+# Kernel receive timestamps, SO_TIMESTAMP isn't defined by all Python versions.
+SO_TIMESTAMP = getattr(socket, "SO_TIMESTAMP", 29)
+TIMEVAL_FORMAT = "@ll"
+TIMEVAL_SIZE = struct.calcsize(TIMEVAL_FORMAT)
+
+# Data bytes are padded to a full frame, as ISO 15765-4 requires.
+CAN_PADDING = b'\x00'
+
+# Flow control sent for multiple frame answers: continue, no block size, no separation time.
+FLOW_CONTROL_FRAME = bytes([0x30, 0x00, 0x00])
+
+# OBDII protocol numbers tried in turn, 11 bit then 29 bit CAN IDs.
+CAN_ID_PROTOCOLS = ["6", "7"]
+CAN_PROTOCOL_NAMES = { "6": "ISO 15765-4 (CAN 11 bit ID)", "7": "ISO 15765-4 (CAN 29 bit ID)" }
+
+# Broadcast request CAN ID, and the CAN ID and mask of the answers, for each protocol.
+CAN_BROADCAST_IDS = { "6": 0x7DF, "7": 0x18DB33F1 }
+CAN_ANSWER_FILTERS = { "6": [0x7E8, 0x7F8], "7": [0x18DAF100, 0x1FFFFF00] }
+
+# Most Mode 01 requests waiting for answers at once.
+PIPELINE_DEPTH = 4
+
+# Identity reported in place of the ELM327 device version.
+SOCKETCAN_ID = "SocketCAN"
+
+
+
+#/*****************************************************************/
+#/* Check if a port name is a SocketCAN interface.                */
+#/*****************************************************************/
+def IsCanName(PortName):
+	return PortName != None and PortName[:len(CAN_PREFIX)] == CAN_PREFIX
+
+
+
+#/*****************************************************************/
+#/* Open a raw CAN socket on an interface, with kernel receive    */
+#/* timestamps, receiving only frames matching the [CAN ID, Mask] */
+#/* filters given, or every frame.                                */
+#/*****************************************************************/
+def OpenCanSocket(Interface, Filters = []):
+	Result = socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+	if len(Filters) > 0:
+		FilterData = b''
+		for CanId, Mask in Filters:
+			if CanId > 0x7FF:
+				CanId |= CAN_EFF_FLAG
+			FilterData += struct.pack("=II", CanId, Mask | CAN_EFF_FLAG | CAN_RTR_FLAG)
+		Result.setsockopt(socket.SOL_CAN_RAW, socket.CAN_RAW_FILTER, FilterData)
+	Result.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMP, 1)
+	Result.bind((Interface,))
+
+	return Result
+
+
+
+#/*****************************************************************/
+#/* Send a CAN frame, CAN IDs above 11 bits are sent as 29 bit.   */
+#/*****************************************************************/
+def SendFrame(CanSocket, CanId, Data):
+	if CanId > 0x7FF:
+		CanId |= CAN_EFF_FLAG
+	CanSocket.send(struct.pack(CAN_FRAME_FORMAT, CanId, 8, Data.ljust(8, CAN_PADDING)))
+
+
+
+#/*****************************************************************/
+#/* Receive a CAN frame, returning the CAN ID, the data and the   */
+#/* time the kernel received it, or None for an error or remote   */
+#/* frame.                                                        */
+#/*****************************************************************/
+def ReceiveFrame(CanSocket):
+	Frame, AncillaryData, Flags, Address = CanSocket.recvmsg(CAN_FRAME_SIZE, socket.CMSG_SPACE(TIMEVAL_SIZE))
+	if len(Frame) < CAN_FRAME_SIZE:
+		raise EOFError("CAN socket closed")
+	Timestamp = time.time()
+	for Level, Type, Data in AncillaryData:
+		if Level == socket.SOL_SOCKET and Type == SO_TIMESTAMP and len(Data) >= TIMEVAL_SIZE:
+			Seconds, MicroSeconds = struct.unpack(TIMEVAL_FORMAT, Data[:TIMEVAL_SIZE])
+			Timestamp = Seconds + MicroSeconds / 1000000
+
+	CanId, Length, Data = struct.unpack(CAN_FRAME_FORMAT, Frame)
+	if CanId & (CAN_ERR_FLAG | CAN_RTR_FLAG) != 0:
+		return None
+
+	return CanId & CAN_EFF_MASK, Data[:Length], Timestamp
+
+
+
+#/*****************************************************************/
+#/* Split a message into ISO 15765-2 frames, a single frame or a  */
+#/* first frame followed by consecutive frames.                   */
+#/*****************************************************************/
+def SegmentMessage(Data):
+	if len(Data) <= 7:
+		return [bytes([len(Data)]) + Data]
+
+	Result = [bytes([(IsoTp.FRAME_FIRST << 4) | (len(Data) >> 8), len(Data) & 0xFF]) + Data[:6]]
+	Sequence = 1
+	for Index in range(6, len(Data), 7):
+		Result.append(bytes([(IsoTp.FRAME_CONSECUTIVE << 4) | (Sequence & 0x0F)]) + Data[Index:Index + 7])
+		Sequence += 1
+
+	return Result
+
+
+
+#/*****************************************************************/
+#/* Get the CAN ID to send flow control to for an ECU answering   */
+#/* on a CAN ID. ECUs answer on their 11 bit address plus 8, or   */
+#/* with the 29 bit target and source swapped.                    */
+#/*****************************************************************/
+def GetRequestId(AnswerId):
+	if AnswerId <= 0x7FF:
+		Result = AnswerId - 8
+	else:
+		Result = (AnswerId & 0xFFFF0000) | ((AnswerId & 0xFF) << 8) | ((AnswerId >> 8) & 0xFF)
+
+	return Result
+
+
+
+class SocketCanELM327(ELM327.ELM327):
+	def __init__(self):
+		ELM327.ELM327.__init__(self)
+		self.Interface = ""
+		self.CanSocket = None
+		# CAN ID requests are sent to, broadcast unless an ECU is physically addressed.
+		self.RequestId = CAN_BROADCAST_IDS["6"]
+		# Time to wait for an answer, or for further answers after the last frame, AT ST.
+		self.ResponseTimeOut = 0.004 * ELM327.ELM_TIMEOUT_STEPS[0]
+		# Kernel time of the last frame of the last response, and of the answer holding each PID.
+		self.ResponseTimestamp = 0.0
+		self.PidTimestamps = {}
+		self.ResetCanStatistics()
+
+
+
+#/*****************************************************************/
+#/* Open the CAN interface and find which CAN IDs the vehicle     */
+#/* answers on, then find the PIDs it supports.                   */
+#/*****************************************************************/
+	def Connect(self, PhaseCallback = None):
+		Result = ELM327.CONNECT_SUCCESS
+		self.InitResult = ""
+		self.PhaseCallback = PhaseCallback
+		self.ConnectStartTime = time.perf_counter()
+		self.ConnectTiming = []
+		self.SetPhase(ELM327.PHASE_OPEN)
+
+		try:
+			self.Interface = ELM327.SERIAL_PORT_NAME[len(CAN_PREFIX):]
+			self.ResetConnection()
+			self.ResetCanStatistics()
+			self.ProtocolSource = ""
+			self.TimeoutValue = ELM327.ELM_TIMEOUT_STEPS[0]
+			self.ResponseTimeOut = 0.004 * self.TimeoutValue
+			self.PidTimestamps = {}
+			self.SetProtocol(CAN_ID_PROTOCOLS[0])
+		except Exception as Catch:
+			Result = ELM327.CONNECT_ELM327_FAIL
+			self.InitResult += "FAILED TO OPEN CAN INTERFACE: " + str(ELM327.SERIAL_PORT_NAME) + "\n"
+			print(str(Catch))
+
+		if Result == ELM327.CONNECT_SUCCESS:
+			self.SetPhase(ELM327.PHASE_PROTOCOL)
+			StartTime = time.perf_counter()
+			try:
+				# Find whether the vehicle answers on 11 bit or 29 bit CAN IDs.
+				for ProtocolNumber in CAN_ID_PROTOCOLS:
+					if ProtocolNumber != self.ProtocolNumber:
+						self.SetProtocol(ProtocolNumber)
+					Response = self.GetResponse(b'0101\r')
+					if self.NoData == False:
+						break
+			except Exception as Catch:
+				print(ELM327.STRING_ERROR + " on " + self.Interface + " : " + str(Catch))
+				self.NoData = True
+			self.ProtocolConnectTime = time.perf_counter() - StartTime
+			self.ProtocolSearchTime = self.ProtocolConnectTime
+			if self.NoData == True:
+				Result = ELM327.CONNECT_CAN_BUS_FAIL
+				self.Close()
+			else:
+				Response = self.PruneData(Response, 2)
+				ResultVal1 = int(Response[:2], 16)
+				if (ResultVal1 & 0x80) != 0:
+					self.MilOn = True
+				self.FreezeFrameCount = ResultVal1 & 0x7F
+				# Physically address one ECU when configured, otherwise learn how many ECUs answer each service.
+				if ELM327.ECU_ADDRESS != "":
+					self.SetEcuAddress(ELM327.ECU_ADDRESS)
+				else:
+					self.LearnResponseCounts()
+
+		if Result == ELM327.CONNECT_SUCCESS:
+			self.ConnectVehicle()
+			self.SetPhase(ELM327.PHASE_DONE)
+		else:
+			self.SetPhase(ELM327.PHASE_FAILED)
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Open the CAN socket for a protocol, receiving only the CAN    */
+#/* IDs ECUs answer on. The CAN ID of every answer is always      */
+#/* known, as with the ELM327 headers on.                         */
+#/*****************************************************************/
+	def SetProtocol(self, ProtocolNumber):
+		self.Close()
+		self.CanSocket = OpenCanSocket(self.Interface, [CAN_ANSWER_FILTERS[ProtocolNumber]])
+		self.ProtocolNumber = ProtocolNumber
+		self.IsCAN = True
+		self.RequestId = CAN_BROADCAST_IDS[ProtocolNumber]
+		if ProtocolNumber in ELM327.CAN_29_BIT_PROTOCOLS:
+			self.HeaderDigits = IsoTp.HEADERS_29_BIT
+		else:
+			self.HeaderDigits = IsoTp.HEADERS_11_BIT
+		self.PrimaryEcu = ELM327.ENGINE_ECU_IDS[self.HeaderDigits]
+
+
+
+#/*****************************************************************/
+#/* Close the CAN socket.                                         */
+#/*****************************************************************/
+	def Close(self):
+		Result = True
+
+		try:
+			if self.CanSocket != None:
+				self.CanSocket.close()
+				self.CanSocket = None
+		except:
+			Result = False
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get information about the CAN interface and the connection.   */
+#/*****************************************************************/
+	def GetInfo(self):
+		Result = ""
+
+		Result += "CAN Interface|" + self.Interface + "\n"
+		Result += "Using CAN BUS Protocol|" + CAN_PROTOCOL_NAMES.get(self.ProtocolNumber, "") + "\n"
+		Result += self.GetCanStatistics()
+		Result += self.GetConnectionInfo()
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Reset the CAN frame statistics to zero.                       */
+#/*****************************************************************/
+	def ResetCanStatistics(self):
+		self.FramesSent = 0
+		self.FramesReceived = 0
+		# Number of requests answered and the total time from sending to the kernel receiving the answer.
+		self.AnswerTime = [0, 0.0]
+		self.PipelineDepthUsed = 0
+
+
+
+#/*****************************************************************/
+#/* Get the CAN frame statistics, with the ECU answer time taken  */
+#/* from the kernel receive timestamps.                           */
+#/*****************************************************************/
+	def GetCanStatistics(self):
+		Result = ""
+
+		Result += "CAN Frames Sent|" + str(self.FramesSent) + "\n"
+		Result += "CAN Frames Received|" + str(self.FramesReceived) + "\n"
+		if self.AnswerTime[0] > 0:
+			Result += "ECU Answer Time|" + "{:1.2f}".format(1000 * self.AnswerTime[1] / self.AnswerTime[0]) + " ms\n"
+		if self.PipelineDepthUsed > 0:
+			Result += "Pipelined Requests|" + str(self.PipelineDepthUsed) + "\n"
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the kernel time the ECU sent the last value of a PID, in  */
+#/* seconds since the epoch.                                      */
+#/*****************************************************************/
+	def GetPidTimestamp(self, PID):
+		return self.PidTimestamps.get(PID, 0.0)
+
+
+
+#/*****************************************************************/
+#/* Send a request as a single frame to the request CAN ID.       */
+#/*****************************************************************/
+	def SendRequest(self, Request):
+		SendFrame(self.CanSocket, self.RequestId, bytes([len(Request)]) + Request)
+		self.FramesSent += 1
+
+
+
+#/*****************************************************************/
+#/* Send requests, keeping up to PIPELINE_DEPTH waiting for their */
+#/* answers, and receive the answer frames until the number of    */
+#/* answers expected for each request, or 0 when unknown, has     */
+#/* arrived, or nothing has arrived for the response timeout.     */
+#/* Flow control is sent as soon as the first frame of a multiple */
+#/* frame answer arrives. Return a list of [CAN ID, Data,         */
+#/* Timestamp] for each frame and a list of [CAN ID, Timestamp]   */
+#/* for each complete message.                                    */
+#/*****************************************************************/
+	def Exchange(self, Requests, Expected):
+		Frames = []
+		Messages = []
+
+		# Number of messages received when each request has all its answers, a request expecting an unknown number paces as one.
+		AnswersEnd = []
+		for Count in Expected:
+			AnswersEnd.append(max(1, Count) + sum(AnswersEnd[-1:]))
+		AllExpected = min(Expected) > 0
+		# Data bytes still to arrive of the multiple frame answer from each ECU.
+		Receiving = {}
+		Sent = 0
+		Retired = 0
+		SendTimes = []
+		Deadline = 0.0
+		while True:
+			while Sent < len(Requests) and Sent - Retired < PIPELINE_DEPTH:
+				SendTimes.append(time.time())
+				self.SendRequest(Requests[Sent])
+				Sent += 1
+				self.PipelineDepthUsed = max(self.PipelineDepthUsed, Sent - Retired)
+				Deadline = time.perf_counter() + self.ResponseTimeOut
+			if Sent == len(Requests) and AllExpected and len(Messages) >= AnswersEnd[-1]:
+				break
+			Wait = Deadline - time.perf_counter()
+			if Wait <= 0:
+				if Sent == len(Requests):
+					break
+				# The waiting requests weren't all answered in time, move on to the next.
+				Retired = Sent
+				continue
+			if len(select.select([self.CanSocket], [], [], Wait)[0]) == 0:
+				continue
+
+			Frame = ReceiveFrame(self.CanSocket)
+			if Frame == None or len(Frame[1]) == 0:
+				continue
+			CanId, Data, Timestamp = Frame
+			self.FramesReceived += 1
+			Frames.append(Frame)
+			Deadline = time.perf_counter() + self.ResponseTimeOut
+			Complete = False
+			FrameType = Data[0] >> 4
+			if FrameType == IsoTp.FRAME_SINGLE:
+				Complete = True
+			elif FrameType == IsoTp.FRAME_FIRST and len(Data) > 1:
+				Receiving[CanId] = (((Data[0] & 0x0F) << 8) | Data[1]) - (len(Data) - 2)
+				SendFrame(self.CanSocket, GetRequestId(CanId), FLOW_CONTROL_FRAME)
+				self.FramesSent += 1
+			elif FrameType == IsoTp.FRAME_CONSECUTIVE and CanId in Receiving:
+				Receiving[CanId] -= len(Data) - 1
+				if Receiving[CanId] <= 0:
+					del Receiving[CanId]
+					Complete = True
+			if Complete == True:
+				# Time each request from sending to the kernel receiving its first answer.
+				if Retired < Sent and len(Messages) == AnswersEnd[Retired] - max(1, Expected[Retired]):
+					self.AnswerTime[0] += 1
+					self.AnswerTime[1] += max(0.0, Timestamp - SendTimes[Retired])
+				Messages.append([CanId, Timestamp])
+				while Retired < Sent and AnswersEnd[Retired] <= len(Messages):
+					Retired += 1
+
+		return Frames, Messages
+
+
+
+#/*****************************************************************/
+#/* Count the ECUs which answer a request for Mode 01 PIDs, from  */
+#/* the PIDs each ECU supports, or the number learned to answer   */
+#/* Mode 01 when they are not known.                              */
+#/*****************************************************************/
+	def CountAnswers(self, PIDs):
+		if len(self.EcuValidPIDs) == 0:
+			return self.ResponseCounts.get('01', 0)
+
+		Result = 0
+		for EcuId in self.EcuValidPIDs:
+			if self.EcuAddress == "" or EcuId == self.PrimaryEcu:
+				for PID in PIDs:
+					if PID in self.EcuValidPIDs[EcuId]:
+						Result += 1
+						break
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Format CAN frames as the text an ELM327 gives with headers on */
+#/* and spaces off, a line for each frame starting with its CAN   */
+#/* ID, or NO DATA as the ELM327 class receives it.               */
+#/*****************************************************************/
+	def FormatFrames(self, Frames):
+		ParseTime = time.perf_counter()
+
+		IdFormat = "{:0" + str(self.HeaderDigits) + "X}"
+		Lines = []
+		for CanId, Data, Timestamp in Frames:
+			Lines.append(IdFormat.format(CanId) + Data.hex().upper())
+			self.ResponseTimestamp = Timestamp
+		self.NoData = len(Lines) == 0
+		if self.NoData:
+			# Seven zero data bytes, as a single frame from a CAN ID of zero with headers on.
+			Lines.append('0' * self.HeaderDigits + '0700000000000000')
+		Result = "\n".join(Lines) + "\n"
+
+		self.ResponseCount += 1
+		self.ReceivedByteCount += CAN_FRAME_SIZE * len(Frames)
+		self.ParseSeconds += time.perf_counter() - ParseTime
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Perform the few AT commands the ELM327 class sends.           */
+#/*****************************************************************/
+	def DoAtCommand(self, Command):
+		Result = "OK\n"
+
+		if Command[:2] == "SH" and len(Command) in (5, 8):
+			if len(Command) == 5:
+				self.RequestId = int(Command[2:], 16)
+			else:
+				self.RequestId = 0x18000000 | int(Command[2:], 16)
+		elif Command[:2] == "ST" and len(Command) == 4:
+			self.ResponseTimeOut = 0.004 * max(1, int(Command[2:], 16))
+		elif Command == "I":
+			Result = SOCKETCAN_ID + " " + self.Interface + "\n"
+		elif Command == "DP":
+			Result = CAN_PROTOCOL_NAMES.get(self.ProtocolNumber, "") + "\n"
+		elif Command == "DPN":
+			Result = self.ProtocolNumber + "\n"
+		elif Command not in ("H0", "H1", "AT0", "AT1", "AT2"):
+			Result = "?\n"
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Answer a request from the ELM327 class as the ELM327 would.   */
+#/* An OBDII request may end with the number of answers expected, */
+#/* returning as soon as they have all arrived.                   */
+#/*****************************************************************/
+	def GetResponse(self, Data, no_ret = False):
+		Request = str(Data, 'utf-8').replace('\r', '').replace(' ', '').upper()
+		if ELM327.DEBUG == "ON":
+			print("DEBUG SENDING [" + str(len(Data)) + "] " + str(Data))
+
+		StartTime = time.perf_counter()
+		# There is no prompt to wait for, every exchange ends when its answers arrive or time out.
+		self.PromptFound = True
+		if Request[:2] == "AT":
+			Result = self.DoAtCommand(Request[2:])
+		else:
+			Expected = 0
+			if len(Request) % 2 == 1:
+				Expected = int(Request[-1], 16)
+				Request = Request[:-1]
+			try:
+				RequestData = bytes.fromhex(Request)
+			except ValueError:
+				RequestData = b''
+			if len(RequestData) == 0 or len(RequestData) > 7:
+				Result = "?\n"
+			else:
+				Frames, Messages = self.Exchange([RequestData], [Expected])
+				self.ReceiveSeconds += time.perf_counter() - StartTime
+				Result = self.FormatFrames(Frames)
+
+		if ELM327.DEBUG == "ON":
+			print("DEBUG RECEIVED [" + str(len(Result)) + "] " + str('%r' % Result))
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get the data bytes of Mode 01 PIDs, batched up to six PIDs in */
+#/* each request, with the batched requests pipelined. The kernel */
+#/* time of the answer holding each PID is kept.                  */
+#/*****************************************************************/
+	def GetBatchPayloads(self, BatchPIDs):
+		Result = {}
+
+		try:
+			Requests = []
+			Expected = []
+			for Index in range(0, len(BatchPIDs), ELM327.BATCH_PID_COUNT):
+				Requests.append(bytes([0x01] + [int(PID[2:], 16) for PID in BatchPIDs[Index:Index + ELM327.BATCH_PID_COUNT]]))
+				Expected.append(self.CountAnswers(BatchPIDs[Index:Index + ELM327.BATCH_PID_COUNT]))
+			if len(Requests) > 0:
+				StartTime = time.perf_counter()
+				Frames, Timestamps = self.Exchange(Requests, Expected)
+				self.ReceiveSeconds += time.perf_counter() - StartTime
+				Messages = self.SplitEcuMessages(self.FormatFrames(Frames))
+				# Pair each message with the time its last frame arrived, the messages from each ECU are in order.
+				IdFormat = "{:0" + str(self.HeaderDigits) + "X}"
+				Timestamps = [[IdFormat.format(CanId), Timestamp] for CanId, Timestamp in Timestamps]
+				TimedMessages = []
+				for EcuId, Message in Messages:
+					Timestamp = self.ResponseTimestamp
+					for Index in range(len(Timestamps)):
+						if Timestamps[Index][0] == EcuId:
+							Timestamp = Timestamps.pop(Index)[1]
+							break
+					TimedMessages.append([EcuId, Message, Timestamp])
+				# The primary ECU's data is used where several ECUs answer.
+				TimedMessages.sort(key = lambda TimedMessage: TimedMessage[0] != self.PrimaryEcu)
+				for EcuId, Message, Timestamp in TimedMessages:
+					for PID in self.SplitBatchMessage(Message, Result):
+						self.PidTimestamps[PID] = Timestamp
+		except Exception as Catch:
+			print(ELM327.STRING_ERROR + " in batch " + str(BatchPIDs) + " : " + str(Catch))
+
+		return Result
+
+
+
+#/*****************************************************************/
+#/* Get a PID, keeping the kernel time of its answer.             */
+#/*****************************************************************/
+	def DoPID(self, PID, FreezeIndex = -1):
+		# PIDs already received in a batch keep the time of the batched answer.
+		Requested = FreezeIndex == -1 and PID not in self.BatchPayloads
+		Result = ELM327.ELM327.DoPID(self, PID, FreezeIndex)
+		if Requested == True:
+			self.PidTimestamps[PID] = self.ResponseTimestamp
+
+		return Result
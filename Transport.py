@@ -0,0 +1,197 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#/***************************************************************************/
+#/* Raspberry Pi ELM327 OBBII CAN BUS Diagnostic Software.                  */
+#/*                                                                         */
+#/* Class: TcpTransport                                                     */
+#/* Functions: IsTcpName, SplitTcpName, OpenTransport                       */
+#/* Open the link the ELM327 class runs on. Every transport, a pyserial     */
+#/* port, a TcpTransport, a Capture.ReplaySerial or a Capture.CaptureSerial */
+#/* around one of these, has the serial port functions the ELM327 class     */
+#/* uses: write, read, in_waiting, timeout, write_timeout, baudrate, name   */
+#/* and close.                                                              */
+#/*                                                                         */
+#/* Serial ports, including Bluetooth rfcomm devices and the pseudo         */
+#/* terminal of the emulator, are opened with pyserial. Names of the form   */
+#/* tcp://host:port open a TCP connection to a WiFi ELM327 adapter, port    */
+#/* 35000 when none is given. A replay file replays a capture in place of   */
+#/* the link, and a capture file records all traffic on the link.           */
+#/*                                                                         */
+#/* A TCP link has no baud rate, baudrate is None, so the ELM327 class      */
+#/* skips baud rate negotiation.                                            */
+#/***************************************************************************/
+
+
+
+import time
+import socket
+import select
+import serial
+import Capture
+
+
+
+# Port name prefix of a TCP link.
+TCP_PREFIX = "tcp://"
+
+# Port WiFi ELM327 adapters usually listen on.
+TCP_PORT_DEFAULT = 35000
+
+# Seconds to wait for a TCP connection to the adapter.
+TCP_CONNECT_TIME_OUT = 5
+
+# Largest number of bytes received from the socket at once.
+TCP_RECEIVE_SIZE = 4096
+
+
+
+#/*****************************************************************/
+#/* Check if a port name is a TCP link.                           */
+#/*****************************************************************/
+def IsTcpName(PortName):
+	return PortName != None and PortName[:len(TCP_PREFIX)] == TCP_PREFIX
+
+
+
+#/*****************************************************************/
+#/* Get the host and port of a TCP port name.                     */
+#/*****************************************************************/
+def SplitTcpName(PortName):
+	Host = PortName[len(TCP_PREFIX):].rstrip('/')
+	Port = TCP_PORT_DEFAULT
+	if Host.rfind(':') > Host.rfind(']'):
+		Host, Port = Host.rsplit(':', 1)
+		Port = int(Port)
+	Host = Host.strip("[]")
+
+	return Host, Port
+
+
+
+#/*****************************************************************/
+#/* Open the link to the ELM327 device. A replay file replays a   */
+#/* capture in place of the link, otherwise the port name is a    */
+#/* serial port or TCP link, captured when a capture file is      */
+#/* given.                                                        */
+#/*****************************************************************/
+def OpenTransport(PortName, BaudRate, ReplayFileName = "", ReplaySpeed = 1.0, CaptureFileName = ""):
+	if ReplayFileName != "":
+		Result = Capture.ReplaySerial(ReplayFileName, ReplaySpeed)
+	else:
+		if IsTcpName(PortName):
+			Host, Port = SplitTcpName(PortName)
+			Result = TcpTransport(Host, Port)
+		else:
+			Result = serial.Serial(PortName, BaudRate)
+		if CaptureFileName != "":
+			Result = Capture.CaptureSerial(Result, CaptureFileName)
+
+	return Result
+
+
+
+class TcpTransport:
+	def __init__(self, Host, Port = TCP_PORT_DEFAULT, ConnectTimeOut = TCP_CONNECT_TIME_OUT):
+		self.name = TCP_PREFIX + Host + ":" + str(Port)
+		self.Socket = socket.create_connection((Host, Port), ConnectTimeOut)
+		# Requests are a few bytes each, send them immediately rather than waiting to fill a packet.
+		self.Socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+		self.Socket.setblocking(False)
+		# Data received from the socket and not yet read.
+		self.Received = bytearray()
+		self.is_open = True
+		self.timeout = None
+		self.write_timeout = None
+		self.baudrate = None
+
+
+
+#/*****************************************************************/
+#/* Wait for the socket to be ready, up to a timeout in seconds,  */
+#/* or forever when the timeout is None. Return False on timeout. */
+#/*****************************************************************/
+	def WaitReady(self, Write, TimeOut):
+		if Write == True:
+			Ready = select.select([], [self.Socket], [], TimeOut)[1]
+		else:
+			Ready = select.select([self.Socket], [], [], TimeOut)[0]
+
+		return len(Ready) > 0
+
+
+
+#/*****************************************************************/
+#/* Receive all data waiting on the socket, without blocking.     */
+#/*****************************************************************/
+	def ReceiveWaiting(self):
+		while True:
+			try:
+				Data = self.Socket.recv(TCP_RECEIVE_SIZE)
+			except (BlockingIOError, InterruptedError):
+				break
+			if Data == b'':
+				self.is_open = False
+				raise ConnectionResetError("Connection closed by " + self.name)
+			self.Received += Data
+			if len(Data) < TCP_RECEIVE_SIZE:
+				break
+
+
+
+#/*****************************************************************/
+#/* Serial port functions used by the ELM327 class.               */
+#/*****************************************************************/
+	@property
+	def in_waiting(self):
+		self.ReceiveWaiting()
+		return len(self.Received)
+
+
+	def fileno(self):
+		return self.Socket.fileno()
+
+
+	def write(self, Data):
+		Data = memoryview(bytes(Data))
+		Deadline = None
+		if self.write_timeout != None:
+			Deadline = time.perf_counter() + self.write_timeout
+		Position = 0
+		while Position < len(Data):
+			try:
+				Position += self.Socket.send(Data[Position:])
+			except (BlockingIOError, InterruptedError):
+				Wait = None
+				if Deadline != None:
+					Wait = max(0.0, Deadline - time.perf_counter())
+				if self.WaitReady(True, Wait) == False:
+					raise TimeoutError("Write timeout to " + self.name)
+
+		return len(Data)
+
+
+	def read(self, Size = 1):
+		self.ReceiveWaiting()
+		if len(self.Received) == 0 and self.WaitReady(False, self.timeout) == True:
+			self.ReceiveWaiting()
+
+		Result = bytes(self.Received[:Size])
+		del self.Received[:Size]
+
+		return Result
+
+
+	def close(self):
+		self.is_open = False
+		self.Socket.close()